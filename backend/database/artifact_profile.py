@@ -0,0 +1,136 @@
+import heapq
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from utils.time_utils import TIMESTAMP_PATTERN, to_epoch, normalize_timestamp
+from database.row_codec import EXTRA_VALUES_KEY
+
+KMV_SIZE = 256          # Smallest hashes kept per column for distinct estimates (~6% error)
+SAMPLE_VALUES = 3       # Distinct example values kept per column
+SAMPLE_MAX_LENGTH = 80  # Longer example values are truncated
+HASH_SPACE = 2 ** 64
+
+
+def _format_epoch(epoch: int) -> str:
+    """Format epoch seconds like normalize_timestamp"""
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class ColumnProfile:
+    """Streaming statistics for one column"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.non_null = 0
+        self.samples: List[str] = []
+        # K-minimum-values sketch: a max-heap (negated) of the smallest distinct hashes
+        self._kmv: List[int] = []
+        self._kmv_members = set()
+        # Timestamp range; values compare as text while they share one layout, else as epochs
+        self.is_time = True
+        self._time_layout: Optional[str] = None
+        self._min_time: Optional[str] = None
+        self._max_time: Optional[str] = None
+        self._min_epoch: Optional[int] = None
+        self._max_epoch: Optional[int] = None
+
+    def add(self, value: str):
+        self.non_null += 1
+        if len(self.samples) < SAMPLE_VALUES and value[:SAMPLE_MAX_LENGTH] not in self.samples:
+            self.samples.append(value[:SAMPLE_MAX_LENGTH])
+
+        # str hashes are stable within a process, which covers one ingest
+        hashed = hash(value) % HASH_SPACE
+        if hashed not in self._kmv_members:
+            if len(self._kmv) < KMV_SIZE:
+                heapq.heappush(self._kmv, -hashed)
+                self._kmv_members.add(hashed)
+            elif hashed < -self._kmv[0]:
+                self._kmv_members.discard(-heapq.heappushpop(self._kmv, -hashed))
+                self._kmv_members.add(hashed)
+
+        if self.is_time:
+            self._add_time(value)
+
+    def _add_time(self, value: str):
+        if not TIMESTAMP_PATTERN.match(value):
+            self.is_time = False
+            return
+
+        # "YYYY-MM-DD HH:MM:SS" prefixes sort chronologically when separator and suffix match
+        layout = value[10:11] + value[19:].lstrip("0123456789.")
+        if self._time_layout is None:
+            self._time_layout = layout
+        if layout == self._time_layout and self._min_epoch is None:
+            if self._min_time is None or value < self._min_time:
+                self._min_time = value
+            if self._max_time is None or value > self._max_time:
+                self._max_time = value
+            return
+
+        # Mixed layouts or offsets: switch to comparing epoch seconds
+        seen = [value] if self._min_epoch is not None else [value, self._min_time, self._max_time]
+        epochs = [to_epoch(item) for item in seen if item is not None]
+        if None in epochs:
+            self.is_time = False
+            return
+        if self._min_epoch is not None:
+            epochs += [self._min_epoch, self._max_epoch]
+        self._min_epoch = min(epochs)
+        self._max_epoch = max(epochs)
+
+    def distinct_estimate(self) -> int:
+        if len(self._kmv) < KMV_SIZE:
+            return len(self._kmv)
+        return int((KMV_SIZE - 1) * HASH_SPACE / -self._kmv[0])
+
+    def to_dict(self, row_count: int) -> Dict[str, Any]:
+        profile = {
+            "name": self.name,
+            "null_ratio": round(1 - self.non_null / row_count, 3) if row_count else 0.0,
+            "distinct_estimate": self.distinct_estimate(),
+            "samples": self.samples
+        }
+        if self.is_time and self.non_null:
+            if self._min_epoch is not None:
+                profile["min_time"] = _format_epoch(self._min_epoch)
+                profile["max_time"] = _format_epoch(self._max_epoch)
+            elif normalize_timestamp(self._min_time) and normalize_timestamp(self._max_time):
+                profile["min_time"] = normalize_timestamp(self._min_time)
+                profile["max_time"] = normalize_timestamp(self._max_time)
+        return profile
+
+
+class ArtifactProfiler:
+    """Streaming profile of one artifact type's rows
+
+    Tracks per-column null ratios, KMV distinct-count estimates, timestamp ranges
+    and a few sample values, so artifact listings can describe columns without
+    reading rows.
+    """
+
+    def __init__(self):
+        self.row_count = 0
+        self.columns: Dict[str, ColumnProfile] = {}
+
+    def add(self, rows: List[Dict[Any, Any]]):
+        """Profile a batch of column -> value rows"""
+        columns = self.columns
+        for row in rows:
+            self.row_count += 1
+            for name, value in row.items():
+                if name is None or name == EXTRA_VALUES_KEY:
+                    continue
+                column = columns.get(name)
+                if column is None:
+                    column = columns[name] = ColumnProfile(name)
+                if value is None:
+                    continue
+                value = value.strip() if isinstance(value, str) else str(value)
+                if value:
+                    column.add(value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "row_count": self.row_count,
+            "columns": [column.to_dict(self.row_count) for column in self.columns.values()]
+        }
@@ -1,20 +1,54 @@
 import os
+import re
 import json
 import sqlite3
 import logging
-from typing import List, Dict, Any
+import threading
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple, Union
 from contextlib import contextmanager
+from database.migrations import apply_migrations
+from database.artifact_profile import ArtifactProfiler
+from database.row_codec import RowCodec, row_search_text
+from utils.geo_utils import parse_latitude, parse_longitude
+from utils.time_utils import to_epoch
+from database.typed_storage import (
+    typed_storage_enabled, infer_column_types, create_typed_table, drop_typed_table, drop_all_typed_tables,
+    get_typed_columns, insert_typed_batch, typed_table_name
+)
 
 DB_NAME = "leapp_forensics.db"
 DEFAULT_STATUS = "processing"
+INSERT_BATCH_SIZE = 5000  # Rows per executemany call during ingest
+BULK_LOAD_CACHE_KIB = 262144  # 256MB page cache while bulk loading
+INGEST_TABLES = ('artifact_types', 'artifact_data', 'spatial_data', 'timeline_events')
+LEAPP_SOURCE_ALIAS = "leapp_source"  # Schema name of an attached LEAPP database
+FILTER_INDEX_MIN_USES = 3       # Filters on a column before it gets an index
+FILTER_INDEX_MIN_ROWS = 10000   # Smaller artifacts scan quickly enough without one
+EMBEDDING_CACHE_LOOKUP_SIZE = 500  # Content hashes per embedding cache lookup
+EMBED_WRITE_BUSY_TIMEOUT_MS = 600000  # Embed-stage writes wait out the ingest writer's long transactions
+NUMBER_PATTERN = re.compile(r"-?\d+(\.\d+)?([eE][-+]?\d+)?")  # Numeric-looking text, sorted as a number
 
 logger = logging.getLogger(__name__)
 
+# Decoders per artifact type id, shared by every connection
+_codec_cache: Dict[int, RowCodec] = {}
+_codec_cache_lock = threading.Lock()
+
+# Filter counts per (artifact type id, column key), reset when the index is dropped
+_filter_uses: Dict[Tuple[int, str], int] = {}
+_filter_uses_lock = threading.Lock()
+_filter_index_lock = threading.Lock()  # One index build at a time, so builds do not lock each other out
+
 def init_database():
     # Create database file in same directory as this script
     conn = get_db_connection()
     cursor = conn.cursor()
 
+    # WAL lets tool calls read while a report is ingested; the mode is stored in the
+    # database file, so it is set once here before other connections open
+    cursor.execute("PRAGMA journal_mode=WAL").fetchone()
+
     # Main report metadata table: stores info about each uploaded report
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS reports (
@@ -58,8 +92,8 @@ def init_database():
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             job_name TEXT NOT NULL,                -- Links to reports table
             timestamp TEXT,                         -- Time of location event
-            latitude TEXT,                          -- GPS latitude coordinate
-            longitude TEXT,                         -- GPS longitude coordinate
+            latitude TEXT,                          -- GPS latitude coordinate (REAL from migration 6)
+            longitude TEXT,                         -- GPS longitude coordinate (REAL from migration 6)
             activity TEXT,                          -- What was happening at this location
             source_artifact TEXT,                   -- Which file this data came from
             FOREIGN KEY (job_name) REFERENCES reports(job_name) ON DELETE CASCADE
@@ -89,7 +123,10 @@ def init_database():
         )
     ''')
 
-    # Save changes and close connection
+    # Save changes, bring the schema up to date and close connection
+    conn.commit()
+    apply_migrations(conn)
+    _rebuild_deferred_indexes(cursor)
     conn.commit()
     conn.close()
 
@@ -97,25 +134,132 @@ def reset_database():
     """Reset the database by dropping all tables except ai_settings"""
     with get_db_cursor() as cursor:
         # List of tables to drop
-        tables = ['reports', 'artifact_types', 'artifact_data', 'spatial_data', 'timeline_events']
+        tables = ['reports', 'artifact_types', 'artifact_data', 'spatial_data', 'timeline_events',
+                  'ingest_checkpoints', 'deferred_indexes', 'artifact_columns', 'spatial_index', 'artifact_fts', 'artifact_words',
+                  'artifact_profiles', 'embedding_cache', 'artifact_column_values', 'artifact_filter_columns']
         
         for table in tables:
             cursor.execute(f"DROP TABLE IF EXISTS {table}")
-            
+        drop_all_typed_tables(cursor)
+        _forget_filter_uses()
+
+        # Migrations must run again against the recreated tables
+        cursor.execute("PRAGMA user_version = 0")
+
+    # Artifact type ids restart after the drop, so cached codecs are stale
+    clear_codec_cache()
+
     # Re-initialize the database to recreate empty tables
     init_database()
     logger.info("Database reset successfully")
 
+def delete_report(job_name: str) -> bool:
+    """Delete a report and all of its stored rows; returns False if it does not exist"""
+    with get_db_cursor() as cursor:
+        cursor.execute("SELECT id FROM reports WHERE job_name = ?", (job_name,))
+        report = cursor.fetchone()
+        if not report:
+            return False
+
+        cursor.execute("SELECT id FROM artifact_types WHERE job_name = ?", (job_name,))
+        for (artifact_type_id,) in cursor.fetchall():
+            delete_artifact_rows(cursor, job_name, artifact_type_id)
+        # Drop the job's slice of the spatial R*Tree in one range delete on its job dimension
+        cursor.execute("DELETE FROM spatial_index WHERE min_job >= ? AND max_job <= ?", (report[0], report[0]))
+        for table in ('artifact_types', 'spatial_data', 'timeline_events', 'ingest_checkpoints', 'reports'):
+            delete_job_rows(cursor, table, job_name)
+
+    logger.info(f"Deleted report {job_name}")
+    return True
+
 def get_db_connection():
     """Get database connection"""
-    return sqlite3.connect(os.path.join(os.path.dirname(__file__), DB_NAME))
+    conn = sqlite3.connect(os.path.join(os.path.dirname(__file__), DB_NAME))
+    # row_text(data_json, artifact_type_id) decompresses rows inside SQL queries
+    conn.create_function("row_text", 2, _row_text_sql, deterministic=True)
+    # row_search_text(data_json, artifact_type_id) indexes rows stored before artifact_fts existed
+    conn.create_function("row_search_text", 2, _row_search_text_sql, deterministic=True)
+    # Parsers used when copying LEAPP databases with INSERT ... SELECT
+    conn.create_function("to_epoch", 1, to_epoch, deterministic=True)
+    conn.create_function("parse_latitude", 1, parse_latitude, deterministic=True)
+    conn.create_function("parse_longitude", 1, parse_longitude, deterministic=True)
+    # Enables the REGEXP operator (X REGEXP Y calls regexp(Y, X))
+    conn.create_function("regexp", 2, _regexp_sql, deterministic=True)
+    # sort_number(value) orders untyped values, evaluating the value once
+    conn.create_function("sort_number", 1, _sort_number_sql, deterministic=True)
+    return conn
+
+def _regexp_sql(pattern: str, value) -> bool:
+    """SQL function: whether a regex matches anywhere in a value (compiled patterns are cached by re)"""
+    return value is not None and re.search(pattern, value) is not None
+
+def _sort_number_sql(value):
+    """SQL function: numeric-looking text as a REAL, other values unchanged"""
+    if isinstance(value, str) and NUMBER_PATTERN.fullmatch(value):
+        return float(value)
+    return value
+
+def _row_text_sql(data_json, artifact_type_id) -> Optional[str]:
+    """SQL function: get the uncompressed JSON text of a stored row"""
+    if data_json is None:
+        return None
+    return get_artifact_codec(artifact_type_id).stored_text(data_json)
+
+def _row_search_text_sql(data_json, artifact_type_id) -> Optional[str]:
+    """SQL function: get a stored row's values as text for full-text indexing"""
+    if data_json is None:
+        return None
+    return get_artifact_codec(artifact_type_id).search_text(data_json)
+
+def get_artifact_codec(artifact_type_id: int, cursor=None) -> RowCodec:
+    """Get the row codec for an artifact type, loading it from artifact_types on first use"""
+    codec = _codec_cache.get(artifact_type_id)
+    if codec is not None:
+        return codec
+
+    with _use_cursor(cursor) as cursor:
+        cursor.execute("SELECT columns_json, zstd_dict FROM artifact_types WHERE id = ?", (artifact_type_id,))
+        result = cursor.fetchone()
+
+    columns = json.loads(result[0]) if result and result[0] else None
+    codec = RowCodec(columns, result[1] if result else None)
+    with _codec_cache_lock:
+        _codec_cache[artifact_type_id] = codec
+    return codec
+
+def save_artifact_profile(cursor, artifact_type_id: int, profiler: ArtifactProfiler):
+    """Persist the column profile of a fully stored artifact type"""
+    cursor.execute(
+        "INSERT OR REPLACE INTO artifact_profiles (artifact_type_id, row_count, profile_json) VALUES (?, ?, ?)",
+        (artifact_type_id, profiler.row_count, json.dumps(profiler.to_dict()["columns"]))
+    )
+
+def save_artifact_codec(cursor, artifact_type_id: int, codec: RowCodec):
+    """Persist the interned columns and zstd dictionary for an artifact type"""
+    cursor.execute(
+        "UPDATE artifact_types SET columns_json = ?, zstd_dict = ? WHERE id = ?",
+        (json.dumps(codec.columns), codec.zstd_dict, artifact_type_id)
+    )
+    with _codec_cache_lock:
+        _codec_cache[artifact_type_id] = codec
+
+def clear_codec_cache():
+    """Forget all cached row codecs"""
+    with _codec_cache_lock:
+        _codec_cache.clear()
+
+def decode_artifact_row(artifact_type_id: int, data_json) -> Dict[str, Any]:
+    """Decode a stored artifact_data row into a column -> value dictionary"""
+    return get_artifact_codec(artifact_type_id).decode(data_json)
 
 @contextmanager
-def get_db_cursor():
-    """Context manager for database operations"""
+def get_db_cursor(busy_timeout_ms: Optional[int] = None):
+    """Context manager for database operations, optionally waiting longer than 5s for locks"""
     conn = get_db_connection()
     try:
         cursor = conn.cursor()
+        if busy_timeout_ms is not None:
+            cursor.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
         yield cursor
         conn.commit()
     except Exception:
@@ -124,6 +268,86 @@ def get_db_cursor():
     finally:
         conn.close()
 
+@contextmanager
+def _use_cursor(cursor=None):
+    """Reuse a caller's cursor (e.g. from bulk_load) or open a short-lived one"""
+    if cursor is not None:
+        yield cursor
+    else:
+        with get_db_cursor() as new_cursor:
+            yield new_cursor
+
+def _drop_secondary_indexes(cursor, tables: Iterable[str]) -> int:
+    """Drop user-defined indexes on empty tables, recording them in deferred_indexes
+
+    Indexes are only deferred for tables being loaded for the first time. Once a table
+    holds other reports, maintaining its indexes is cheaper than rebuilding them. The
+    CREATE statements are persisted so a crashed load is repaired on next startup.
+    """
+    deferred_count = 0
+    for table in tables:
+        if cursor.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+            continue
+        # Automatic indexes (PRIMARY KEY / UNIQUE) have no SQL and cannot be dropped
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+            (table,)
+        )
+        for index_name, index_sql in cursor.fetchall():
+            cursor.execute("INSERT OR REPLACE INTO deferred_indexes (name, sql) VALUES (?, ?)", (index_name, index_sql))
+            cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+            deferred_count += 1
+    return deferred_count
+
+def _rebuild_deferred_indexes(cursor) -> int:
+    """Recreate indexes dropped by a bulk load and clear the record of them"""
+    cursor.execute("SELECT name, sql FROM deferred_indexes")
+    deferred = cursor.fetchall()
+    for index_name, index_sql in deferred:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (index_name,))
+        if not cursor.fetchone():
+            cursor.execute(index_sql)
+    cursor.execute("DELETE FROM deferred_indexes")
+    return len(deferred)
+
+@contextmanager
+def bulk_load(tables: Iterable[str] = INGEST_TABLES):
+    """Context manager for report ingest: one connection tuned for fast bulk inserts
+
+    Relaxes sync and enlarges the page cache on this connection only, defers secondary
+    index builds until the load is done, then rebuilds indexes and checkpoints the WAL.
+    Callers may commit as they go; with WAL and synchronous=NORMAL commits are cheap.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA cache_size=-{BULK_LOAD_CACHE_KIB}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        _drop_secondary_indexes(cursor, tables)
+        conn.commit()
+
+        yield cursor
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        try:
+            # Rebuild deferred indexes even on failure so the schema stays intact
+            rebuilt_count = _rebuild_deferred_indexes(cursor)
+            conn.commit()
+            logger.info(f"Rebuilt {rebuilt_count} deferred indexes after bulk load")
+
+            # Fold the loaded pages back into the main file so the WAL does not stay large
+            # (results are fetched so no statement is left open when the connection closes;
+            # readers still on the WAL only make the checkpoint partial)
+            cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to rebuild indexes after bulk load: {e}")
+        finally:
+            conn.close()
+
 def insert_report_metadata(job_name: str, report_path: str):
     """Insert report metadata"""
     with get_db_cursor() as cursor:
@@ -146,51 +370,421 @@ def update_report_status(job_name: str, status: str, error_message: str = None):
                 (status, job_name)
             )
 
-def store_tsv_data(job_name: str, tsv_data: Dict[str, List[Dict[str, Any]]]):
-    """Store TSV data in database"""
+def find_resumable_report(report_path: str) -> Optional[str]:
+    """Find an unfinished report for the same directory so a re-submission can resume it"""
     with get_db_cursor() as cursor:
-        for file_name, rows in tsv_data.items():
-            # Clean up filename for display
-            artifact_name = file_name.replace('.tsv', '').replace('_', ' ').title()
-            # Insert artifact type metadata
-            cursor.execute(
-                "INSERT INTO artifact_types (job_name, file_name, artifact_name) VALUES (?, ?, ?)",
-                (job_name, file_name, artifact_name)
-            )
-            artifact_type_id = cursor.lastrowid
+        cursor.execute(
+            "SELECT job_name FROM reports WHERE report_path = ? AND status IN ('queued', 'processing', 'failed', 'cancelled') "
+            "ORDER BY upload_date DESC LIMIT 1",
+            (report_path,)
+        )
+        result = cursor.fetchone()
+        return result[0] if result else None
 
-            # Store each row as JSON data
-            for row_index, row_data in enumerate(rows):
-                cursor.execute(
-                    "INSERT INTO artifact_data (job_name, artifact_type_id, row_index, data_json) VALUES (?, ?, ?, ?)",
-                    (job_name, artifact_type_id, row_index, json.dumps(row_data))
-                )
+def get_pending_reports() -> List[Tuple[str, str, int]]:
+    """Get (job_name, report_path, priority) for reports queued or left processing by a previous run"""
+    with get_db_cursor() as cursor:
+        cursor.execute(
+            "SELECT job_name, report_path, priority FROM reports WHERE status IN ('queued', 'processing') "
+            "ORDER BY priority DESC, upload_date"
+        )
+        return cursor.fetchall()
 
-        logger.info(f"Stored TSV data for job {job_name}: {len(tsv_data)} files")
+def queue_report(job_name: str, priority: int):
+    """Mark a report as queued for ingest with the given priority"""
+    with get_db_cursor() as cursor:
+        cursor.execute(
+            "UPDATE reports SET status = 'queued', priority = ?, error_message = NULL WHERE job_name = ?",
+            (priority, job_name)
+        )
 
-def store_spatial_data(job_name: str, spatial_data: List[Dict[str, Any]]):
-    """Store spatial data in database"""
+def get_report_status(job_name: str) -> Optional[Dict[str, Any]]:
+    """Get the stored status of a report"""
     with get_db_cursor() as cursor:
-        for data in spatial_data:
-            cursor.execute(
+        cursor.execute(
+            "SELECT job_name, status, priority, error_message, upload_date FROM reports WHERE job_name = ?",
+            (job_name,)
+        )
+        row = cursor.fetchone()
+        if not row:
+            return None
+        return {
+            'job_name': row[0],
+            'status': row[1],
+            'priority': row[2],
+            'error_message': row[3],
+            'upload_date': row[4]
+        }
+
+def batched(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Yield successive lists of at most `size` items from an iterable"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def insert_artifact_type(cursor, job_name: str, file_name: str) -> int:
+    """Insert artifact type metadata for a TSV file and return its id"""
+    # Clean up filename for display
+    artifact_name = file_name.replace('.tsv', '').replace('_', ' ').title()
+    cursor.execute(
+        "INSERT INTO artifact_types (job_name, file_name, artifact_name) VALUES (?, ?, ?)",
+        (job_name, file_name, artifact_name)
+    )
+    return cursor.lastrowid
+
+def get_or_create_artifact_type(cursor, job_name: str, file_name: str) -> int:
+    """Get the artifact type id for a TSV file, inserting it if a previous run did not"""
+    cursor.execute(
+        "SELECT id FROM artifact_types WHERE job_name = ? AND file_name = ?",
+        (job_name, file_name)
+    )
+    result = cursor.fetchone()
+    return result[0] if result else insert_artifact_type(cursor, job_name, file_name)
+
+def delete_artifact_rows(cursor, job_name: str, artifact_type_id: int):
+    """Delete every stored row of an artifact type, e.g. when its source file changed"""
+    # Contentless artifact_words entries are removed by replaying their text, before
+    # the artifact_data delete trigger drops that text from artifact_fts
+    cursor.execute(
+        "INSERT INTO artifact_words (artifact_words, rowid, content) "
+        "SELECT 'delete', rowid, content FROM artifact_fts WHERE rowid IN "
+        "(SELECT id FROM artifact_data WHERE job_name = ? AND artifact_type_id = ?)",
+        (job_name, artifact_type_id)
+    )
+    cursor.execute(
+        "DELETE FROM artifact_data WHERE job_name = ? AND artifact_type_id = ?",
+        (job_name, artifact_type_id)
+    )
+    cursor.execute("DELETE FROM artifact_profiles WHERE artifact_type_id = ?", (artifact_type_id,))
+    drop_filter_indexes(cursor, artifact_type_id)
+    drop_typed_table(cursor, artifact_type_id)
+
+def record_filter_use(artifact_type_id: int, column_key: str, json_path: Optional[str] = None):
+    """Count a filter on an artifact column and index the column once it is filtered often
+
+    Typed artifacts index column_key of their typed table. Untyped rows store the value
+    at json_path of each row in artifact_column_values, so the index holds plain values
+    rather than calls to row_text(). The index is built on a background thread.
+    """
+    key = (artifact_type_id, column_key)
+    with _filter_uses_lock:
+        uses = _filter_uses.get(key, 0) + 1
+        _filter_uses[key] = uses
+    if uses == FILTER_INDEX_MIN_USES:
+        threading.Thread(
+            target=_build_filter_index, args=(artifact_type_id, column_key, json_path),
+            name="filter-index", daemon=True
+        ).start()
+
+def _build_filter_index(artifact_type_id: int, column_key: str, json_path: Optional[str]):
+    """Index one artifact column; runs on its own connection that never waits for locks
+
+    A running ingest just defers the index to a later filter. ANALYZE records the
+    typed index's selectivity so the planner prefers it over scanning the artifact's rows.
+    """
+    with _filter_index_lock:
+        conn = get_db_connection()
+        try:
+            conn.execute("PRAGMA busy_timeout = 0")
+            # The write lock keeps the artifact's rows from being replaced while they are read
+            conn.execute("BEGIN IMMEDIATE")
+            # Profiles are stored once a file is fully ingested; until then indexing would be premature
+            profile = conn.execute(
+                "SELECT row_count FROM artifact_profiles WHERE artifact_type_id = ?", (artifact_type_id,)
+            ).fetchone()
+            if profile is None or profile[0] < FILTER_INDEX_MIN_ROWS:
+                conn.rollback()
+                if profile is None:
+                    _forget_filter_uses(artifact_type_id, column_key)
+                return
+
+            if json_path is None:
+                table_name = typed_table_name(artifact_type_id)
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {table_name}_{column_key} ON {table_name} ({column_key})")
+                conn.execute(f"ANALYZE {table_name}")
+                conn.execute("ANALYZE idx_artifact_data_job_type_row")
+            else:
+                _store_column_values(conn, artifact_type_id, column_key, json_path)
+            conn.commit()
+            logger.info(f"Indexed column {column_key} of artifact {artifact_type_id} for frequent filters")
+        except sqlite3.OperationalError as e:
+            conn.rollback()
+            logger.info(f"Deferred index on column {column_key} of artifact {artifact_type_id}: {e}")
+            _forget_filter_uses(artifact_type_id, column_key)
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Failed to index column {column_key} of artifact {artifact_type_id}: {e}")
+        finally:
+            conn.close()
+
+def _store_column_values(conn, artifact_type_id: int, column_key: str, json_path: str):
+    """Copy one column of an untyped artifact's rows into artifact_column_values"""
+    codec = get_artifact_codec(artifact_type_id, conn.cursor())
+    job_name = conn.execute("SELECT job_name FROM artifact_types WHERE id = ?", (artifact_type_id,)).fetchone()[0]
+    stored_rows = conn.execute(
+        "SELECT row_index, data_json FROM artifact_data WHERE job_name = ? AND artifact_type_id = ?",
+        (job_name, artifact_type_id)
+    )
+    # Rows are decompressed here and the value extracted by SQLite's own json_extract,
+    # so stored values match what filters on the row compare against
+    conn.executemany(
+        "INSERT OR IGNORE INTO artifact_column_values (artifact_type_id, column_key, value, row_index) "
+        "SELECT ?, ?, value, ? FROM (SELECT json_extract(?, ?) AS value) WHERE value IS NOT NULL",
+        (
+            (artifact_type_id, column_key, row_index, codec.stored_text(data), json_path)
+            for row_index, data in stored_rows
+        )
+    )
+    conn.execute(
+        "INSERT OR IGNORE INTO artifact_filter_columns (artifact_type_id, column_key) VALUES (?, ?)",
+        (artifact_type_id, column_key)
+    )
+
+def get_filter_columns(cursor, artifact_type_id: int) -> List[str]:
+    """Column keys of an untyped artifact whose values are indexed in artifact_column_values"""
+    cursor.execute("SELECT column_key FROM artifact_filter_columns WHERE artifact_type_id = ?", (artifact_type_id,))
+    return [row[0] for row in cursor.fetchall()]
+
+def drop_filter_indexes(cursor, artifact_type_id: int):
+    """Drop the stored filter values of an artifact type's rows (typed indexes go with the typed table)"""
+    cursor.execute("DELETE FROM artifact_column_values WHERE artifact_type_id = ?", (artifact_type_id,))
+    cursor.execute("DELETE FROM artifact_filter_columns WHERE artifact_type_id = ?", (artifact_type_id,))
+    _forget_filter_uses(artifact_type_id)
+
+def _forget_filter_uses(artifact_type_id: Optional[int] = None, column_key: Optional[str] = None):
+    """Restart filter counting for one column, one artifact type or (with no arguments) everything"""
+    with _filter_uses_lock:
+        for key in list(_filter_uses):
+            if artifact_type_id is None or (key[0] == artifact_type_id and column_key in (None, key[1])):
+                del _filter_uses[key]
+
+def get_artifact_rows(cursor, job_name: str, artifact_type_id: int, start_index: int, end_index: int) -> List[Tuple[int, Union[str, bytes]]]:
+    """Get stored (row_index, encoded row) pairs for a row range of an artifact type"""
+    cursor.execute(
+        "SELECT row_index, data_json FROM artifact_data "
+        "WHERE job_name = ? AND artifact_type_id = ? AND row_index >= ? AND row_index < ? "
+        "ORDER BY row_index",
+        (job_name, artifact_type_id, start_index, end_index)
+    )
+    return cursor.fetchall()
+
+def insert_artifact_batch(cursor, job_name: str, artifact_type_id: int, batch: List[Tuple[int, Union[str, bytes]]]) -> int:
+    """Insert one batch of (row_index, encoded row) pairs for an artifact type and return the first new id"""
+    cursor.executemany(
+        "INSERT INTO artifact_data (job_name, artifact_type_id, row_index, data_json) VALUES (?, ?, ?, ?)",
+        [(job_name, artifact_type_id, row_index, data_json) for row_index, data_json in batch]
+    )
+    # The transaction holds the write lock, so the batch received consecutive ids
+    return cursor.execute("SELECT last_insert_rowid()").fetchone()[0] - len(batch) + 1
+
+def index_artifact_batch(cursor, first_id: int, rows: List[Dict[str, Any]]):
+    """Add a just-inserted batch of rows to the artifact_fts substring and artifact_words BM25 indexes
+
+    Rows are indexed from the dicts the caller already holds; a per-row trigger
+    decoding data_json again is an order of magnitude slower.
+    """
+    entries = [(row_id, row_search_text(row_data)) for row_id, row_data in enumerate(rows, first_id)]
+    cursor.executemany("INSERT INTO artifact_fts (rowid, content) VALUES (?, ?)", entries)
+    cursor.executemany("INSERT INTO artifact_words (rowid, content) VALUES (?, ?)", entries)
+
+def start_typed_storage(cursor, artifact_type_id: int, codec: RowCodec, sample_rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Create the typed table for a new artifact when TYPED_STORAGE is enabled and return its columns"""
+    if not typed_storage_enabled() or not codec.columns:
+        return []
+    create_typed_table(cursor, artifact_type_id, codec.columns, infer_column_types(codec.columns, sample_rows))
+    return get_typed_columns(cursor, artifact_type_id)
+
+def insert_artifact_rows(cursor, job_name: str, artifact_type_id: int,
+                         rows: Iterable[Dict[str, Any]], start_index: int = 0) -> int:
+    """Insert artifact rows in fixed-size batches and return the number of rows stored"""
+    row_count = 0
+    codec = None
+    typed_columns = []
+    for batch in batched(enumerate(rows, start_index), INSERT_BATCH_SIZE):
+        if codec is None:
+            # The first batch fixes the column order and types and trains any compression dictionary
+            sample_rows = [row_data for _, row_data in batch]
+            codec = RowCodec.train(sample_rows)
+            save_artifact_codec(cursor, artifact_type_id, codec)
+            typed_columns = start_typed_storage(cursor, artifact_type_id, codec, sample_rows)
+        first_id = insert_artifact_batch(
+            cursor, job_name, artifact_type_id,
+            [(row_index, codec.encode(row_data)) for row_index, row_data in batch]
+        )
+        index_artifact_batch(cursor, first_id, [row_data for _, row_data in batch])
+        insert_typed_batch(cursor, artifact_type_id, typed_columns, batch)
+        row_count += len(batch)
+    return row_count
+
+def store_tsv_data(job_name: str, tsv_data: Union[Dict[str, Iterable[Dict[str, Any]]], Iterable[Tuple[str, Iterable[Dict[str, Any]]]]],
+                   cursor=None):
+    """Store TSV data in database, consuming each file's rows as a stream"""
+    if isinstance(tsv_data, dict):
+        tsv_data = tsv_data.items()
+
+    file_count = 0
+    total_rows = 0
+    with _use_cursor(cursor) as cursor:
+        for file_name, rows in tsv_data:
+            artifact_type_id = insert_artifact_type(cursor, job_name, file_name)
+            total_rows += insert_artifact_rows(cursor, job_name, artifact_type_id, rows)
+            file_count += 1
+
+        logger.info(f"Stored TSV data for job {job_name}: {file_count} files, {total_rows} rows")
+
+def store_spatial_data(job_name: str, spatial_data: Iterable[Dict[str, Any]], cursor=None) -> int:
+    """Store spatial data in database and return the number of locations stored
+
+    Coordinates are stored as REAL degrees; triggers add them to the spatial_index R*Tree.
+    """
+    row_count = 0
+    with _use_cursor(cursor) as cursor:
+        for batch in batched(spatial_data, INSERT_BATCH_SIZE):
+            cursor.executemany(
                 "INSERT INTO spatial_data (job_name, timestamp, latitude, longitude, activity, source_artifact) VALUES (?, ?, ?, ?, ?, ?)",
-                (job_name, data.get('timestamp'), data.get('latitude'), data.get('longitude'),
-                 data.get('activity'), data.get('source_artifact'))
+                [(job_name, data.get('timestamp'), parse_latitude(data.get('latitude')), parse_longitude(data.get('longitude')),
+                  data.get('activity'), data.get('source_artifact')) for data in batch]
+            )
+            row_count += len(batch)
+
+        logger.info(f"Stored spatial data for job {job_name}: {row_count} locations")
+    return row_count
+
+def store_timeline_data(job_name: str, timeline_data: Iterable[Dict[str, Any]], cursor=None) -> int:
+    """Store timeline data in database and return the number of events stored
+
+    Each event's key is parsed once into event_time (epoch seconds) for indexed range queries.
+    """
+    row_count = 0
+    with _use_cursor(cursor) as cursor:
+        for batch in batched(timeline_data, INSERT_BATCH_SIZE):
+            cursor.executemany(
+                "INSERT INTO timeline_events (job_name, key, event_time, activity, datalist, source_artifact) VALUES (?, ?, ?, ?, ?, ?)",
+                [(job_name, event.get('key'), to_epoch(event.get('key')), event.get('activity'), event.get('datalist'),
+                  event.get('source_artifact')) for event in batch]
             )
+            row_count += len(batch)
+
+        logger.info(f"Stored timeline data for job {job_name}: {row_count} events")
+    return row_count
+
+def leapp_db_attach_enabled() -> bool:
+    """Whether LEAPP databases are copied by ATTACH (default) rather than parsed row by row (LEAPP_DB_COPY=parse)"""
+    return os.getenv("LEAPP_DB_COPY", "attach").lower() != "parse"
+
+@contextmanager
+def attached_database(cursor, db_path: str, alias: str = LEAPP_SOURCE_ALIAS):
+    """Attach another SQLite file to the cursor's connection for the duration of the block
+
+    ATTACH and DETACH cannot run inside a transaction, so any open transaction is
+    committed first and the block's work is committed (or rolled back) on exit.
+    """
+    conn = cursor.connection
+    conn.commit()
+    cursor.execute(f"ATTACH DATABASE ? AS {alias}", (db_path,))
+    try:
+        yield alias
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute(f"DETACH DATABASE {alias}")
 
-        logger.info(f"Stored spatial data for job {job_name}: {len(spatial_data)} locations")
+def copy_spatial_db(cursor, job_name: str, source: str = LEAPP_SOURCE_ALIAS) -> int:
+    """Copy locations from an attached _latlong.db in one INSERT ... SELECT and return the number copied"""
+    cursor.execute(f'''
+        INSERT INTO spatial_data (job_name, timestamp, latitude, longitude, activity, source_artifact)
+        SELECT ?, timestamp, parse_latitude(latitude), parse_longitude(longitude), activity, '_latlong.db'
+        FROM {source}.data
+    ''', (job_name,))
+    logger.info(f"Copied spatial data for job {job_name}: {cursor.rowcount} locations")
+    return cursor.rowcount
 
-def store_timeline_data(job_name: str, timeline_data: List[Dict[str, Any]]):
-    """Store timeline data in database"""
+def copy_timeline_db(cursor, job_name: str, source: str = LEAPP_SOURCE_ALIAS) -> int:
+    """Copy events from an attached tl.db in one INSERT ... SELECT and return the number copied"""
+    cursor.execute(f'''
+        INSERT INTO timeline_events (job_name, key, event_time, activity, datalist, source_artifact)
+        SELECT ?, key, to_epoch(key), activity, datalist, 'tl.db'
+        FROM {source}.data
+    ''', (job_name,))
+    logger.info(f"Copied timeline data for job {job_name}: {cursor.rowcount} events")
+    return cursor.rowcount
+
+def delete_job_rows(cursor, table: str, job_name: str):
+    """Delete a job's rows from a per-job table before re-storing them"""
+    cursor.execute(f"DELETE FROM {table} WHERE job_name = ?", (job_name,))
+
+# Ingest Checkpoint Functions
+
+def get_ingest_checkpoints(job_name: str) -> Dict[str, Dict[str, Any]]:
+    """Get all ingest checkpoints for a job keyed by file name"""
+    with get_db_cursor() as cursor:
+        cursor.execute(
+            "SELECT file_name, content_hash, stage, rows_stored, rows_embedded FROM ingest_checkpoints WHERE job_name = ?",
+            (job_name,)
+        )
+        return {
+            row[0]: {
+                'content_hash': row[1],
+                'stage': row[2],
+                'rows_stored': row[3],
+                'rows_embedded': row[4]
+            }
+            for row in cursor.fetchall()
+        }
+
+def save_ingest_checkpoint(cursor, job_name: str, file_name: str, content_hash: Optional[str],
+                           stage: str, rows_stored: int, rows_embedded: int = 0):
+    """Create or replace the checkpoint for one file of a job"""
+    cursor.execute('''
+        INSERT OR REPLACE INTO ingest_checkpoints
+            (job_name, file_name, content_hash, stage, rows_stored, rows_embedded, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ''', (job_name, file_name, content_hash, stage, rows_stored, rows_embedded))
+
+def update_checkpoint_progress(cursor, job_name: str, file_name: str, rows_stored: int, stage: str = 'storing'):
+    """Advance the stored-row count of a file checkpoint"""
+    cursor.execute(
+        "UPDATE ingest_checkpoints SET rows_stored = ?, stage = ?, updated_at = CURRENT_TIMESTAMP "
+        "WHERE job_name = ? AND file_name = ?",
+        (rows_stored, stage, job_name, file_name)
+    )
+
+def update_checkpoint_embedded(job_name: str, file_name: str, rows_embedded: int):
+    """Advance the embedded-row count of a file checkpoint"""
+    with get_db_cursor(EMBED_WRITE_BUSY_TIMEOUT_MS) as cursor:
+        cursor.execute(
+            "UPDATE ingest_checkpoints SET rows_embedded = MAX(rows_embedded, ?), updated_at = CURRENT_TIMESTAMP "
+            "WHERE job_name = ? AND file_name = ?",
+            (rows_embedded, job_name, file_name)
+        )
+
+def get_cached_embeddings(model: str, content_hashes: Iterable[bytes]) -> Dict[bytes, bytes]:
+    """Look up cached embedding vectors by document content hash"""
+    content_hashes = list(content_hashes)
+    cached = {}
     with get_db_cursor() as cursor:
-        for event in timeline_data:
+        for i in range(0, len(content_hashes), EMBEDDING_CACHE_LOOKUP_SIZE):
+            batch = content_hashes[i:i + EMBEDDING_CACHE_LOOKUP_SIZE]
+            placeholders = ", ".join("?" * len(batch))
             cursor.execute(
-                "INSERT INTO timeline_events (job_name, key, activity, datalist, source_artifact) VALUES (?, ?, ?, ?, ?)",
-                (job_name, event.get('key'), event.get('activity'), event.get('datalist'),
-                 event.get('source_artifact'))
+                f"SELECT content_hash, embedding FROM embedding_cache WHERE model = ? AND content_hash IN ({placeholders})",
+                [model] + batch
             )
+            cached.update(cursor.fetchall())
+    return cached
 
-        logger.info(f"Stored timeline data for job {job_name}: {len(timeline_data)} events")
+def save_cached_embeddings(model: str, embeddings: List[Tuple[bytes, bytes]]):
+    """Cache (content hash, vector bytes) pairs for reuse by later embeddings"""
+    with get_db_cursor(EMBED_WRITE_BUSY_TIMEOUT_MS) as cursor:
+        cursor.executemany(
+            "INSERT OR IGNORE INTO embedding_cache (content_hash, model, embedding) VALUES (?, ?, ?)",
+            [(content_hash, model, embedding) for content_hash, embedding in embeddings]
+        )
 
 # AI Settings Management Functions
 
@@ -0,0 +1,279 @@
+import logging
+from typing import Callable, List, Tuple, Union
+from utils.geo_utils import parse_latitude, parse_longitude
+from utils.time_utils import to_epoch
+
+logger = logging.getLogger(__name__)
+
+
+def _store_coordinates_as_real(cursor):
+    """Rebuild spatial_data with REAL coordinates and index them in an R*Tree kept in sync by triggers"""
+    # Malformed or out-of-range coordinates become NULL instead of CAST's 0.0
+    cursor.connection.create_function("parse_latitude", 1, parse_latitude, deterministic=True)
+    cursor.connection.create_function("parse_longitude", 1, parse_longitude, deterministic=True)
+    cursor.execute('''
+        CREATE TABLE spatial_data_real (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_name TEXT NOT NULL,                -- Links to reports table
+            timestamp TEXT,                         -- Time of location event
+            latitude REAL,                          -- GPS latitude in degrees, NULL if unparseable
+            longitude REAL,                         -- GPS longitude in degrees, NULL if unparseable
+            activity TEXT,                          -- What was happening at this location
+            source_artifact TEXT,                   -- Which file this data came from
+            FOREIGN KEY (job_name) REFERENCES reports(job_name) ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute('''
+        INSERT INTO spatial_data_real (id, job_name, timestamp, latitude, longitude, activity, source_artifact)
+        SELECT id, job_name, timestamp, parse_latitude(latitude), parse_longitude(longitude), activity, source_artifact
+        FROM spatial_data
+    ''')
+    cursor.execute("DROP TABLE spatial_data")
+    cursor.execute("ALTER TABLE spatial_data_real RENAME TO spatial_data")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_spatial_data_job ON spatial_data (job_name)")
+
+    # Point R*Tree keyed by spatial_data.id; jobs are filtered by joining back on id
+    cursor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS spatial_index USING rtree(id, min_lat, max_lat, min_lon, max_lon)")
+    cursor.execute('''
+        INSERT INTO spatial_index (id, min_lat, max_lat, min_lon, max_lon)
+        SELECT id, latitude, latitude, longitude, longitude FROM spatial_data
+        WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS spatial_data_index_insert AFTER INSERT ON spatial_data
+        WHEN NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL
+        BEGIN
+            INSERT INTO spatial_index (id, min_lat, max_lat, min_lon, max_lon)
+            VALUES (NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS spatial_data_index_delete AFTER DELETE ON spatial_data
+        BEGIN
+            DELETE FROM spatial_index WHERE id = OLD.id;
+        END
+    ''')
+
+
+def _add_timeline_event_time(cursor):
+    """Parse timeline keys once into indexed epoch seconds"""
+    cursor.connection.create_function("to_epoch", 1, to_epoch, deterministic=True)
+    cursor.execute("ALTER TABLE timeline_events ADD COLUMN event_time INTEGER")  # Unix epoch seconds (UTC), NULL if unparseable
+    cursor.execute("UPDATE timeline_events SET event_time = to_epoch(key)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_timeline_events_job_time ON timeline_events (job_name, event_time)")
+
+
+def _index_artifact_text(cursor):
+    """Index artifact row values in a trigram FTS5 table
+
+    New rows are indexed in batches by the ingest (see index_artifact_batch); a trigger
+    removes index entries when their artifact_data rows are deleted.
+    """
+    # Imported here because database.database imports this module
+    from database.database import get_artifact_codec
+
+    # trigram makes LIKE '%pattern%' an index lookup; detail=none keeps the index small
+    cursor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS artifact_fts USING fts5(content, tokenize='trigram', detail=none, columnsize=0)"
+    )
+
+    # row_search_text() is registered by get_db_connection; warm its codecs on this
+    # connection so it never opens a second one while the migration holds the write lock
+    for (artifact_type_id,) in cursor.execute("SELECT id FROM artifact_types").fetchall():
+        get_artifact_codec(artifact_type_id, cursor)
+    cursor.execute(
+        "INSERT INTO artifact_fts (rowid, content) SELECT id, row_search_text(data_json, artifact_type_id) FROM artifact_data"
+    )
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS artifact_data_fts_delete AFTER DELETE ON artifact_data
+        BEGIN
+            DELETE FROM artifact_fts WHERE rowid = OLD.id;
+        END
+    ''')
+
+
+def _profile_artifacts(cursor):
+    """Store column profiles for artifact types ingested before profiles existed"""
+    # Imported here because database.database imports this module
+    from database.database import get_artifact_codec, save_artifact_profile
+    from database.artifact_profile import ArtifactProfiler
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS artifact_profiles (
+            artifact_type_id INTEGER PRIMARY KEY,  -- Links to artifact_types table
+            row_count INTEGER NOT NULL,            -- Rows stored for the artifact type
+            profile_json TEXT NOT NULL,            -- Column null ratios, distinct estimates, time ranges and samples
+            FOREIGN KEY (artifact_type_id) REFERENCES artifact_types(id) ON DELETE CASCADE
+        )
+    ''')
+
+    for (artifact_type_id,) in cursor.execute("SELECT id FROM artifact_types").fetchall():
+        codec = get_artifact_codec(artifact_type_id, cursor)
+        profiler = ArtifactProfiler()
+        stored_rows = cursor.connection.execute(
+            "SELECT data_json FROM artifact_data WHERE artifact_type_id = ? ORDER BY row_index", (artifact_type_id,)
+        )
+        for (data,) in stored_rows:
+            profiler.add([codec.decode(data)])
+        save_artifact_profile(cursor, artifact_type_id, profiler)
+
+
+def _store_filtered_column_values(cursor):
+    """Replace expression indexes over row_text() with indexed tables of extracted column values"""
+    # Expression indexes calling an app-defined function break writes from connections without it
+    index_names = cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND name GLOB 'idx_artifact_filter_*'"
+    ).fetchall()
+    for (index_name,) in index_names:
+        cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS artifact_column_values (
+            artifact_type_id INTEGER NOT NULL,     -- Links to artifact_types table
+            column_key TEXT NOT NULL,              -- Column position, or a digest of the key for legacy rows
+            value NOT NULL,                        -- json_extract of the column (NULLs are not stored)
+            row_index INTEGER NOT NULL,            -- Row in artifact_data
+            PRIMARY KEY (artifact_type_id, column_key, value, row_index)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS artifact_filter_columns (
+            artifact_type_id INTEGER NOT NULL,     -- Links to artifact_types table
+            column_key TEXT NOT NULL,              -- Column whose values are in artifact_column_values
+            PRIMARY KEY (artifact_type_id, column_key)
+        )
+    ''')
+
+
+# Ordered schema migrations: (version, description, SQL statements or a callable taking a cursor).
+# The applied version is tracked in SQLite's user_version pragma, so existing
+# leapp_forensics.db files are upgraded in place on startup. Never edit a released
+# migration; append a new one instead.
+MIGRATIONS: List[Tuple[int, str, Union[List[str], Callable]]] = [
+    (1, "Index per-job lookups on artifact, spatial and timeline tables", [
+        "CREATE INDEX IF NOT EXISTS idx_artifact_data_job_type_row ON artifact_data (job_name, artifact_type_id, row_index)",
+        "CREATE INDEX IF NOT EXISTS idx_spatial_data_job ON spatial_data (job_name)",
+        "CREATE INDEX IF NOT EXISTS idx_timeline_events_job ON timeline_events (job_name)",
+    ]),
+    (2, "Track resumable ingest checkpoints and indexes deferred by bulk loads", [
+        '''
+        CREATE TABLE IF NOT EXISTS ingest_checkpoints (
+            job_name TEXT NOT NULL,                -- Links to reports table
+            file_name TEXT NOT NULL,               -- TSV filename, or _latlong.db / tl.db for those stages
+            content_hash TEXT,                     -- SHA-256 of the source file when it was stored
+            stage TEXT NOT NULL,                   -- storing/stored
+            rows_stored INTEGER DEFAULT 0,         -- Rows committed to SQLite
+            rows_embedded INTEGER DEFAULT 0,       -- Rows written to the vector store
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (job_name, file_name),
+            FOREIGN KEY (job_name) REFERENCES reports(job_name) ON DELETE CASCADE
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS deferred_indexes (
+            name TEXT PRIMARY KEY,                 -- Index dropped for a bulk load
+            sql TEXT NOT NULL                      -- CREATE INDEX statement to rebuild it
+        )
+        ''',
+    ]),
+    (3, "Add ingest queue priority to reports", [
+        "ALTER TABLE reports ADD COLUMN priority INTEGER DEFAULT 0",  # Higher runs first when queued
+        "CREATE INDEX IF NOT EXISTS idx_reports_status ON reports (status)",
+    ]),
+    (4, "Intern column names and store zstd dictionaries per artifact type", [
+        "ALTER TABLE artifact_types ADD COLUMN columns_json TEXT",  # Column names for array-encoded rows
+        "ALTER TABLE artifact_types ADD COLUMN zstd_dict BLOB",     # Trained dictionary when rows are compressed
+    ]),
+    (5, "Record inferred column types for typed artifact tables", [
+        '''
+        CREATE TABLE IF NOT EXISTS artifact_columns (
+            artifact_type_id INTEGER NOT NULL,     -- Links to artifact_types table
+            position INTEGER NOT NULL,             -- Column order; stored as c<position> in typed_artifact_<id>
+            column_name TEXT NOT NULL,             -- Original TSV header
+            data_type TEXT NOT NULL,               -- integer/real/timestamp/text
+            PRIMARY KEY (artifact_type_id, position),
+            FOREIGN KEY (artifact_type_id) REFERENCES artifact_types(id) ON DELETE CASCADE
+        )
+        ''',
+    ]),
+    (6, "Store spatial coordinates as REAL with an R*Tree index", _store_coordinates_as_real),
+    (7, "Add indexed epoch event times to timeline events", _add_timeline_event_time),
+    (8, "Index artifact row values for substring search", _index_artifact_text),
+    (9, "Index artifact row words for BM25 ranking", [
+        # Contentless: the text already lives in artifact_fts, which the 'delete' command reads back
+        "CREATE VIRTUAL TABLE IF NOT EXISTS artifact_words USING fts5(content, content='', tokenize='unicode61 remove_diacritics 2')",
+        "INSERT INTO artifact_words (rowid, content) SELECT rowid, content FROM artifact_fts",
+    ]),
+    (10, "Profile artifact columns for artifact listings", _profile_artifacts),
+    (11, "Cache embeddings by document content hash", [
+        '''
+        CREATE TABLE IF NOT EXISTS embedding_cache (
+            content_hash BLOB NOT NULL,            -- SHA-256 of the normalized document text
+            model TEXT NOT NULL,                   -- Embedding model that produced the vector
+            embedding BLOB NOT NULL,               -- float32 vector bytes
+            PRIMARY KEY (content_hash, model)
+        ) WITHOUT ROWID
+        ''',
+    ]),
+    (12, "Drop cached embeddings not keyed by embedding backend", [
+        # Entries are now keyed "<model>:<backend>"; older ones may come from any backend
+        "DELETE FROM embedding_cache WHERE model NOT LIKE '%:%'",
+    ]),
+    (13, "Index frequently filtered untyped columns through stored values", _store_filtered_column_values),
+    (14, "Key the spatial R*Tree by job", [
+        # The job is a dimension of the tree (reports.id, exact in 32-bit bounds), so lookups only visit the job's points
+        "DROP TRIGGER IF EXISTS spatial_data_index_insert",
+        "DROP TABLE IF EXISTS spatial_index",
+        "CREATE VIRTUAL TABLE spatial_index USING rtree(id, min_job, max_job, min_lat, max_lat, min_lon, max_lon)",
+        '''
+        INSERT INTO spatial_index (id, min_job, max_job, min_lat, max_lat, min_lon, max_lon)
+        SELECT sd.id, r.id, r.id, sd.latitude, sd.latitude, sd.longitude, sd.longitude
+        FROM spatial_data sd
+        JOIN reports r ON r.job_name = sd.job_name
+        WHERE sd.latitude IS NOT NULL AND sd.longitude IS NOT NULL
+        ''',
+        '''
+        CREATE TRIGGER spatial_data_index_insert AFTER INSERT ON spatial_data
+        WHEN NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL
+        BEGIN
+            INSERT INTO spatial_index (id, min_job, max_job, min_lat, max_lat, min_lon, max_lon)
+            SELECT NEW.id, r.id, r.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude
+            FROM reports r WHERE r.job_name = NEW.job_name;
+        END
+        ''',
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(cursor) -> int:
+    """Get the schema version recorded in the database"""
+    return cursor.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(conn):
+    """Apply all pending migrations, each in its own transaction"""
+    cursor = conn.cursor()
+    current_version = get_schema_version(cursor)
+
+    for version, description, migration in MIGRATIONS:
+        if version <= current_version:
+            continue
+
+        logger.info(f"Applying schema migration {version}: {description}")
+        try:
+            cursor.execute("BEGIN")
+            if callable(migration):
+                migration(cursor)
+            else:
+                for statement in migration:
+                    cursor.execute(statement)
+            cursor.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.error(f"Schema migration {version} failed")
+            raise
+
+        current_version = version
@@ -0,0 +1,117 @@
+import os
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    import zstandard
+except ImportError:  # Compression is optional; rows are stored as compact JSON without it
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+ZSTD_DICT_SIZE = 16 * 1024   # Per-artifact dictionary size
+ZSTD_LEVEL = 3
+ZSTD_MIN_SAMPLES = 256       # Rows needed to train a useful dictionary
+EXTRA_VALUES_KEY = "_extra"  # Values beyond the header columns (csv restkey)
+
+
+def compression_enabled() -> bool:
+    """Whether ROW_COMPRESSION=zstd is set and the zstandard package is installed"""
+    return zstandard is not None and os.getenv("ROW_COMPRESSION", "").lower() == "zstd"
+
+
+def row_search_text(row: Dict[Any, Any]) -> str:
+    """Join a row's values as tab-separated text for the full-text index (column names excluded)"""
+    values = []
+    for value in row.values():
+        if isinstance(value, list):
+            values.extend(str(item) for item in value if item is not None)
+        elif value is not None:
+            values.append(str(value))
+    return "\t".join(values)
+
+
+class RowCodec:
+    """Compact encoding for one artifact type's rows
+
+    Column names are interned once per artifact type (artifact_types.columns_json)
+    and each row is stored as a JSON array of values. When a zstd dictionary was
+    trained for the artifact the array is additionally compressed into a BLOB.
+    Legacy rows stored as full JSON objects decode unchanged.
+    """
+
+    def __init__(self, columns: Optional[List[str]] = None, zstd_dict: Optional[bytes] = None):
+        self.columns = columns
+        self.zstd_dict = zstd_dict
+        self._local = threading.local()  # zstd contexts are not thread-safe
+
+    @classmethod
+    def train(cls, sample_rows: List[Dict[str, Any]]) -> 'RowCodec':
+        """Build a codec from the first rows of an artifact, training a zstd dictionary if enabled"""
+        columns = [key for key in sample_rows[0].keys() if key is not None] if sample_rows else []
+        codec = cls(columns)
+
+        if compression_enabled() and len(sample_rows) >= ZSTD_MIN_SAMPLES:
+            samples = [codec._pack(row).encode('utf-8') for row in sample_rows]
+            try:
+                codec.zstd_dict = zstandard.train_dictionary(ZSTD_DICT_SIZE, samples).as_bytes()
+            except zstandard.ZstdError as e:
+                logger.info(f"Storing rows uncompressed, could not train zstd dictionary: {e}")
+
+        return codec
+
+    def _pack(self, row: Dict[str, Any]) -> str:
+        """Serialize a row as a compact JSON array of values in column order"""
+        values = [row.get(column) for column in self.columns]
+        extra_values = row.get(None)
+        if extra_values:
+            values.append(extra_values)
+        return json.dumps(values, ensure_ascii=False, separators=(',', ':'))
+
+    def _zstd(self, name: str):
+        """Get this thread's zstd compressor or decompressor"""
+        context = getattr(self._local, name, None)
+        if context is None:
+            dictionary = zstandard.ZstdCompressionDict(self.zstd_dict)
+            if name == "compressor":
+                context = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dictionary)
+            else:
+                context = zstandard.ZstdDecompressor(dict_data=dictionary)
+            setattr(self._local, name, context)
+        return context
+
+    def encode(self, row: Dict[str, Any]) -> Union[str, bytes]:
+        """Encode a row for the artifact_data.data_json column"""
+        if self.columns is None:
+            return json.dumps(row)
+
+        packed = self._pack(row)
+        if self.zstd_dict:
+            return self._zstd("compressor").compress(packed.encode('utf-8'))
+        return packed
+
+    def stored_text(self, data: Union[str, bytes]) -> str:
+        """Get the uncompressed JSON text of a stored row (values only for array-encoded rows)"""
+        if isinstance(data, bytes):
+            if zstandard is None:
+                raise RuntimeError("Row is zstd-compressed but the zstandard package is not installed")
+            return self._zstd("decompressor").decompress(data).decode('utf-8')
+        return data
+
+    def decode(self, data: Union[str, bytes]) -> Dict[str, Any]:
+        """Decode a stored row back into a column -> value dictionary"""
+        values = json.loads(self.stored_text(data))
+        if isinstance(values, dict):
+            return values
+
+        columns = self.columns or []
+        row = dict(zip(columns, values))
+        if len(values) > len(columns):
+            row[EXTRA_VALUES_KEY] = values[len(columns)]
+        return row
+
+    def search_text(self, data: Union[str, bytes]) -> str:
+        """Get a stored row's values as text for the full-text index"""
+        return row_search_text(self.decode(data))
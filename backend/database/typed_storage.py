@@ -0,0 +1,135 @@
+import os
+import re
+import logging
+from typing import Any, Dict, List
+from utils.time_utils import normalize_timestamp
+
+logger = logging.getLogger(__name__)
+
+TYPED_TABLE_PREFIX = "typed_artifact_"
+
+# Inferred column types; timestamps are stored as normalized 'YYYY-MM-DD HH:MM:SS' text
+TYPE_INTEGER = "integer"
+TYPE_REAL = "real"
+TYPE_TIMESTAMP = "timestamp"
+TYPE_TEXT = "text"
+SQL_TYPES = {TYPE_INTEGER: "INTEGER", TYPE_REAL: "REAL", TYPE_TIMESTAMP: "TEXT", TYPE_TEXT: "TEXT"}
+
+# Leading zeros (phone numbers, zip codes) would be lost as integers, so they stay text
+INTEGER_PATTERN = re.compile(r'^-?(0|[1-9]\d{0,17})$')
+REAL_PATTERN = re.compile(r'^-?\d+\.\d+([eE][-+]?\d+)?$')
+
+
+def typed_storage_enabled() -> bool:
+    """Whether TYPED_STORAGE is set, storing each artifact type in its own typed table as well"""
+    return os.getenv("TYPED_STORAGE", "").lower() in ("1", "true", "yes")
+
+
+def typed_table_name(artifact_type_id: int) -> str:
+    """Get the typed table name for an artifact type"""
+    return f"{TYPED_TABLE_PREFIX}{int(artifact_type_id)}"
+
+
+def _value_matches(value: str, column_type: str) -> bool:
+    """Whether a non-empty text value can be stored as the given type"""
+    if column_type == TYPE_INTEGER:
+        return bool(INTEGER_PATTERN.match(value))
+    if column_type == TYPE_REAL:
+        return bool(INTEGER_PATTERN.match(value) or REAL_PATTERN.match(value))
+    if column_type == TYPE_TIMESTAMP:
+        return normalize_timestamp(value) is not None
+    return True
+
+
+def infer_column_type(values: List[Any]) -> str:
+    """Infer the narrowest type every non-empty sample value fits"""
+    samples = [value.strip() for value in values if isinstance(value, str) and value.strip()]
+    if not samples:
+        return TYPE_TEXT
+    for column_type in (TYPE_INTEGER, TYPE_REAL, TYPE_TIMESTAMP):
+        if all(_value_matches(value, column_type) for value in samples):
+            return column_type
+    return TYPE_TEXT
+
+
+def infer_column_types(columns: List[str], sample_rows: List[Dict[str, Any]]) -> List[str]:
+    """Infer a type per column from the first batch of an artifact's rows"""
+    return [infer_column_type([row.get(column) for row in sample_rows]) for column in columns]
+
+
+def convert_value(value: Any, column_type: str) -> Any:
+    """Convert a TSV value for its typed column; values that do not fit are kept as text"""
+    if not isinstance(value, str):
+        return value
+    stripped = value.strip()
+    if not stripped:
+        return None
+    if column_type == TYPE_TEXT:
+        return value
+    if not _value_matches(stripped, column_type):
+        return value
+    if column_type == TYPE_INTEGER:
+        return int(stripped)
+    if column_type == TYPE_REAL:
+        return float(stripped)
+    return normalize_timestamp(stripped)
+
+
+def create_typed_table(cursor, artifact_type_id: int, columns: List[str], column_types: List[str]):
+    """Create the typed table for an artifact type and record its column metadata"""
+    drop_typed_table(cursor, artifact_type_id)
+    table_name = typed_table_name(artifact_type_id)
+
+    # Columns are stored as c0..cN; the original names live in artifact_columns
+    column_defs = ", ".join(f"c{position} {SQL_TYPES[column_type]}" for position, column_type in enumerate(column_types))
+    cursor.execute(f"CREATE TABLE {table_name} (row_index INTEGER PRIMARY KEY{', ' if column_defs else ''}{column_defs})")
+    cursor.executemany(
+        "INSERT INTO artifact_columns (artifact_type_id, position, column_name, data_type) VALUES (?, ?, ?, ?)",
+        [(artifact_type_id, position, column, column_type)
+         for position, (column, column_type) in enumerate(zip(columns, column_types))]
+    )
+
+    # Timestamps are the usual sort and range key, so they are indexed up front
+    for position, column_type in enumerate(column_types):
+        if column_type == TYPE_TIMESTAMP:
+            cursor.execute(f"CREATE INDEX {table_name}_c{position} ON {table_name} (c{position})")
+
+
+def drop_typed_table(cursor, artifact_type_id: int):
+    """Drop an artifact type's typed table and column metadata"""
+    cursor.execute(f"DROP TABLE IF EXISTS {typed_table_name(artifact_type_id)}")
+    cursor.execute("DELETE FROM artifact_columns WHERE artifact_type_id = ?", (artifact_type_id,))
+
+
+def drop_all_typed_tables(cursor):
+    """Drop every typed artifact table, e.g. when resetting the database"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE ?", (f"{TYPED_TABLE_PREFIX}%",))
+    for (table_name,) in cursor.fetchall():
+        cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
+
+
+def get_typed_columns(cursor, artifact_type_id: int) -> List[Dict[str, Any]]:
+    """Get the typed columns of an artifact type in position order (empty if it has no typed table)"""
+    cursor.execute(
+        "SELECT position, column_name, data_type FROM artifact_columns WHERE artifact_type_id = ? ORDER BY position",
+        (artifact_type_id,)
+    )
+    return [
+        {"position": row[0], "name": row[1], "type": row[2], "sql_name": f"c{row[0]}"}
+        for row in cursor.fetchall()
+    ]
+
+
+def insert_typed_batch(cursor, artifact_type_id: int, typed_columns: List[Dict[str, Any]], rows: List[tuple]):
+    """Insert (row_index, row dict) pairs into an artifact type's typed table"""
+    if not typed_columns:
+        return
+    column_names = ", ".join(column["sql_name"] for column in typed_columns)
+    placeholders = ", ".join(["?"] * (len(typed_columns) + 1))
+    cursor.executemany(
+        f"INSERT OR REPLACE INTO {typed_table_name(artifact_type_id)} (row_index, {column_names}) VALUES ({placeholders})",
+        [
+            (row_index, *(convert_value(row_data.get(column["name"]), column["type"]) for column in typed_columns))
+            for row_index, row_data in rows
+        ]
+    )
@@ -1,5 +1,4 @@
 import time
-import threading
 import json
 from typing import Optional
 from pydantic import BaseModel
@@ -7,19 +6,24 @@ from dotenv import load_dotenv
 from services.agent_service import agent_service
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import StreamingResponse
-from database.database import init_database, insert_report_metadata
-from utils.processing_utils import validate_leapp_directory, process_leapp_report
+from utils.processing_utils import validate_leapp_directory
 from services.settings_service import settings_service
 from services.chroma_service import chroma_service
-from database.database import init_database, insert_report_metadata, reset_database
+from services.ingest_scheduler import ingest_scheduler
+from tools.result_cache import tool_result_cache
+from database.database import init_database, insert_report_metadata, reset_database, find_resumable_report, get_report_status, delete_report
 
 load_dotenv()
 app = FastAPI()
 
 init_database()
 
+# Start ingest workers; queued or interrupted reports resume from their checkpoints
+ingest_scheduler.start()
+
 class UploadRequest(BaseModel):
     directory_path: str
+    priority: int = 0
 
 class ChatRequest(BaseModel):
     message: str
@@ -37,14 +41,58 @@ async def upload_report(request: UploadRequest):
     if not validate_leapp_directory(request.directory_path):
         raise HTTPException(status_code=400, detail="Invalid LEAPP report directory: No TSV, KML or Timeline directory found")
 
-    job_name = f"report_{int(time.time())}"
-    insert_report_metadata(job_name, request.directory_path)
+    # Re-submitting an unfinished report resumes it from its checkpoints
+    job_name = find_resumable_report(request.directory_path)
+    if not job_name:
+        job_name = f"report_{int(time.time())}"
+        insert_report_metadata(job_name, request.directory_path)
 
-    # Start background processing
-    threading.Thread(target=process_leapp_report, args=(job_name, request.directory_path)).start()
+    # Queue for background processing by the ingest worker pool
+    ingest_scheduler.submit(job_name, request.directory_path, request.priority)
+    tool_result_cache.invalidate(job_name)
     return {"success": True, "job_name": job_name}
 
 
+@app.get("/jobs")
+async def list_jobs():
+    """List queued and running ingest jobs"""
+    return {"success": True, **ingest_scheduler.list_jobs()}
+
+
+@app.get("/jobs/{job_name}")
+async def get_job(job_name: str):
+    """Get ingest status and progress (stage, rows processed, rows/sec, ETA) for a job"""
+    report = get_report_status(job_name)
+    if not report:
+        raise HTTPException(status_code=404, detail=f"Job '{job_name}' not found")
+
+    progress = ingest_scheduler.get_progress(job_name)
+    return {"success": True, **report, "progress": progress}
+
+
+@app.post("/jobs/{job_name}/cancel")
+async def cancel_job(job_name: str):
+    """Cancel a queued or running ingest job"""
+    if not ingest_scheduler.cancel(job_name):
+        raise HTTPException(status_code=404, detail=f"Job '{job_name}' is not queued or running")
+    tool_result_cache.invalidate(job_name)
+    return {"success": True, "message": f"Cancellation requested for {job_name}"}
+
+
+@app.delete("/reports/{job_name}")
+async def delete_report_data(job_name: str):
+    """Delete a report's stored data and drop its vector collection"""
+    if ingest_scheduler.is_active(job_name):
+        raise HTTPException(status_code=409, detail=f"Job '{job_name}' is still queued or running; cancel it first")
+    if not delete_report(job_name):
+        raise HTTPException(status_code=404, detail=f"Report '{job_name}' not found")
+
+    chroma_service.delete_job(job_name)
+    ingest_scheduler.forget(job_name)
+    tool_result_cache.invalidate(job_name)
+    return {"success": True, "message": f"Deleted report {job_name}"}
+
+
 @app.post("/chat")
 async def chat_with_ai(request: ChatRequest):
     """Chat with AI assistant for forensic analysis - real-time streaming"""
@@ -75,6 +123,12 @@ async def chat_with_ai(request: ChatRequest):
     )
 
 
+@app.get("/tools/cache")
+async def get_tool_cache_stats():
+    """Get tool result cache hit/miss counters"""
+    return {"success": True, **tool_result_cache.stats()}
+
+
 @app.get("/settings")
 async def get_settings():
     """Get all AI settings"""
@@ -118,6 +172,7 @@ async def clear_data():
     try:
         reset_database()
         chroma_service.reset_collection()
+        tool_result_cache.invalidate()
         return {"success": True, "message": "All data cleared successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to clear data: {str(e)}")
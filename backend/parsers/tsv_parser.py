@@ -1,38 +1,147 @@
 import os
 import csv
+import time
 import logging
-from typing import List, Dict, Any
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 
 csv.field_size_limit(10000000)  # 10MB
 logger = logging.getLogger(__name__)
 
-def parse_tsv(file_path: str) -> List[Dict[str, Any]]:
-    """Parse a TSV file and return list of dictionaries"""
+PARALLEL_PARSE_MAX_FILE_BYTES = 16 * 1024 * 1024  # Larger files are streamed in the calling process
+PARALLEL_PARSE_WINDOW_BYTES = 128 * 1024 * 1024   # Source bytes of files parsed by workers at once
+
+def parse_tsv(file_path: str, skip_rows: int = 0) -> Iterator[Dict[str, Any]]:
+    """Parse a TSV file and return an iterator of row dictionaries, optionally skipping leading rows"""
     if not os.path.exists(file_path):
         logger.error(f"TSV file not found: {file_path}")
         raise FileNotFoundError(f"TSV file not found {file_path}")
 
+    return _iter_tsv_rows(file_path, skip_rows)
+
+
+def _iter_tsv_rows(file_path: str, skip_rows: int = 0) -> Iterator[Dict[str, Any]]:
+    """Stream rows from a TSV file one at a time so memory stays flat"""
     logger.debug(f"Parsing TSV file: {file_path}")
+    row_count = 0
     with open(file_path) as tsv_file:
         reader = csv.DictReader(tsv_file, delimiter='\t')
-        data = list(reader)
-        logger.info(f"Parsed {len(data)} rows from {file_path}")
-        return data
+        for row in islice(reader, skip_rows, None):
+            row_count += 1
+            yield row
+    logger.info(f"Parsed {row_count} rows from {file_path}")
+
 
+def list_tsv_files(directory_path: str) -> List[str]:
+    """List TSV file names in a directory in a stable order"""
+    return [name for name in sorted(os.listdir(directory_path)) if name.endswith('.tsv')]
 
-def parse_tsv_directory(directory_path: str) -> Dict[str, List[Dict[str, Any]]]:
-    """Parse all TSV files in a directory and return filename -> data mapping"""
+
+def parse_tsv_directory(directory_path: str, file_names: Optional[Iterable[str]] = None,
+                        skip_rows: Optional[Dict[str, int]] = None) -> Iterator[Tuple[str, Iterator[Dict[str, Any]]]]:
+    """Parse TSV files in a directory and yield (filename, row iterator) pairs
+
+    `file_names` restricts parsing to those files and `skip_rows` maps file names to a
+    number of leading rows to skip, which lets a resumed ingest continue mid-file.
+    """
     if not os.path.exists(directory_path):
         logger.error(f"LEAPP directory not found: {directory_path}")
         raise FileNotFoundError(f"LEAPP Directory not found {directory_path}")
 
+    if file_names is None:
+        file_names = list_tsv_files(directory_path)
+    return _iter_tsv_directory(directory_path, list(file_names), skip_rows or {})
+
+
+def _iter_tsv_directory(directory_path: str, file_names: List[str],
+                        skip_rows: Dict[str, int]) -> Iterator[Tuple[str, Iterator[Dict[str, Any]]]]:
+    """Lazily walk a TSV directory, one file at a time"""
     logger.info(f"Parsing TSV directory: {directory_path}")
-    results = {}
-    for file_name in os.listdir(directory_path):
-        if file_name.endswith('.tsv'):
-            file_path = os.path.join(directory_path, file_name)
-            results[file_name] = parse_tsv(file_path)
-
-    total_rows = sum(len(data) for data in results.values())
-    logger.info(f"Parsed {len(results)} TSV files with {total_rows} total rows")
-    return results
\ No newline at end of file
+    file_count = 0
+    for file_name in file_names:
+        file_path = os.path.join(directory_path, file_name)
+        file_count += 1
+        yield file_name, parse_tsv(file_path, skip_rows.get(file_name, 0))
+
+    logger.info(f"Parsed {file_count} TSV files from {directory_path}")
+
+
+def _parse_tsv_file(file_path: str, skip_rows: int = 0) -> Tuple[List[Dict[str, Any]], float]:
+    """Parse a whole TSV file inside a worker process and time it"""
+    start_time = time.time()
+    rows = list(_iter_tsv_rows(file_path, skip_rows))
+    return rows, time.time() - start_time
+
+
+def parse_tsv_directory_parallel(directory_path: str, max_workers: Optional[int] = None,
+                                 stats: Optional[List[Dict[str, Any]]] = None,
+                                 file_names: Optional[Iterable[str]] = None,
+                                 skip_rows: Optional[Dict[str, int]] = None) -> Iterator[Tuple[str, Iterable[Dict[str, Any]]]]:
+    """Parse TSV files concurrently in a process pool and yield (filename, rows) as each file finishes
+
+    Workers return whole files, so only files up to PARALLEL_PARSE_MAX_FILE_BYTES go to the
+    pool, and only while the files in flight total under PARALLEL_PARSE_WINDOW_BYTES. Larger
+    files are streamed in this process while the workers keep parsing, so memory stays
+    bounded however large an artifact is. Per-file timings are appended to `stats`.
+    """
+    if not os.path.exists(directory_path):
+        logger.error(f"LEAPP directory not found: {directory_path}")
+        raise FileNotFoundError(f"LEAPP Directory not found {directory_path}")
+
+    if file_names is None:
+        file_names = list_tsv_files(directory_path)
+    return _iter_tsv_directory_parallel(directory_path, max_workers or os.cpu_count() or 1, stats,
+                                        list(file_names), skip_rows or {})
+
+
+def _timed_rows(file_name: str, rows: Iterator[Dict[str, Any]],
+                stats: Optional[List[Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+    """Stream rows and record the file's row count and parse time once it is exhausted"""
+    start_time = time.time()
+    row_count = 0
+    for row in rows:
+        row_count += 1
+        yield row
+    if stats is not None:
+        stats.append({"file_name": file_name, "rows": row_count, "parse_seconds": time.time() - start_time})
+
+
+def _iter_tsv_directory_parallel(directory_path: str, max_workers: int, stats: Optional[List[Dict[str, Any]]],
+                                 pending_files: List[str], skip_rows: Dict[str, int]) -> Iterator[Tuple[str, Iterable[Dict[str, Any]]]]:
+    """Feed small TSV files to a process pool with a bounded window and stream large ones"""
+    logger.info(f"Parsing TSV directory with {max_workers} workers: {directory_path}")
+    sizes = {file_name: os.path.getsize(os.path.join(directory_path, file_name)) for file_name in pending_files}
+    large_files = [file_name for file_name in pending_files if sizes[file_name] > PARALLEL_PARSE_MAX_FILE_BYTES]
+    pending_files = [file_name for file_name in pending_files if sizes[file_name] <= PARALLEL_PARSE_MAX_FILE_BYTES]
+    max_in_flight = max_workers * 2
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = {}
+        in_flight_bytes = 0
+        while pending_files or in_flight or large_files:
+            # Top up the window before waiting on results (one file is always allowed)
+            while (pending_files and len(in_flight) < max_in_flight
+                   and (not in_flight or in_flight_bytes + sizes[pending_files[0]] <= PARALLEL_PARSE_WINDOW_BYTES)):
+                file_name = pending_files.pop(0)
+                future = executor.submit(_parse_tsv_file, os.path.join(directory_path, file_name),
+                                         skip_rows.get(file_name, 0))
+                in_flight[future] = file_name
+                in_flight_bytes += sizes[file_name]
+
+            # Large files are consumed here while the workers parse the small ones
+            if large_files:
+                file_name = large_files.pop(0)
+                rows = parse_tsv(os.path.join(directory_path, file_name), skip_rows.get(file_name, 0))
+                yield file_name, _timed_rows(file_name, rows, stats)
+                continue
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                file_name = in_flight.pop(future)
+                in_flight_bytes -= sizes[file_name]
+                rows, parse_seconds = future.result()
+                logger.info(f"Parsed {len(rows)} rows from {file_name} in {parse_seconds:.2f} seconds")
+                if stats is not None:
+                    stats.append({"file_name": file_name, "rows": len(rows), "parse_seconds": parse_seconds})
+                yield file_name, rows
@@ -0,0 +1,91 @@
+"""Embedding throughput benchmark
+
+Embeds the same rows with each embedding backend and reports rows/sec, to size
+ingest hosts. Rows come from a stored report (--job) or are generated to look
+like typical artifact rows.
+
+    python scripts/benchmark_embeddings.py --rows 2000 --threads 4
+    python scripts/benchmark_embeddings.py --job my_report --backends onnx-int8 onnx
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from services.embedding_backends import BACKENDS, create_embedding_backend, detect_device
+from utils.document_renderer import render_row
+
+
+def synthetic_rows(count: int) -> List[str]:
+    """Rows shaped like parsed LEAPP artifacts (timestamps, identifiers, short text)"""
+    random.seed(0)
+    words = ["message", "call", "location", "wifi", "bluetooth", "photo", "safari", "notes",
+             "contact", "calendar", "meeting", "download", "install", "cafe", "airport"]
+    rows = []
+    for i in range(count):
+        rows.append(render_row({
+            "Timestamp": f"2023-05-{1 + i % 28:02d} {i % 24:02d}:{i % 60:02d}:00",
+            "Bundle ID": f"com.apple.{random.choice(words)}",
+            "Contact": f"+1555{random.randint(1000000, 9999999)}",
+            "Message": " ".join(random.choice(words) for _ in range(random.randint(3, 25))),
+            "Duration": str(random.randint(0, 3600))
+        }))
+    return rows
+
+
+def report_rows(job_name: str, count: int) -> List[str]:
+    """The first stored rows of a report, rendered like the ingest pipeline does"""
+    from database.database import get_db_cursor, decode_artifact_row
+    with get_db_cursor() as cursor:
+        cursor.execute(
+            "SELECT artifact_type_id, data_json FROM artifact_data WHERE job_name = ? "
+            "ORDER BY artifact_type_id, row_index LIMIT ?",
+            (job_name, count)
+        )
+        return [render_row(decode_artifact_row(atid, data_json)) for atid, data_json in cursor.fetchall()]
+
+
+def benchmark(backend_name: str, rows: List[str], threads: int, device: str, batch_size: int) -> None:
+    try:
+        backend = create_embedding_backend(backend_name, device=device, threads=threads)
+        started = time.perf_counter()
+        backend.embed(rows[:1])
+        load_seconds = time.perf_counter() - started
+    except Exception as e:
+        print(f"{backend_name:<22} unavailable: {e}")
+        return
+
+    started = time.perf_counter()
+    for i in range(0, len(rows), batch_size):
+        backend.embed(rows[i:i + batch_size])
+    seconds = time.perf_counter() - started
+    print(f"{backend.name:<22} {backend.device:<6} {len(rows) / seconds:>10.1f} rows/sec  "
+          f"({len(rows)} rows in {seconds:.2f}s, load {load_seconds:.2f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark embedding backends")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--rows", type=int, default=1000, help="Rows to embed per backend")
+    parser.add_argument("--job", help="Embed rows from this stored report instead of synthetic rows")
+    parser.add_argument("--threads", type=int, default=0, help="Inference threads (0 uses the runtime default)")
+    parser.add_argument("--batch-size", type=int, default=100, help="Rows per embed call (ingest batches are sized adaptively between 16 and 1024)")
+    parser.add_argument("--device", default=None, help="Device for sentence-transformers (default: auto-detect)")
+    args = parser.parse_args()
+
+    rows = report_rows(args.job, args.rows) if args.job else synthetic_rows(args.rows)
+    if not rows:
+        parser.error(f"No rows found for report '{args.job}'")
+
+    device = args.device or detect_device()
+    print(f"{len(rows)} rows, device {device}, {args.threads or 'default'} threads, {os.cpu_count()} CPUs")
+    for backend_name in args.backends:
+        benchmark(backend_name, rows, args.threads or None, device, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
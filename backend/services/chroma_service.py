@@ -1,17 +1,48 @@
 import os
+import re
+import hashlib
 import chromadb
 import logging
-from typing import List, Dict, Any, Optional
-from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from chromadb.errors import NotFoundError
+from typing import List, Dict, Any, Optional, Tuple
+from services.embedding_backends import create_embedding_backend, DEFAULT_MODEL
+from services.embedding_workers import embedding_worker_pool
+from database.database import get_cached_embeddings, save_cached_embeddings
+from utils.hash_utils import hash_document_text
+from utils.document_renderer import build_chunks
 
-COLLECTION_NAME = "artifact_chunks"
-BATCH_SIZE = 100
-DEFAULT_MODEL = "all-MiniLM-L6-v2"
+LEGACY_COLLECTION_NAME = "artifact_chunks"  # Shared collection of all reports, before per-report collections
+COLLECTION_PREFIX = "chunks_"
+MAX_QUERY_WORKERS = 8                        # Report collections queried concurrently by cross-report searches
 
 logger = logging.getLogger(__name__)
 
 
+def collection_name(job_name: str) -> str:
+    """Name of a report's chunk collection
+
+    Chroma names allow letters, digits, '_' and '-' and must end alphanumerically, so
+    other job names are sanitized and suffixed with a hash to stay unique.
+    """
+    safe_name = re.sub(r"[^a-zA-Z0-9_-]", "_", job_name)[:200]
+    if safe_name != job_name or not safe_name[-1:].isalnum():
+        safe_name += "_" + hashlib.sha1(job_name.encode("utf-8")).hexdigest()[:8]
+    return f"{COLLECTION_PREFIX}{safe_name}"
+
+
 class ChromaService:
+    """Vector store with one Chroma collection per report
+
+    Searching one report queries only its collection, so no metadata filter is needed
+    and the index does not slow down as other reports accumulate. Cross-report searches
+    fan out to every collection in parallel and merge by distance. Deleting a report
+    drops its collection. Stores created with the shared artifact_chunks collection are
+    moved into per-report collections in the background and stay searchable meanwhile.
+    """
+
     def __init__(self, persist_directory: str = None):
         """Initialize ChromaDB service with persistent storage"""
         if persist_directory is None:
@@ -23,21 +54,102 @@ class ChromaService:
         # Initialize ChromaDB client
         self.client = chromadb.PersistentClient(path=persist_directory)
 
-        # Initialize embedding function with MPS GPU support 
-        self.embedding_function = SentenceTransformerEmbeddingFunction(
-            model_name=DEFAULT_MODEL,
-            device='mps'
-        )
+        # Embeddings are computed by the configured backend and passed to Chroma, so the
+        # collection does not depend on which backend (or device) produced them.
+        # Ingest batches go to the embedding worker processes; this in-process backend
+        # embeds queries (and everything when EMBEDDING_WORKERS is 0)
+        self.embedder = create_embedding_backend()
+        # Backends of the same model still produce different vectors (int8 vs fp32, torch
+        # vs ONNX), so cached embeddings are keyed by both
+        self.embedding_cache_key = f"{DEFAULT_MODEL}:{self.embedder.name}"
 
-        # Get or create collection
-        self.collection = self.client.get_or_create_collection(
-            name=COLLECTION_NAME,
-            embedding_function=self.embedding_function,
-            metadata={"description": "LEAPP forensic report artifact chunks"}
-        )
+        # Router from job name to its collection
+        self._collections: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+        self._legacy_collection = self._get_legacy_collection()
+        if self._legacy_collection is not None:
+            threading.Thread(target=self._migrate_legacy_collection, name="chroma-migration", daemon=True).start()
+
+    def _get_legacy_collection(self):
+        """The shared pre-sharding collection, if this store still has one"""
+        try:
+            return self.client.get_collection(LEGACY_COLLECTION_NAME, embedding_function=None)
+        except NotFoundError:
+            return None
+
+    def _job_collection(self, job_name: str, create: bool = False):
+        """Route a job to its collection (embeddings are always supplied by the caller)"""
+        with self._lock:
+            collection = self._collections.get(job_name)
+            if collection is not None:
+                return collection
+
+            if create:
+                collection = self.client.get_or_create_collection(
+                    name=collection_name(job_name),
+                    embedding_function=None,
+                    metadata={"description": "LEAPP forensic report artifact chunks", "job_name": job_name}
+                )
+            else:
+                try:
+                    collection = self.client.get_collection(collection_name(job_name), embedding_function=None)
+                except NotFoundError:
+                    return None
+            self._collections[job_name] = collection
+            return collection
+
+    def _all_job_collections(self) -> List[Any]:
+        """Every report's collection"""
+        return [
+            collection for collection in self.client.list_collections()
+            if collection.name.startswith(COLLECTION_PREFIX)
+        ]
+
+    def _migrate_legacy_collection(self):
+        """Move chunks from the shared collection into per-report collections, then drop it"""
+        legacy = self._legacy_collection
+        page_size = self.client.get_max_batch_size()
+        try:
+            job_names = set()
+            for offset in range(0, legacy.count(), page_size):
+                page = legacy.get(limit=page_size, offset=offset, include=["metadatas"])
+                job_names.update(metadata.get("job_name") for metadata in page["metadatas"] if metadata)
+
+            for job_name in sorted(name for name in job_names if name):
+                moved = 0
+                while True:
+                    # Each page is copied under the lock so a concurrent delete of the job wins
+                    with self._lock:
+                        if self._legacy_collection is None:
+                            return
+                        page = legacy.get(where={"job_name": job_name}, limit=page_size, offset=moved,
+                                          include=["embeddings", "documents", "metadatas"])
+                        if not page["ids"]:
+                            break
+                        self._job_collection(job_name, create=True).upsert(
+                            ids=page["ids"],
+                            embeddings=page["embeddings"],
+                            documents=page["documents"],
+                            metadatas=page["metadatas"]
+                        )
+                    moved += len(page["ids"])
+                logger.info(f"Moved {moved} chunks of {job_name} to their own collection")
+
+            with self._lock:
+                if self._legacy_collection is not None:
+                    self.client.delete_collection(LEGACY_COLLECTION_NAME)
+                    self._legacy_collection = None
+            logger.info("Finished moving chunks out of the shared collection")
+        except Exception as e:
+            logger.error(f"Failed to move chunks out of the shared collection: {e}")
 
     def embed_and_store_chunks(self, job_name: str, chunks_data: List[Dict[str, Any]]) -> bool:
-        """Embed and store chunks in ChromaDB"""
+        """Embed and store rows in ChromaDB
+
+        Each item carries job_name, artifact_type_id, row_index, file_name and the row
+        dict, which is rendered into compact, token-limited documents before embedding.
+        """
         try:
             if not chunks_data:
                 return True
@@ -47,28 +159,39 @@ class ChromaService:
             metadatas = []
             ids = []
 
-            for chunk in chunks_data:
-                # Use the JSON data as document
-                document = chunk['data_json']
-                documents.append(document)
+            for chunk in build_chunks(chunks_data, self.embedder.count_tokens):
+                documents.append(chunk['document'])
 
-                # Prepare metadata
+                # Prepare metadata; merged short rows cover row_index..row_end, split long rows have parts
                 metadata = {
                     'job_name': chunk['job_name'],
                     'artifact_type_id': chunk['artifact_type_id'],
                     'row_index': chunk['row_index'],
-                    'file_name': chunk.get('file_name', 'unknown')
+                    'row_end': chunk['row_end'],
+                    'part': chunk['part'],
+                    'file_name': chunk['file_name']
                 }
                 metadatas.append(metadata)
 
                 # Create unique ID
                 chunk_id = f"{job_name}_{chunk['artifact_type_id']}_{chunk['row_index']}"
+                if chunk['part']:
+                    chunk_id += f"_{chunk['part']}"
                 ids.append(chunk_id)
 
-            # Add to collection in batches to avoid memory issues
-            for i in range(0, len(documents), BATCH_SIZE):
-                batch_end = min(i + BATCH_SIZE, len(documents))
-                self.collection.add(
+            if not documents:
+                return True
+
+            embeddings = self._embed_documents(job_name, documents)
+
+            # Write vectors back in the largest batches Chroma accepts; re-embedding a resumed batch is harmless
+            collection = self._job_collection(job_name, create=True)
+            self._delete_stale_chunks(collection, chunks_data, set(ids))
+            upsert_size = self.client.get_max_batch_size()
+            for i in range(0, len(documents), upsert_size):
+                batch_end = min(i + upsert_size, len(documents))
+                collection.upsert(
+                    embeddings=embeddings[i:batch_end],
                     documents=documents[i:batch_end],
                     metadatas=metadatas[i:batch_end],
                     ids=ids[i:batch_end]
@@ -77,52 +200,169 @@ class ChromaService:
             return True
 
         except Exception as e:
+            logger.error(f"Failed to embed chunks for {job_name}: {e}")
+            return False
+
+    def _delete_stale_chunks(self, collection, rows: List[Dict[str, Any]], chunk_ids: set):
+        """Delete chunks starting within the rows' range that this batch does not rewrite
+
+        Merged chunks are identified by their first row, so a resumed batch that starts
+        partway through an earlier merged group writes new IDs for rows already stored.
+        Chunks never span two batches and everything after the checkpoint is embedded
+        again, so the overlapped chunks can be dropped without losing any row.
+        """
+        row_ranges: Dict[int, Tuple[int, int]] = {}
+        for row in rows:
+            low, high = row_ranges.get(row['artifact_type_id'], (row['row_index'], row['row_index']))
+            row_ranges[row['artifact_type_id']] = (min(low, row['row_index']), max(high, row['row_index']))
+
+        for artifact_type_id, (low, high) in row_ranges.items():
+            existing = collection.get(where={"$and": [
+                {"artifact_type_id": artifact_type_id},
+                {"row_index": {"$gte": low}},
+                {"row_index": {"$lte": high}}
+            ]}, include=[])
+            stale_ids = [chunk_id for chunk_id in existing["ids"] if chunk_id not in chunk_ids]
+            if stale_ids:
+                collection.delete(ids=stale_ids)
+                logger.info(f"Deleted {len(stale_ids)} overlapping chunks of artifact {artifact_type_id}")
+
+    def _embed_documents(self, job_name: str, documents: List[str]) -> np.ndarray:
+        """Embed documents, reusing cached vectors for content that was embedded before"""
+        content_hashes = [hash_document_text(document) for document in documents]
+        vectors = {
+            content_hash: np.frombuffer(embedding, dtype=np.float32)
+            for content_hash, embedding in get_cached_embeddings(self.embedding_cache_key, set(content_hashes)).items()
+        }
+
+        # Only the first occurrence of each new content is embedded
+        new_documents = {}
+        for content_hash, document in zip(content_hashes, documents):
+            if content_hash not in vectors and content_hash not in new_documents:
+                new_documents[content_hash] = document
+
+        if new_documents:
+            if embedding_worker_pool.enabled:
+                new_vectors = embedding_worker_pool.embed(list(new_documents.values()))
+            else:
+                new_vectors = self.embedder.embed(list(new_documents.values()))
+            vectors.update(zip(new_documents, new_vectors))
+            save_cached_embeddings(self.embedding_cache_key, [
+                (content_hash, vectors[content_hash].astype(np.float32).tobytes()) for content_hash in new_documents
+            ])
+
+        logger.info(f"Embedded {len(new_documents)} new documents for {len(documents)} rows of {job_name}")
+        return np.stack([vectors[content_hash] for content_hash in content_hashes])
+
+    def delete_artifact(self, job_name: str, artifact_type_id: int) -> bool:
+        """Delete every chunk of one artifact type, e.g. before its changed file is stored again"""
+        try:
+            with self._lock:
+                collection = self._job_collection(job_name)
+                if collection is not None:
+                    collection.delete(where={"artifact_type_id": artifact_type_id})
+                if self._legacy_collection is not None:
+                    self._legacy_collection.delete(where={"$and": [
+                        {"job_name": job_name}, {"artifact_type_id": artifact_type_id}
+                    ]})
+            return True
+        except Exception as e:
+            logger.error(f"Failed to delete chunks of artifact {artifact_type_id} for {job_name}: {e}")
+            return False
+
+    def delete_job(self, job_name: str) -> bool:
+        """Drop a report's collection (and its chunks still in the shared collection)"""
+        try:
+            with self._lock:
+                self._collections.pop(job_name, None)
+                try:
+                    self.client.delete_collection(collection_name(job_name))
+                except NotFoundError:
+                    pass
+                if self._legacy_collection is not None:
+                    self._legacy_collection.delete(where={"job_name": job_name})
+            return True
+        except Exception as e:
+            logger.error(f"Failed to delete collection of {job_name}: {e}")
             return False
 
     def reset_collection(self) -> bool:
-        """Reset the ChromaDB collection"""
+        """Drop every report's collection"""
         try:
-            self.client.delete_collection(COLLECTION_NAME)
-            self.collection = self.client.get_or_create_collection(
-                name=COLLECTION_NAME,
-                embedding_function=self.embedding_function,
-                metadata={"description": "LEAPP forensic report artifact chunks"}
-            )
+            with self._lock:
+                for collection in self._all_job_collections():
+                    self.client.delete_collection(collection.name)
+                self._collections.clear()
+                if self._legacy_collection is not None:
+                    self.client.delete_collection(LEGACY_COLLECTION_NAME)
+                    self._legacy_collection = None
             return True
         except Exception as e:
             logger.error(f"Failed to reset collection: {e}")
             return False
 
-    def query_chunks(self, query_text: str, job_name: Optional[str] = None, n_results: int = 10) -> List[Dict[str, Any]]:
-        """Query chunks from ChromaDB"""
-        try:
-            # Prepare where clause if job_name is specified
-            where_clause = {"job_name": job_name} if job_name else None
+    def _query_targets(self, job_name: Optional[str]) -> List[Tuple[Any, Optional[Dict[str, Any]]]]:
+        """(collection, where clause) pairs holding a job's chunks, or every report's"""
+        with self._lock:
+            if job_name:
+                collection = self._job_collection(job_name)
+                targets = [(collection, None)] if collection is not None else []
+            else:
+                targets = [(collection, None) for collection in self._all_job_collections()]
+            # Chunks not yet moved out of the shared collection are searched there
+            if self._legacy_collection is not None:
+                targets.append((self._legacy_collection, {"job_name": job_name} if job_name else None))
+        return targets
+
+    def _query_collection(self, collection, where: Optional[Dict[str, Any]], query_embeddings: np.ndarray,
+                          n_results: int) -> List[Dict[str, Any]]:
+        """Nearest chunks of one collection"""
+        results = collection.query(
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            where=where
+        )
+
+        # Format results safely
+        if not results['documents'] or not results['documents'][0]:
+            return []
+
+        docs = results['documents'][0]
+        metadatas = results['metadatas'][0] if results['metadatas'] else [{}] * len(docs)
+        distances = results['distances'][0] if results['distances'] else [0] * len(docs)
+        ids = results['ids'][0] if results['ids'] else [''] * len(docs)
 
-            results = self.collection.query(
-                query_texts=[query_text],
-                n_results=n_results,
-                where=where_clause
-            )
+        return [
+            {
+                'document': doc,
+                'metadata': metadatas[i] if i < len(metadatas) else {},
+                'distance': distances[i] if i < len(distances) else 0,
+                'id': ids[i] if i < len(ids) else ''
+            }
+            for i, doc in enumerate(docs)
+        ]
 
-            # Format results safely
-            if not results['documents'] or not results['documents'][0]:
+    def query_chunks(self, query_text: str, job_name: Optional[str] = None, n_results: int = 10) -> List[Dict[str, Any]]:
+        """Query chunks of one report, or of every report in parallel"""
+        try:
+            targets = self._query_targets(job_name)
+            if not targets:
                 return []
 
-            docs = results['documents'][0]
-            metadatas = results['metadatas'][0] if results['metadatas'] else [{}] * len(docs)
-            distances = results['distances'][0] if results['distances'] else [0] * len(docs)
-            ids = results['ids'][0] if results['ids'] else [''] * len(docs)
-
-            return [
-                {
-                    'document': doc,
-                    'metadata': metadatas[i] if i < len(metadatas) else {},
-                    'distance': distances[i] if i < len(distances) else 0,
-                    'id': ids[i] if i < len(ids) else ''
-                }
-                for i, doc in enumerate(docs)
-            ]
+            query_embeddings = self.embedder.embed([query_text])
+            if len(targets) == 1:
+                result_lists = [self._query_collection(*targets[0], query_embeddings, n_results)]
+            else:
+                with ThreadPoolExecutor(max_workers=min(len(targets), MAX_QUERY_WORKERS)) as executor:
+                    result_lists = list(executor.map(
+                        lambda target: self._query_collection(*target, query_embeddings, n_results), targets
+                    ))
+
+            # Merge by distance; a chunk mid-move can be in both its collection and the shared one
+            merged = {}
+            for result in sorted((result for results in result_lists for result in results), key=lambda r: r['distance']):
+                merged.setdefault(result['id'], result)
+            return list(merged.values())[:n_results]
 
         except Exception as e:
             logger.error(f"Error querying chunks: {str(e)}")
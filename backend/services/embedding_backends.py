@@ -0,0 +1,232 @@
+import os
+import logging
+import threading
+import importlib.util
+from functools import cached_property
+from typing import List, Optional, Any
+import numpy as np
+from chromadb.utils.embedding_functions.onnx_mini_lm_l6_v2 import ONNXMiniLM_L6_V2
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+ENCODE_BATCH_SIZE = 32
+
+BACKEND_AUTO = "auto"
+BACKEND_SENTENCE_TRANSFORMERS = "sentence-transformers"
+BACKEND_ONNX = "onnx"
+BACKEND_ONNX_INT8 = "onnx-int8"
+BACKENDS = (BACKEND_SENTENCE_TRANSFORMERS, BACKEND_ONNX, BACKEND_ONNX_INT8)
+
+
+def detect_device() -> str:
+    """Embedding device from EMBEDDING_DEVICE, or the best one torch reports (CUDA, then MPS, then CPU)"""
+    configured = os.getenv("EMBEDDING_DEVICE", "auto").lower()
+    if configured != "auto":
+        return configured
+
+    try:
+        import torch
+    except ImportError:
+        return "cpu"
+    if torch.cuda.is_available():
+        return "cuda"
+    mps = getattr(torch.backends, "mps", None)
+    if mps is not None and mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+def get_configured_threads() -> Optional[int]:
+    """Inference thread count from EMBEDDING_THREADS (unset lets the runtime decide)"""
+    threads = os.getenv("EMBEDDING_THREADS")
+    if not threads:
+        return None
+    try:
+        return max(1, int(threads))
+    except ValueError:
+        logger.warning("Invalid EMBEDDING_THREADS value, using runtime default")
+        return None
+
+
+class SentenceTransformerBackend:
+    """all-MiniLM-L6-v2 through sentence-transformers/torch, for GPU (CUDA/MPS) hosts"""
+
+    def __init__(self, device: str, threads: Optional[int] = None):
+        self.name = BACKEND_SENTENCE_TRANSFORMERS
+        self.device = device
+        self.threads = threads
+        self._lock = threading.Lock()
+
+    @cached_property
+    def model(self) -> Any:
+        from sentence_transformers import SentenceTransformer
+        if self.threads and self.device == "cpu":
+            import torch
+            torch.set_num_threads(self.threads)
+        return SentenceTransformer(DEFAULT_MODEL, device=self.device)
+
+    @cached_property
+    def tokenizer(self) -> Any:
+        # Loading only the tokenizer keeps token counting from loading the model
+        from transformers import AutoTokenizer
+        return AutoTokenizer.from_pretrained(f"sentence-transformers/{DEFAULT_MODEL}")
+
+    def count_tokens(self, documents: List[str]) -> List[int]:
+        """Model tokens per document, including special tokens and ignoring truncation"""
+        with self._lock:
+            encoded = self.tokenizer(documents, add_special_tokens=True, verbose=False)
+        return [len(ids) for ids in encoded["input_ids"]]
+
+    def embed(self, documents: List[str]) -> np.ndarray:
+        with self._lock:
+            embeddings = self.model.encode(
+                documents,
+                batch_size=ENCODE_BATCH_SIZE,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
+        return embeddings.astype(np.float32)
+
+
+class _OnnxMiniLM(ONNXMiniLM_L6_V2):
+    """Chroma's ONNX all-MiniLM-L6-v2 with thread control, an int8 model and per-batch padding"""
+
+    QUANTIZED_FILENAME = "model_int8.onnx"
+
+    def __init__(self, quantized: bool, threads: Optional[int]):
+        super().__init__(preferred_providers=["CPUExecutionProvider"])
+        # Decide the fallback up front so the backend's name (and embedding cache key)
+        # is settled before anything is embedded
+        if quantized and not os.path.exists(self._quantized_path()) and importlib.util.find_spec("onnx") is None:
+            logger.warning("Cannot quantize embedding model (onnx is not installed), using the fp32 ONNX model")
+            quantized = False
+        self.quantized = quantized
+        self.threads = threads
+
+    def _quantized_path(self) -> str:
+        return os.path.join(self.DOWNLOAD_PATH, self.EXTRACTED_FOLDER_NAME, self.QUANTIZED_FILENAME)
+
+    @cached_property
+    def tokenizer(self) -> Any:
+        tokenizer = self.Tokenizer.from_file(
+            os.path.join(self.DOWNLOAD_PATH, self.EXTRACTED_FOLDER_NAME, "tokenizer.json")
+        )
+        # Pad to the longest document in each batch rather than always to 256 tokens;
+        # artifact rows are short, so this removes most of the attention work
+        tokenizer.enable_truncation(max_length=self.max_tokens())
+        tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+        return tokenizer
+
+    @cached_property
+    def counting_tokenizer(self) -> Any:
+        tokenizer = self.Tokenizer.from_file(
+            os.path.join(self.DOWNLOAD_PATH, self.EXTRACTED_FOLDER_NAME, "tokenizer.json")
+        )
+        tokenizer.no_truncation()
+        tokenizer.no_padding()
+        return tokenizer
+
+    def _model_path(self) -> str:
+        model_path = os.path.join(self.DOWNLOAD_PATH, self.EXTRACTED_FOLDER_NAME, "model.onnx")
+        if not self.quantized:
+            return model_path
+
+        quantized_path = self._quantized_path()
+        if not os.path.exists(quantized_path):
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            # Dynamic quantization stores weights as int8 and quantizes activations per batch
+            quantize_dynamic(model_path, quantized_path + ".tmp", weight_type=QuantType.QInt8)
+            os.replace(quantized_path + ".tmp", quantized_path)
+            logger.info(f"Quantized embedding model written to {quantized_path}")
+        return quantized_path
+
+    @cached_property
+    def model(self) -> Any:
+        options = self.ort.SessionOptions()
+        options.log_severity_level = 3
+        options.graph_optimization_level = self.ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.threads:
+            options.intra_op_num_threads = self.threads
+            options.inter_op_num_threads = 1
+        return self.ort.InferenceSession(
+            self._model_path(),
+            providers=self._preferred_providers,
+            sess_options=options
+        )
+
+    def _forward(self, documents: List[str], batch_size: int = ENCODE_BATCH_SIZE) -> np.ndarray:
+        all_embeddings = []
+        for i in range(0, len(documents), batch_size):
+            encoded = self.tokenizer.encode_batch(documents[i:i + batch_size])
+            input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+            last_hidden_state = self.model.run(None, {
+                "input_ids": input_ids,
+                "attention_mask": attention_mask,
+                "token_type_ids": np.zeros_like(input_ids)
+            })[0]
+
+            # Mean pooling over real tokens, then L2 normalization
+            mask = attention_mask[:, :, np.newaxis].astype(np.float32)
+            embeddings = (last_hidden_state * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            all_embeddings.append(self._normalize(embeddings).astype(np.float32))
+        return np.concatenate(all_embeddings)
+
+    def load(self):
+        """Download (and quantize) the model and open its session"""
+        self._download_model_if_not_exists()
+        return self.model
+
+
+class OnnxBackend:
+    """all-MiniLM-L6-v2 on ONNX Runtime's CPU provider, optionally int8-quantized"""
+
+    def __init__(self, quantized: bool = True, threads: Optional[int] = None):
+        self._model = _OnnxMiniLM(quantized, threads)
+        self.name = BACKEND_ONNX_INT8 if self._model.quantized else BACKEND_ONNX
+        self.device = "cpu"
+        self.threads = threads
+        self._lock = threading.Lock()
+
+    def embed(self, documents: List[str]) -> np.ndarray:
+        # ONNX Runtime sessions run concurrently, but the lock keeps the lazy
+        # download/quantization from running twice
+        with self._lock:
+            self._model.load()
+        return self._model._forward(documents)
+
+    def count_tokens(self, documents: List[str]) -> List[int]:
+        """Model tokens per document, including special tokens and ignoring truncation"""
+        with self._lock:
+            self._model._download_model_if_not_exists()
+            tokenizer = self._model.counting_tokenizer
+        return [len(encoded.ids) for encoded in tokenizer.encode_batch(documents)]
+
+
+def create_embedding_backend(name: Optional[str] = None, device: Optional[str] = None,
+                             threads: Optional[int] = None):
+    """Embedding backend from arguments or EMBEDDING_BACKEND/EMBEDDING_DEVICE/EMBEDDING_THREADS
+
+    "auto" uses sentence-transformers on a GPU and the int8 ONNX model on CPU-only hosts.
+    Every backend embeds with all-MiniLM-L6-v2, so stored vectors stay comparable
+    when the backend changes.
+    """
+    name = (name or os.getenv("EMBEDDING_BACKEND", BACKEND_AUTO)).lower()
+    device = device or detect_device()
+    threads = threads if threads is not None else get_configured_threads()
+
+    if name == BACKEND_AUTO:
+        use_torch = device != "cpu" and importlib.util.find_spec("sentence_transformers") is not None
+        name = BACKEND_SENTENCE_TRANSFORMERS if use_torch else BACKEND_ONNX_INT8
+    if name not in BACKENDS:
+        logger.warning(f"Unknown embedding backend '{name}', using {BACKEND_ONNX_INT8}")
+        name = BACKEND_ONNX_INT8
+
+    if name == BACKEND_SENTENCE_TRANSFORMERS:
+        backend = SentenceTransformerBackend(device, threads)
+    else:
+        backend = OnnxBackend(quantized=name == BACKEND_ONNX_INT8, threads=threads)
+
+    logger.info(f"Embedding backend: {backend.name} on {backend.device} (threads: {threads or 'default'})")
+    return backend
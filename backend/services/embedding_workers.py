@@ -0,0 +1,158 @@
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from services.embedding_backends import create_embedding_backend, get_configured_threads
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDING_WORKERS = 1
+INITIAL_BATCH_SIZE = 64
+MIN_BATCH_SIZE = 16
+MAX_BATCH_SIZE = 1024
+BATCH_SIZE_STEP = 1.5       # Factor the batch size moves by after each full batch
+THROUGHPUT_TOLERANCE = 0.05  # Rate drops within this fraction count as noise
+
+# Backend of the current worker process, created by _init_worker
+_worker_backend = None
+
+
+def _init_worker(threads: Optional[int]):
+    """Load the embedding backend once per worker process"""
+    global _worker_backend
+    _worker_backend = create_embedding_backend(threads=threads)
+
+
+def _embed_batch(documents: List[str]) -> Tuple[np.ndarray, float]:
+    """Embed one batch inside a worker process and time it"""
+    start_time = time.perf_counter()
+    embeddings = _worker_backend.embed(documents)
+    return embeddings, time.perf_counter() - start_time
+
+
+class AdaptiveBatchSizer:
+    """Hill-climbing batch size tuned to measured embedding throughput
+
+    After each full batch the size keeps moving in the same direction while rows/sec
+    holds up, and reverses when it drops, so it settles around the size the backend
+    and host embed fastest.
+    """
+
+    def __init__(self, initial: int = INITIAL_BATCH_SIZE, minimum: int = MIN_BATCH_SIZE,
+                 maximum: int = MAX_BATCH_SIZE):
+        self.size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self._step = BATCH_SIZE_STEP
+        self._last_rate: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, batch_size: int, rows: int, seconds: float):
+        """Adjust the batch size from one batch's requested size, rows and compute time"""
+        with self._lock:
+            # Short tail batches and batches requested before the last change say little
+            # about the current size
+            if batch_size != self.size or rows < batch_size or seconds <= 0:
+                return
+            rate = rows / seconds
+            if self._last_rate is not None and rate < self._last_rate * (1 - THROUGHPUT_TOLERANCE):
+                self._step = 1 / self._step
+            self._last_rate = rate
+            self.size = int(min(max(self.size * self._step, self.minimum), self.maximum))
+
+
+class EmbeddingWorkerPool:
+    """Worker processes that embed document batches outside the API process
+
+    Embedding is CPU-bound, so running it in worker processes keeps it from holding
+    the API process's GIL while reports are ingested. Batches are queued to the pool
+    with about two per worker in flight, and results are returned in order for the
+    caller to write in bulk. EMBEDDING_WORKERS sets the process count (0 embeds in
+    the calling process).
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self.batch_sizer = AdaptiveBatchSizer()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_configured_workers(self) -> int:
+        """Worker count from EMBEDDING_WORKERS"""
+        try:
+            return max(0, int(os.getenv("EMBEDDING_WORKERS", DEFAULT_EMBEDDING_WORKERS)))
+        except ValueError:
+            logger.warning("Invalid EMBEDDING_WORKERS value, using default")
+            return DEFAULT_EMBEDDING_WORKERS
+
+    @property
+    def enabled(self) -> bool:
+        if self.max_workers is None:
+            self.max_workers = self._get_configured_workers()
+        return self.max_workers > 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Split the cores between workers unless EMBEDDING_THREADS says otherwise
+                threads = get_configured_threads() or max(1, (os.cpu_count() or 1) // self.max_workers)
+                # Spawned workers do not inherit the API process's threads or Chroma client
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(threads,)
+                )
+                logger.info(f"Started {self.max_workers} embedding workers with {threads} threads each")
+            return self._executor
+
+    def embed(self, documents: List[str]) -> np.ndarray:
+        """Embed documents across the worker processes, returning vectors in input order"""
+        if not documents:
+            return np.zeros((0, 0), dtype=np.float32)
+        executor = self._get_executor()
+        max_in_flight = self.max_workers * 2
+        results: Dict[int, np.ndarray] = {}
+        in_flight = {}
+        position = 0
+
+        try:
+            while position < len(documents) or in_flight:
+                # Top up the window before waiting on results
+                while position < len(documents) and len(in_flight) < max_in_flight:
+                    batch_size = self.batch_sizer.size
+                    batch = documents[position:position + batch_size]
+                    in_flight[executor.submit(_embed_batch, batch)] = (position, batch_size)
+                    position += len(batch)
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    start, batch_size = in_flight.pop(future)
+                    embeddings, seconds = future.result()
+                    self.batch_sizer.record(batch_size, len(embeddings), seconds)
+                    results[start] = embeddings
+        except BrokenProcessPool:
+            logger.error("Embedding worker process died, the pool will restart on next use")
+            self.shutdown()
+            raise
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+        return np.concatenate([results[start] for start in sorted(results)])
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+# Global instance
+embedding_worker_pool = EmbeddingWorkerPool()
@@ -0,0 +1,163 @@
+import os
+import time
+import heapq
+import logging
+import itertools
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+from database.database import get_pending_reports, queue_report, update_report_status
+from utils.processing_utils import process_leapp_report
+from utils.ingest_pipeline import IngestProgress
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INGEST_WORKERS = 1
+PROGRESS_RETENTION_SECONDS = 3600  # Finished jobs keep their progress this long
+
+
+class IngestScheduler:
+    """Bounded worker pool that runs report ingests from a persistent priority queue
+
+    Queued jobs live in the reports table (status 'queued' plus priority), so the
+    queue survives restarts. Higher priority runs first, ties run in submission order.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self._queue: List[Tuple[int, int, str, str]] = []  # (-priority, sequence, job_name, path)
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._queued: Dict[str, str] = {}                   # job_name -> report path
+        self._running: Dict[str, threading.Event] = {}     # job_name -> cancel event
+        self._progress: Dict[str, IngestProgress] = {}
+        self._finished: Dict[str, float] = {}               # job_name -> monotonic time it ended
+        self._workers: List[threading.Thread] = []
+
+    def start(self):
+        """Start worker threads and re-queue jobs persisted by a previous run"""
+        if self._workers:
+            return
+
+        if self.max_workers is None:
+            self.max_workers = self._get_configured_workers()
+
+        for job_name, report_path, priority in get_pending_reports():
+            logger.info(f"Re-queueing pending ingest job {job_name}")
+            self.submit(job_name, report_path, priority or 0)
+
+        for i in range(self.max_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"ingest-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+        logger.info(f"Ingest scheduler started with {self.max_workers} workers")
+
+    def _get_configured_workers(self) -> int:
+        """Worker count from INGEST_WORKERS"""
+        try:
+            return max(1, int(os.getenv("INGEST_WORKERS", DEFAULT_INGEST_WORKERS)))
+        except ValueError:
+            logger.warning("Invalid INGEST_WORKERS value, using default")
+            return DEFAULT_INGEST_WORKERS
+
+    def submit(self, job_name: str, report_path: str, priority: int = 0) -> bool:
+        """Queue a job for ingest; returns False if it is already queued or running"""
+        with self._condition:
+            if job_name in self._queued or job_name in self._running:
+                return False
+
+            queue_report(job_name, priority)
+            heapq.heappush(self._queue, (-priority, next(self._sequence), job_name, report_path))
+            self._queued[job_name] = report_path
+            self._progress[job_name] = IngestProgress(job_name=job_name)
+            self._finished.pop(job_name, None)
+            self._prune_progress()
+            self._condition.notify()
+            return True
+
+    def cancel(self, job_name: str) -> bool:
+        """Cancel a queued or running job; returns False if the job is not active"""
+        with self._condition:
+            if job_name in self._queued:
+                del self._queued[job_name]
+                self._queue = [entry for entry in self._queue if entry[2] != job_name]
+                heapq.heapify(self._queue)
+                self._progress[job_name].stage = "cancelled"
+                self._finished[job_name] = time.monotonic()
+                update_report_status(job_name, "cancelled")
+                return True
+
+            cancel_event = self._running.get(job_name)
+            if cancel_event:
+                # The pipeline stops at its next batch boundary and marks the job cancelled
+                cancel_event.set()
+                return True
+
+        return False
+
+    def get_progress(self, job_name: str) -> Optional[Dict[str, Any]]:
+        """Get live progress for a job seen by this scheduler"""
+        progress = self._progress.get(job_name)
+        if not progress:
+            return None
+
+        result = progress.to_dict()
+        with self._condition:
+            if job_name in self._queued:
+                result["queue_position"] = sorted(self._queue).index(
+                    next(entry for entry in self._queue if entry[2] == job_name)
+                ) + 1
+        return result
+
+    def forget(self, job_name: str):
+        """Drop the progress of a job that is no longer active, e.g. when its report is deleted"""
+        with self._condition:
+            if job_name not in self._queued and job_name not in self._running:
+                self._progress.pop(job_name, None)
+                self._finished.pop(job_name, None)
+
+    def _prune_progress(self):
+        """Drop progress of jobs that ended more than PROGRESS_RETENTION_SECONDS ago (caller holds the condition)"""
+        cutoff = time.monotonic() - PROGRESS_RETENTION_SECONDS
+        for job_name in [name for name, ended in self._finished.items() if ended < cutoff]:
+            del self._finished[job_name]
+            self._progress.pop(job_name, None)
+
+    def is_active(self, job_name: str) -> bool:
+        """Whether a job is queued or running"""
+        with self._condition:
+            return job_name in self._queued or job_name in self._running
+
+    def list_jobs(self) -> Dict[str, List[str]]:
+        """Get queued (in run order) and running job names"""
+        with self._condition:
+            return {
+                "queued": [entry[2] for entry in sorted(self._queue)],
+                "running": list(self._running)
+            }
+
+    def _worker_loop(self):
+        """Run jobs from the queue, one at a time per worker"""
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                _, _, job_name, report_path = heapq.heappop(self._queue)
+                del self._queued[job_name]
+                cancel_event = threading.Event()
+                self._running[job_name] = cancel_event
+                progress = self._progress[job_name]
+
+            try:
+                process_leapp_report(job_name, report_path, progress, cancel_event)
+            except Exception as e:
+                logger.error(f"Ingest worker failed on job {job_name}: {e}")
+            finally:
+                with self._condition:
+                    del self._running[job_name]
+                    self._finished[job_name] = time.monotonic()
+                    self._prune_progress()
+
+
+# Global instance
+ingest_scheduler = IngestScheduler()
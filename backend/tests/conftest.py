@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Tests import backend modules the way main.py does, from the backend directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
@@ -0,0 +1,46 @@
+import pytest
+
+from utils.geo_utils import bounding_boxes, haversine_m, METERS_PER_DEGREE
+
+
+def _contains(boxes, latitude, longitude):
+    return any(min_lat <= latitude <= max_lat and min_lon <= longitude <= max_lon
+               for min_lat, max_lat, min_lon, max_lon in boxes)
+
+
+def test_single_box_away_from_antimeridian():
+    boxes = bounding_boxes(10.0, 20.0, 1000)
+
+    assert len(boxes) == 1
+    min_lat, max_lat, min_lon, max_lon = boxes[0]
+    assert min_lat < 10.0 < max_lat and min_lon < 20.0 < max_lon
+    assert max_lat - 10.0 == pytest.approx(1000 / METERS_PER_DEGREE)
+
+
+@pytest.mark.parametrize("longitude, across", [(179.999, -179.999), (-179.999, 179.999)])
+def test_circle_crossing_antimeridian_is_split(longitude, across):
+    boxes = bounding_boxes(10.0, longitude, 2000)
+
+    assert len(boxes) == 2
+    for _, _, min_lon, max_lon in boxes:
+        assert -180.0 <= min_lon <= max_lon <= 180.0
+    # The point just across ±180° is within the radius and inside one of the boxes
+    assert haversine_m(10.0, longitude, 10.0, across) < 2000
+    assert _contains(boxes, 10.0, across)
+    assert _contains(boxes, 10.0, longitude)
+
+
+def test_box_touching_antimeridian_is_not_split():
+    assert len(bounding_boxes(0.0, 170.0, 1000)) == 1
+
+
+def test_near_pole_searches_whole_band():
+    boxes = bounding_boxes(89.95, 45.0, 10000)
+
+    assert boxes == [(boxes[0][0], 90.0, -180.0, 180.0)]
+
+
+def test_huge_radius_searches_whole_band():
+    min_lat, max_lat, min_lon, max_lon = bounding_boxes(0.0, 0.0, 30000000)[0]
+
+    assert (min_lat, max_lat, min_lon, max_lon) == (-90.0, 90.0, -180.0, 180.0)
@@ -0,0 +1,36 @@
+import pytest
+
+from tools.hybrid_search import _reciprocal_rank_fusion, RRF_K
+
+A = ("job", 1, 0)
+B = ("job", 1, 1)
+C = ("job", 2, 0)
+
+
+def test_rows_found_by_both_retrievers_rank_first():
+    fused = _reciprocal_rank_fusion({"lexical": [A, B], "semantic": [C, B]})
+
+    assert [key for key, _, _ in fused] == [B, A, C]
+    key, score, ranks = fused[0]
+    assert score == pytest.approx(1 / (RRF_K + 2) * 2)
+    assert ranks == {"lexical": 2, "semantic": 2}
+
+
+def test_ranks_record_each_source():
+    fused = {key: ranks for key, _, ranks in _reciprocal_rank_fusion({"lexical": [A], "semantic": [C, A]})}
+
+    assert fused[A] == {"lexical": 1, "semantic": 2}
+    assert fused[C] == {"semantic": 1}
+
+
+def test_duplicates_within_a_ranking_count_once_at_their_best_rank():
+    fused = _reciprocal_rank_fusion({"semantic": [A, B, A]})
+
+    assert [(key, score) for key, score, _ in fused] == [
+        (A, pytest.approx(1 / (RRF_K + 1))),
+        (B, pytest.approx(1 / (RRF_K + 2))),
+    ]
+
+
+def test_empty_rankings_fuse_to_nothing():
+    assert _reciprocal_rank_fusion({"lexical": [], "semantic": []}) == []
@@ -0,0 +1,61 @@
+from utils.hash_utils import hash_and_count_lines
+from utils.ingest_pipeline import IngestPipeline, STAGE_STORED, STAGE_STORING
+
+
+def _write_tsv(directory, name, rows):
+    path = directory / name
+    path.write_text("a\tb\n" + "".join(f"{i}\tx{i}\n" for i in range(rows)))
+    return path
+
+
+def _checkpoint(path, stage, rows_stored, rows_embedded):
+    return {
+        "content_hash": hash_and_count_lines(str(path))[0],
+        "stage": stage,
+        "rows_stored": rows_stored,
+        "rows_embedded": rows_embedded,
+    }
+
+
+def test_plan_resumes_skips_and_restarts_files(tmp_path):
+    stored = _write_tsv(tmp_path, "a_stored.tsv", 10)
+    partial = _write_tsv(tmp_path, "b_partial.tsv", 20)
+    changed = _write_tsv(tmp_path, "c_changed.tsv", 5)
+    _write_tsv(tmp_path, "d_new.tsv", 3)
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    pipeline = IngestPipeline("job", str(tmp_path), embed=True)
+    pipeline._checkpoints = {
+        "a_stored.tsv": _checkpoint(stored, STAGE_STORED, 10, 4),
+        "b_partial.tsv": _checkpoint(partial, STAGE_STORING, 15, 10),
+        "c_changed.tsv": _checkpoint(changed, STAGE_STORED, 5, 5),
+    }
+    changed.write_text("a\tb\n1\tedited\n")
+
+    plan = pipeline._plan_tsv_files(str(tmp_path))
+
+    assert list(plan) == ["a_stored.tsv", "b_partial.tsv", "c_changed.tsv", "d_new.tsv"]
+    assert plan["a_stored.tsv"] == {
+        "content_hash": pipeline._checkpoints["a_stored.tsv"]["content_hash"],
+        "resume_from": 10, "rows_embedded": 4, "complete": True,
+    }
+    assert (plan["b_partial.tsv"]["resume_from"], plan["b_partial.tsv"]["complete"]) == (15, False)
+    assert plan["c_changed.tsv"]["content_hash"] == hash_and_count_lines(str(changed))[0]
+    assert (plan["c_changed.tsv"]["resume_from"], plan["c_changed.tsv"]["rows_embedded"]) == (0, 0)
+    assert (plan["d_new.tsv"]["resume_from"], plan["d_new.tsv"]["complete"]) == (0, False)
+
+
+def test_plan_counts_previous_progress(tmp_path):
+    partial = _write_tsv(tmp_path, "partial.tsv", 20)
+    _write_tsv(tmp_path, "new.tsv", 3)
+
+    pipeline = IngestPipeline("job", str(tmp_path), embed=True)
+    pipeline._checkpoints = {"partial.tsv": _checkpoint(partial, STAGE_STORING, 15, 30)}
+    pipeline._plan_tsv_files(str(tmp_path))
+
+    progress = pipeline.progress
+    assert progress.rows_total == 23
+    assert progress.rows_stored == 15
+    # Embedded rows never count beyond the rows stored
+    assert progress.rows_embedded == 15
+    assert progress.stage == "storing"
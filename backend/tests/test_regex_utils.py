@@ -0,0 +1,52 @@
+import re
+
+import pytest
+
+from utils.regex_utils import required_literals, combine_patterns
+
+
+@pytest.mark.parametrize("pattern, expected", [
+    ("com.apple", [["com.apple"]]),
+    ("ab", None),
+])
+def test_plain_patterns(pattern, expected):
+    assert required_literals(pattern, regex=False) == expected
+
+
+@pytest.mark.parametrize("pattern, expected", [
+    (r"^password$", [["password"]]),
+    (r"abc.*def", [["abc", "def"]]),
+    (r"foo|bar", [["foo"], ["bar"]]),
+    (r"(?:http|ftp)://host", [["http", "://host"], ["ftp", "://host"]]),
+    (r"(abc)?xyz", [["xyz"]]),
+    (r"(abc)+xyz", [["abc", "xyz"]]),
+    (r"\d{3}-\d{4}", None),
+    (r"a|bcd", None),
+    (r"abc|.*", None),
+    (r"ab\.c", [["ab.c"]]),
+])
+def test_regex_literals(pattern, expected):
+    assert required_literals(pattern, regex=True) == expected
+
+
+@pytest.mark.parametrize("pattern", [r"abc.*def", r"(?:http|ftp)://host", r"(abc)?xyz", r"foo|bar"])
+def test_every_match_contains_one_alternative(pattern):
+    alternatives = required_literals(pattern, regex=True)
+    for text in ["xx abc-def yy", "ftp://host/a", "http://host", "abcxyz", "xyz", "a bar"]:
+        match = re.search(pattern, text)
+        if match:
+            assert any(all(literal in text for literal in conjunction) for conjunction in alternatives)
+
+
+def test_too_many_alternatives_give_up():
+    pattern = "(" + "|".join(f"w{i:03d}" for i in range(20)) + ")(" + "|".join(f"x{i:03d}" for i in range(20)) + ")"
+
+    assert required_literals(pattern, regex=True) is None
+
+
+def test_combined_patterns_match_any_pattern():
+    combined = combine_patterns(["a.b", "xyz"], regex=False, case_sensitive=False)
+
+    assert re.search(combined, "A.B")
+    assert re.search(combined, "XYZ")
+    assert not re.search(combined, "aXb")
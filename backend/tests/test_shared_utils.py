@@ -0,0 +1,38 @@
+import base64
+
+import pytest
+
+from tools.shared_utils import encode_cursor, decode_cursor
+
+
+@pytest.mark.parametrize("position", [
+    [3, 0],
+    [3, 41234],
+    [3, 17, "com.apple.mail"],
+    [3, 17, 257.5],
+    [3, 17, None],
+])
+def test_cursor_round_trip(position):
+    token = encode_cursor(*position)
+
+    assert "=" not in token
+    assert decode_cursor(token) == position
+
+
+def _token(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("token", [
+    "not a cursor!",
+    _token("{}"),
+    _token("[1]"),
+    _token("[1, 2, 3, 4]"),
+    _token('["1", 2]'),
+    _token("[true, 2]"),
+    _token("[1, 2.5]"),
+    _token("not json"),
+])
+def test_invalid_cursor_is_rejected(token):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(token)
@@ -2,12 +2,17 @@ import logging
 from typing import Dict, Any
 from pydantic import ValidationError
 
-from .shared_utils import build_error_response
+from .shared_utils import build_error_response, record_cached_filters
 from .semantic_search import semantic_search
 from .artifact_list import artifact_list
 from .artifact_data import artifact_data
+from .artifact_aggregate import artifact_aggregate
 from .report_list import report_list
 from .grep_search import grep_search
+from .spatial_search import spatial_bounding_box, spatial_radius, spatial_nearest
+from .timeline_search import timeline_search
+from .hybrid_search import hybrid_search
+from .result_cache import tool_result_cache
 
 logger = logging.getLogger(__name__)
 
@@ -16,8 +21,14 @@ TOOLS = {
     "semanticSearch": semantic_search,
     "viewArtifactList": artifact_list,
     "viewArtifactData": artifact_data,
+    "aggregateArtifactData": artifact_aggregate,
     "viewReportList": report_list,
-    "grepSearch": grep_search
+    "grepSearch": grep_search,
+    "spatialBoundingBox": spatial_bounding_box,
+    "spatialRadius": spatial_radius,
+    "spatialNearest": spatial_nearest,
+    "timelineSearch": timeline_search,
+    "hybridSearch": hybrid_search
 }
 
 # Simple schema mapping
@@ -40,9 +51,17 @@ def execute_tool(name: str, input_data: dict):
 
     try:
         # Validate input
-        validated_data = schema(**input_data)
+        validated_data = schema(**input_data).model_dump()
+        # Repeated calls are answered from the cache until the report's data changes
+        cache_key, result = tool_result_cache.get(name, validated_data)
+        if result is not None:
+            logger.info(f"Tool cache hit: '{name}'")
+            # Repeats still count as filter use, so hot filters get their index
+            record_cached_filters(validated_data)
+            return result
         # Execute tool
-        result = tool(validated_data.model_dump())
+        result = tool(validated_data)
+        tool_result_cache.put(cache_key, result)
         return result
 
     except ValidationError as e:
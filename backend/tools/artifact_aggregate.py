@@ -0,0 +1,147 @@
+import logging
+from typing import Dict, Any, List
+from database.database import get_db_cursor
+from database.typed_storage import TYPE_INTEGER, TYPE_REAL, TYPE_TIMESTAMP
+
+from .shared_utils import build_error_response, ArtifactColumns
+
+logger = logging.getLogger(__name__)
+
+# strftime formats labelling each time bucket (UTC)
+TIME_BUCKET_FORMATS = {
+    "minute": "%Y-%m-%d %H:%M",
+    "hour": "%Y-%m-%d %H:00",
+    "day": "%Y-%m-%d",
+    "week": "%Y-W%W",
+    "month": "%Y-%m",
+    "year": "%Y"
+}
+
+NUMERIC_AGGREGATES = ("sum", "avg")
+
+
+def _aggregate_sql(columns: ArtifactColumns, aggregate: str, column: str) -> str:
+    """SQL for the aggregate value of each group"""
+    if aggregate == "count":
+        return "COUNT(*)" if not column else f"COUNT({columns.expression(column)})"
+    expression = columns.expression(column)
+    if aggregate == "count_distinct":
+        return f"COUNT(DISTINCT {expression})"
+    if columns.column_type(column) not in (TYPE_INTEGER, TYPE_REAL):
+        # Untyped values are text, so sums and averages cast them first and min/max
+        # compare numeric-looking values as numbers (SQLite orders numbers before text)
+        if aggregate in NUMERIC_AGGREGATES:
+            expression = f"CAST({expression} AS REAL)"
+        elif not columns.typed:
+            expression = columns.sort_expression(column)
+    return f"{aggregate.upper()}({expression})"
+
+
+def _time_bucket_sql(columns: ArtifactColumns, time_column: str, time_bucket: str) -> str:
+    """SQL labelling each row with its time bucket"""
+    expression = columns.expression(time_column)
+    bucket_format = TIME_BUCKET_FORMATS[time_bucket]
+    # Typed timestamps are already normalized; other values are parsed like timeline keys
+    if columns.column_type(time_column) == TYPE_TIMESTAMP:
+        return f"strftime('{bucket_format}', {expression})"
+    return f"strftime('{bucket_format}', to_epoch({expression}), 'unixepoch')"
+
+
+def artifact_aggregate(input_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Group and aggregate artifact rows in the database."""
+    job_name = input_data["job_name"]
+    artifact_type_id = input_data["artifact_type_id"]
+    group_by = input_data.get("group_by") or []
+    aggregate = input_data["aggregate"]
+    column = input_data.get("column")
+    time_column = input_data.get("time_column")
+    time_bucket = input_data.get("time_bucket")
+    where = input_data.get("where") or []
+    order_by = input_data["order_by"]
+    descending = input_data["descending"]
+    limit = input_data["limit"]
+
+    if aggregate != "count" and not column:
+        return build_error_response("validation_error", f"Aggregate '{aggregate}' requires a column")
+    if bool(time_column) != bool(time_bucket):
+        return build_error_response("validation_error", "time_column and time_bucket must be given together")
+
+    try:
+        with get_db_cursor() as cursor:
+            # Check if report exists
+            cursor.execute("SELECT job_name FROM reports WHERE job_name = ? LIMIT 1", (job_name,))
+            if not cursor.fetchone():
+                return build_error_response("report_not_found", f"Report '{job_name}' not found")
+
+            cursor.execute("SELECT file_name FROM artifact_types WHERE id = ? AND job_name = ?", (artifact_type_id, job_name))
+            artifact = cursor.fetchone()
+            if not artifact:
+                return build_error_response("artifact_not_found", f"Artifact type {artifact_type_id} not found in report '{job_name}'")
+
+            columns = ArtifactColumns(cursor, artifact_type_id)
+            referenced = group_by + [predicate["column"] for predicate in where] + [column, time_column]
+            unknown_columns = [name for name in referenced if name and columns.expression(name) is None]
+            if unknown_columns:
+                return build_error_response(
+                    "column_not_found",
+                    f"Unknown columns: {unknown_columns}",
+                    available_columns=columns.available()
+                )
+
+            group_expressions = [columns.expression(name) for name in group_by]
+            group_names = list(group_by)
+            if time_bucket:
+                group_expressions.insert(0, _time_bucket_sql(columns, time_column, time_bucket))
+                group_names.insert(0, time_bucket)
+
+            columns.record_filters(where)
+            conditions = ["ad.job_name = ?", "ad.artifact_type_id = ?"]
+            params: List[Any] = [job_name, artifact_type_id]
+            for predicate in where:
+                condition, condition_params = columns.predicate(predicate["column"], predicate["op"], predicate["value"])
+                conditions.append(condition)
+                params.extend(condition_params)
+
+            direction = "DESC" if descending else "ASC"
+            select_list = [f"{expression} AS g{i}" for i, expression in enumerate(group_expressions)]
+            group_clause = ""
+            if group_expressions:
+                group_positions = ", ".join(str(i + 1) for i in range(len(group_expressions)))
+                group_clause = f"GROUP BY {group_positions}"
+                if order_by == "group":
+                    order_clause = ", ".join(f"{i + 1} {direction}" for i in range(len(group_expressions)))
+                else:
+                    order_clause = f"value {direction}, {group_positions}"
+            else:
+                order_clause = "value"
+
+            # Window totals are computed over every group before LIMIT
+            query = f"""
+                SELECT {", ".join(select_list + [f"{_aggregate_sql(columns, aggregate, column)} AS value"])},
+                       COUNT(*) OVER () AS group_count,
+                       SUM(COUNT(*)) OVER () AS row_count
+                FROM artifact_data ad
+                {columns.join_sql()}
+                WHERE {" AND ".join(conditions)}
+                {group_clause}
+                ORDER BY {order_clause}
+                LIMIT ?
+            """
+            cursor.execute(query, params + [limit])
+            rows = cursor.fetchall()
+
+            value_name = aggregate if not column else f"{aggregate}({column})"
+            return {
+                "success": True,
+                "file_name": artifact[0],
+                "columns": group_names + [value_name],
+                "rows": [list(row[:len(group_names) + 1]) for row in rows],
+                "count": len(rows),
+                "group_count": rows[0][-2] if rows else 0,
+                "row_count": rows[0][-1] if rows else 0,
+                "truncated": bool(rows) and rows[0][-2] > len(rows)
+            }
+
+    except Exception as e:
+        logger.error(f"Artifact aggregation failed: {str(e)}")
+        return build_error_response("database_error", f"Database error: {str(e)}")
@@ -1,18 +1,51 @@
+import json
 import logging
-from typing import Dict, Any, List, Union
-from database.database import get_db_cursor
+from typing import Dict, Any, List, Tuple, Union
+from database.database import get_db_cursor, decode_artifact_row
 
-from .shared_utils import build_error_response
+from .shared_utils import build_error_response, ArtifactColumns, encode_cursor, decode_cursor
 
 logger = logging.getLogger(__name__)
 
 
+def _after_sorted_row(descending: bool, sort_value: Any, row_index: int) -> Tuple[str, List[Any]]:
+    """WHERE fragment selecting sorted rows (s) that sort after (sort_value, row_index)
+
+    SQLite sorts NULLs first ascending and last descending; ties are broken by row_index ascending.
+    """
+    if sort_value is None:
+        if descending:
+            return "(s.sort_value IS NULL AND s.row_index > ?)", [row_index]
+        return "(s.sort_value IS NOT NULL OR s.row_index > ?)", [row_index]
+    operator = "<" if descending else ">"
+    null_clause = " OR s.sort_value IS NULL" if descending else ""
+    return (
+        f"(s.sort_value {operator} ? OR (s.sort_value = ? AND s.row_index > ?){null_clause})",
+        [sort_value, sort_value, row_index]
+    )
+
+
 def artifact_data(input_data: Dict[str, Any]) -> Dict[str, Any]:
     """Get artifact data for a report."""
     job_name = input_data["job_name"]
     artifact_type_id = input_data["artifact_type_id"]
     limit = input_data["limit"]
-    offset = input_data["offset"]
+    cursor_token = input_data.get("cursor")
+    order_by = input_data.get("order_by")
+    descending = input_data.get("descending", False)
+    where = input_data.get("where") or []
+    projection = input_data.get("columns")
+
+    # A cursor is [artifact_type_id, row_index] of the last row seen, plus its sort value when ordered
+    position = None
+    if cursor_token:
+        try:
+            position = decode_cursor(cursor_token)
+        except ValueError as e:
+            return build_error_response("validation_error", str(e))
+        ids = artifact_type_id if isinstance(artifact_type_id, list) else [artifact_type_id]
+        if position[0] not in ids or (len(position) == 3) != bool(order_by):
+            return build_error_response("validation_error", "Cursor does not belong to this query; repeat the query without it to start over")
 
     try:
         with get_db_cursor() as cursor:
@@ -23,10 +56,12 @@ def artifact_data(input_data: Dict[str, Any]) -> Dict[str, Any]:
 
             # Validate artifact types
             cursor.execute("""
-                SELECT DISTINCT at.id, at.file_name
+                SELECT at.id, at.file_name
                 FROM artifact_types at
-                JOIN artifact_data ad ON at.id = ad.artifact_type_id
-                WHERE ad.job_name = ?
+                WHERE at.job_name = ? AND EXISTS (
+                    SELECT 1 FROM artifact_data ad
+                    WHERE ad.job_name = at.job_name AND ad.artifact_type_id = at.id
+                )
                 ORDER BY at.file_name
             """, (job_name,))
             available_artifacts = [{"id": row[0], "name": row[1]} for row in cursor.fetchall()]
@@ -43,48 +78,159 @@ def artifact_data(input_data: Dict[str, Any]) -> Dict[str, Any]:
                     available_artifacts=available_artifacts
                 )
 
+            row_sql = "ad.data_json"
+            projected: Dict[int, List[str]] = {}
+            if projection:
+                # Projected columns must exist in at least one requested artifact (legacy rows accept any)
+                artifact_columns = {checked_id: ArtifactColumns(cursor, checked_id) for checked_id in ids_to_check}
+                known_columns = set()
+                for columns in artifact_columns.values():
+                    available = columns.available()
+                    if available is None:
+                        known_columns = None
+                        break
+                    known_columns.update(available)
+                unknown_columns = [name for name in projection if known_columns is not None and name not in known_columns]
+                if unknown_columns:
+                    return build_error_response(
+                        "column_not_found",
+                        f"Unknown columns: {unknown_columns}",
+                        available_columns=sorted(known_columns)
+                    )
+
+                # Array-encoded rows return just the projected values from SQL; legacy rows are decoded whole
+                branches = []
+                for checked_id, columns in artifact_columns.items():
+                    if columns.columns is None:
+                        continue
+                    projected[checked_id] = [name for name in projection if name in columns.columns]
+                    branches.append(f"WHEN {int(checked_id)} THEN {columns.values_sql(projected[checked_id])}")
+                if branches:
+                    row_sql = f"CASE ad.artifact_type_id {' '.join(branches)} ELSE ad.data_json END"
+
+            if (order_by or where) and isinstance(artifact_type_id, list):
+                return build_error_response("validation_error", "order_by and where require a single artifact_type_id")
+
             # Build and execute query
             if isinstance(artifact_type_id, list):
                 placeholders = ','.join(['?'] * len(artifact_type_id))
+                conditions = ["ad.job_name = ?", f"ad.artifact_type_id IN ({placeholders})"]
+                params = [job_name] + artifact_type_id
+                if position:
+                    conditions.append("(ad.artifact_type_id, ad.row_index) > (?, ?)")
+                    params.extend(position)
                 query = f"""
-                    SELECT ad.row_index, ad.data_json, at.file_name
+                    SELECT ad.row_index, {row_sql}, at.file_name, ad.artifact_type_id
                     FROM artifact_data ad
                     JOIN artifact_types at ON ad.artifact_type_id = at.id
-                    WHERE ad.job_name = ? AND ad.artifact_type_id IN ({placeholders})
+                    WHERE {" AND ".join(conditions)}
                     ORDER BY ad.artifact_type_id, ad.row_index
-                    LIMIT ? OFFSET ?
+                    LIMIT ?
                 """
-                params = [job_name] + artifact_type_id + [limit, offset]
+                params.append(limit)
+            elif order_by or where:
+                # Filters and sorts run in SQL, on typed columns when the artifact has them
+                columns = ArtifactColumns(cursor, artifact_type_id)
+                unknown_columns = [
+                    column for column in [order_by] + [predicate["column"] for predicate in where]
+                    if column and columns.expression(column) is None
+                ]
+                if unknown_columns:
+                    return build_error_response(
+                        "column_not_found",
+                        f"Unknown columns: {unknown_columns}",
+                        available_columns=columns.available()
+                    )
+
+                columns.record_filters(where)
+                conditions = ["ad.job_name = ?", "ad.artifact_type_id = ?"]
+                params = [job_name, artifact_type_id]
+                for predicate in where:
+                    condition, condition_params = columns.predicate(predicate["column"], predicate["op"], predicate["value"])
+                    conditions.append(condition)
+                    params.extend(condition_params)
+
+                if order_by:
+                    # s is materialized so each row's sort value is computed once, not again in the
+                    # cursor condition and ORDER BY; only the page's rows are read back whole
+                    direction = "DESC" if descending else "ASC"
+                    page_condition, page_params = _after_sorted_row(descending, position[2], position[1]) if position else ("1", [])
+                    query = f"""
+                        WITH s AS MATERIALIZED (
+                            SELECT ad.id, ad.row_index, {columns.sort_expression(order_by)} AS sort_value
+                            FROM artifact_data ad
+                            {columns.join_sql()}
+                            WHERE {" AND ".join(conditions)}
+                        ),
+                        page AS (
+                            SELECT s.id, s.row_index, s.sort_value
+                            FROM s
+                            WHERE {page_condition}
+                            ORDER BY s.sort_value {direction}, s.row_index
+                            LIMIT ?
+                        )
+                        SELECT ad.row_index, {row_sql}, at.file_name, ad.artifact_type_id, page.sort_value
+                        FROM page
+                        JOIN artifact_data ad ON ad.id = page.id
+                        JOIN artifact_types at ON ad.artifact_type_id = at.id
+                        ORDER BY page.sort_value {direction}, page.row_index
+                    """
+                    params.extend(page_params)
+                else:
+                    if position:
+                        conditions.append("ad.row_index > ?")
+                        params.append(position[1])
+                    query = f"""
+                        SELECT ad.row_index, {row_sql}, at.file_name, ad.artifact_type_id
+                        FROM artifact_data ad
+                        JOIN artifact_types at ON ad.artifact_type_id = at.id
+                        {columns.join_sql()}
+                        WHERE {" AND ".join(conditions)}
+                        ORDER BY ad.row_index
+                        LIMIT ?
+                    """
+                params.append(limit)
             else:
-                query = """
-                    SELECT ad.row_index, ad.data_json, at.file_name
+                query = f"""
+                    SELECT ad.row_index, {row_sql}, at.file_name, ad.artifact_type_id
                     FROM artifact_data ad
                     JOIN artifact_types at ON ad.artifact_type_id = at.id
-                    WHERE ad.job_name = ? AND ad.artifact_type_id = ?
+                    WHERE ad.job_name = ? AND ad.artifact_type_id = ? AND ad.row_index > ?
                     ORDER BY ad.row_index
-                    LIMIT ? OFFSET ?
+                    LIMIT ?
                 """
-                params = (job_name, artifact_type_id, limit, offset)
+                params = (job_name, artifact_type_id, position[1] if position else -1, limit)
 
             cursor.execute(query, params)
             rows = cursor.fetchall()
 
             data = []
             for row in rows:
+                if row[3] in projected:
+                    data_json = dict(zip(projected[row[3]], json.loads(row[1])))
+                else:
+                    data_json = decode_artifact_row(row[3], row[1])
+                    if projection:
+                        data_json = {name: data_json[name] for name in projection if name in data_json}
                 data.append({
                     "row_index": row[0],
-                    "data_json": row[1],
+                    "data_json": data_json,
                     "file_name": row[2]
                 })
 
+            # The next page starts after the last row returned
+            next_cursor = None
+            if len(rows) == limit:
+                last_row = rows[-1]
+                next_cursor = encode_cursor(last_row[3], last_row[0], *([last_row[4]] if order_by else []))
+
             return {
                 "success": True,
                 "data": data,
                 "count": len(data),
                 "limit": limit,
-                "offset": offset,
-                "has_more": len(data) == limit,
-                "next_offset": offset + limit if len(data) == limit else None
+                "has_more": next_cursor is not None,
+                "next_cursor": next_cursor
             }
 
     except Exception as e:
@@ -1,3 +1,4 @@
+import json
 import logging
 from typing import Dict, Any, List
 from database.database import get_db_cursor
@@ -10,6 +11,7 @@ logger = logging.getLogger(__name__)
 def artifact_list(input_data: Dict[str, Any]) -> Dict[str, Any]:
     """Get list of artifacts for a report."""
     job_name = input_data["job_name"]
+    include_columns = input_data.get("include_columns", True)
 
     try:
         with get_db_cursor() as cursor:
@@ -25,18 +27,30 @@ def artifact_list(input_data: Dict[str, Any]) -> Dict[str, Any]:
                     available_reports=available_reports
                 )
 
-            # Get artifacts for valid report
-            query = """
-                SELECT DISTINCT at.id, at.file_name, COUNT(ad.row_index) as row_count
+            # Profiles are stored when a file finishes ingesting
+            cursor.execute("""
+                SELECT at.id, at.file_name, ap.row_count, ap.profile_json
                 FROM artifact_types at
-                LEFT JOIN artifact_data ad ON at.id = ad.artifact_type_id AND ad.job_name = ?
-                GROUP BY at.id, at.file_name
+                LEFT JOIN artifact_profiles ap ON ap.artifact_type_id = at.id
+                WHERE at.job_name = ?
                 ORDER BY at.file_name
-            """
-            cursor.execute(query, (job_name,))
+            """, (job_name,))
             rows = cursor.fetchall()
 
-            artifacts = [{"id": row[0], "file_name": row[1], "row_count": row[2]} for row in rows]
+            artifacts = []
+            for artifact_type_id, file_name, row_count, profile_json in rows:
+                artifact = {"id": artifact_type_id, "file_name": file_name, "row_count": row_count}
+                if profile_json is None:
+                    # Still ingesting: count the rows stored so far
+                    cursor.execute(
+                        "SELECT COUNT(*) FROM artifact_data WHERE job_name = ? AND artifact_type_id = ?",
+                        (job_name, artifact_type_id)
+                    )
+                    artifact["row_count"] = cursor.fetchone()[0]
+                    artifact["profiled"] = False
+                elif include_columns:
+                    artifact["columns"] = json.loads(profile_json)
+                artifacts.append(artifact)
 
             return {
                 "success": True,
@@ -1,24 +1,90 @@
+import re
 import logging
 import json
-from typing import Dict, Any, List, Optional
-from database.database import get_db_cursor
+from typing import Dict, Any, List, Optional, Tuple
+from database.database import get_db_cursor, decode_artifact_row
+from database.row_codec import row_search_text
+from utils.regex_utils import required_literals, combine_patterns
 
-from .shared_utils import build_error_response
+from .shared_utils import build_error_response, encode_cursor, decode_cursor
 
 logger = logging.getLogger(__name__)
 
 
+def _literal_filter(pattern: str, case_sensitive: bool) -> Tuple[str, List[Any]]:
+    """Match one literal substring against the trigram index, exactly"""
+    # The trigram index answers LIKE '%pattern%' directly for patterns of 3+ characters
+    # (shorter ones scan the indexed text)
+    match_conditions = ["content LIKE ?"]
+    if case_sensitive:
+        # LIKE ignores ASCII case, so it only narrows candidates for the exact check
+        match_params = [f"%{pattern}%"]
+        exact_check = ("instr(content, ?) > 0", pattern)
+    else:
+        match_params = [f"%{pattern.lower()}%"]
+        exact_check = ("instr(lower(content), ?) > 0", pattern.lower())
+
+    # LIKE ... ESCAPE bypasses the index, so wildcard characters are matched literally afterwards
+    if case_sensitive or '%' in pattern or '_' in pattern:
+        match_conditions.append(exact_check[0])
+        match_params.append(exact_check[1])
+
+    # A subquery makes SQLite evaluate the index lookup once instead of per artifact row
+    return f"ad.id IN (SELECT rowid FROM artifact_fts WHERE {' AND '.join(match_conditions)})", match_params
+
+
+def _regex_filter(patterns: List[str], regex: bool, combined_regex: str) -> Tuple[str, List[Any]]:
+    """Match any of several patterns: prefilter on required literals via the trigram index, then REGEXP"""
+    literal_sets = [required_literals(pattern, regex) for pattern in patterns]
+    if any(literals is None for literals in literal_sets):
+        # Some pattern can match without a 3-character literal, so every row of the job is a candidate
+        return "ad.id IN (SELECT f.rowid FROM artifact_fts f WHERE f.rowid = ad.id AND f.content REGEXP ?)", [combined_regex]
+
+    branches = []
+    params: List[Any] = []
+    for literals in literal_sets:
+        for conjunction in literals:
+            branches.append(
+                f"SELECT rowid, content FROM artifact_fts WHERE {' AND '.join(['content LIKE ?'] * len(conjunction))}"
+            )
+            params.extend(f"%{literal}%" for literal in conjunction)
+
+    return f"ad.id IN (SELECT rowid FROM ({' UNION '.join(branches)}) WHERE content REGEXP ?)", params + [combined_regex]
+
+
 def grep_search(input_data: Dict[str, Any]) -> Dict[str, Any]:
     """Search for patterns in artifact data."""
     job_name = input_data["job_name"]
-    pattern = input_data["pattern"].strip()
+    pattern = (input_data.get("pattern") or "").strip()
+    patterns = [item.strip() for item in input_data.get("patterns") or [] if item.strip()]
+    regex = input_data.get("regex", False)
     artifact_type_id = input_data.get("artifact_type_id")
     limit = input_data["limit"]
     case_sensitive = input_data["case_sensitive"]
+    cursor_token = input_data.get("cursor")
 
-    if not pattern:
+    search_patterns = ([pattern] if pattern else []) + patterns
+    if not search_patterns:
         return build_error_response("validation_error", "Search pattern cannot be empty")
 
+    # Matches are ordered by (artifact_type_id, row_index) so a cursor marks the last one seen
+    position = None
+    if cursor_token:
+        try:
+            position = decode_cursor(cursor_token)
+        except ValueError as e:
+            return build_error_response("validation_error", str(e))
+        if len(position) != 2:
+            return build_error_response("validation_error", "Invalid cursor")
+
+    combined_regex = None
+    if regex or len(search_patterns) > 1:
+        combined_regex = combine_patterns(search_patterns, regex, case_sensitive)
+        try:
+            re.compile(combined_regex)
+        except re.error as e:
+            return build_error_response("validation_error", f"Invalid regular expression: {e}")
+
     try:
         with get_db_cursor() as cursor:
             # Check if report exists
@@ -26,29 +92,25 @@ def grep_search(input_data: Dict[str, Any]) -> Dict[str, Any]:
             if not cursor.fetchone():
                 return build_error_response("report_not_found", f"Report '{job_name}' not found")
 
-            # Build search query
-            conditions = ["ad.job_name = ?"]
-            params = [job_name]
+            if combined_regex is None:
+                match_condition, match_params = _literal_filter(search_patterns[0], case_sensitive)
+            else:
+                match_condition, match_params = _regex_filter(search_patterns, regex, combined_regex)
+
+            conditions = [match_condition, "ad.job_name = ?"]
+            params = match_params + [job_name]
 
-            if artifact_type_id is None:
-                order_by = "ORDER BY at.file_name, ad.row_index"
-            elif isinstance(artifact_type_id, list):
+            if isinstance(artifact_type_id, list):
                 placeholders = ','.join(['?'] * len(artifact_type_id))
                 conditions.append(f"ad.artifact_type_id IN ({placeholders})")
                 params.extend(artifact_type_id)
-                order_by = "ORDER BY at.file_name, ad.row_index"
-            else:
+            elif artifact_type_id is not None:
                 conditions.append("ad.artifact_type_id = ?")
                 params.append(artifact_type_id)
-                order_by = "ORDER BY ad.row_index"
 
-            # Add pattern filter
-            if case_sensitive:
-                conditions.append("ad.data_json LIKE ?")
-                params.append(f"%{pattern}%")
-            else:
-                conditions.append("LOWER(ad.data_json) LIKE ?")
-                params.append(f"%{pattern.lower()}%")
+            if position:
+                conditions.append("(ad.artifact_type_id, ad.row_index) > (?, ?)")
+                params.extend(position)
 
             params.append(limit)
 
@@ -58,37 +120,58 @@ def grep_search(input_data: Dict[str, Any]) -> Dict[str, Any]:
                 FROM artifact_data ad
                 JOIN artifact_types at ON ad.artifact_type_id = at.id
                 WHERE {where_clause}
-                {order_by}
+                ORDER BY ad.artifact_type_id, ad.row_index
                 LIMIT ?
             """
 
             cursor.execute(query, tuple(params))
             rows = cursor.fetchall()
 
+            # With several patterns, report which ones each row matched
+            pattern_regexes = []
+            if len(search_patterns) > 1:
+                pattern_regexes = [
+                    (search_pattern, re.compile(combine_patterns([search_pattern], regex, case_sensitive)))
+                    for search_pattern in search_patterns
+                ]
+
             matches = []
             for row in rows:
                 try:
-                    data_json = json.loads(row[1]) if isinstance(row[1], str) else row[1]
-                    matches.append({
+                    data_json = decode_artifact_row(row[3], row[1])
+                    match = {
                         "row_index": row[0],
                         "data_json": data_json,
                         "file_name": row[2],
                         "artifact_type_id": row[3]
-                    })
-                except json.JSONDecodeError:
+                    }
+                    if pattern_regexes:
+                        text = row_search_text(data_json)
+                        match["matched_patterns"] = [
+                            search_pattern for search_pattern, pattern_regex in pattern_regexes if pattern_regex.search(text)
+                        ]
+                    matches.append(match)
+                except (json.JSONDecodeError, UnicodeDecodeError):
                     matches.append({
                         "row_index": row[0],
-                        "data_json": row[1],
+                        "data_json": row[1] if isinstance(row[1], str) else None,
                         "file_name": row[2],
                         "artifact_type_id": row[3],
                         "parse_error": True
                     })
 
+            # The next page starts after the last match returned
+            next_cursor = encode_cursor(rows[-1][3], rows[-1][0]) if len(rows) == limit else None
+
             return {
                 "success": True,
                 "matches": matches,
                 "count": len(matches),
-                "pattern": pattern,
+                "has_more": next_cursor is not None,
+                "next_cursor": next_cursor,
+                "pattern": pattern or None,
+                "patterns": patterns or None,
+                "regex": regex,
                 "job_name": job_name,
                 "artifact_type_id": artifact_type_id
             }
@@ -0,0 +1,128 @@
+import re
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple
+from database.database import get_db_cursor, decode_artifact_row
+from services.chroma_service import chroma_service
+
+from .shared_utils import build_error_response
+
+logger = logging.getLogger(__name__)
+
+RRF_K = 60                  # Reciprocal rank fusion constant; dampens the weight of top ranks
+CANDIDATE_MULTIPLIER = 3    # Candidates fetched from each retriever per requested result
+
+RowKey = Tuple[str, int, int]  # (job_name, artifact_type_id, row_index)
+
+
+def _bm25_query(query: str) -> str:
+    """Build an FTS5 MATCH expression that ranks rows containing any of the query's words"""
+    words = re.findall(r"\w+", query)
+    return " OR ".join(f'"{word}"' for word in words)
+
+
+def _lexical_search(job_name: str, query: str, n_candidates: int) -> List[RowKey]:
+    """Rank the job's rows by BM25 over their values"""
+    match_query = _bm25_query(query)
+    if not match_query:
+        return []
+
+    with get_db_cursor() as cursor:
+        # CROSS JOIN keeps the FTS index as the outer loop so it runs once
+        cursor.execute("""
+            SELECT ad.job_name, ad.artifact_type_id, ad.row_index
+            FROM artifact_words w
+            CROSS JOIN artifact_data ad ON ad.id = w.rowid
+            WHERE artifact_words MATCH ? AND ad.job_name = ?
+            ORDER BY bm25(artifact_words)
+            LIMIT ?
+        """, (match_query, job_name, n_candidates))
+        return [tuple(row) for row in cursor.fetchall()]
+
+
+def _semantic_search(job_name: str, query: str, n_candidates: int) -> List[RowKey]:
+    """Rank the job's rows by embedding similarity"""
+    results = chroma_service.query_chunks(query, job_name, n_candidates)
+    ranking = []
+    for result in results:
+        metadata = result.get('metadata')
+        if not metadata:
+            continue
+        # A chunk of merged short rows ranks each of its rows, in row order
+        row_index = metadata.get('row_index')
+        row_end = metadata.get('row_end', row_index)
+        for index in range(row_index, row_end + 1):
+            ranking.append((metadata.get('job_name'), metadata.get('artifact_type_id'), index))
+    return ranking
+
+
+def _reciprocal_rank_fusion(rankings: Dict[str, List[RowKey]]) -> List[Tuple[RowKey, float, Dict[str, int]]]:
+    """Fuse ranked lists into one, scoring each row by the sum of 1 / (RRF_K + rank)"""
+    scores: Dict[RowKey, float] = {}
+    ranks: Dict[RowKey, Dict[str, int]] = {}
+    for source, ranking in rankings.items():
+        for rank, key in enumerate(dict.fromkeys(ranking), 1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (RRF_K + rank)
+            ranks.setdefault(key, {})[source] = rank
+    fused = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    return [(key, score, ranks[key]) for key, score in fused]
+
+
+def hybrid_search(input_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Search report data lexically and semantically and fuse the rankings."""
+    query = input_data["query"].strip()
+    job_name = input_data["job_name"]
+    n_results = input_data["n_results"]
+    n_candidates = n_results * CANDIDATE_MULTIPLIER
+
+    if not query:
+        return build_error_response("validation_error", "Search query cannot be empty")
+
+    try:
+        with get_db_cursor() as cursor:
+            # Check if report exists
+            cursor.execute("SELECT job_name FROM reports WHERE job_name = ? LIMIT 1", (job_name,))
+            if not cursor.fetchone():
+                return build_error_response("report_not_found", f"Report '{job_name}' not found")
+
+        # Both retrievers run concurrently; each returns keys ranked best first
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            lexical = executor.submit(_lexical_search, job_name, query, n_candidates)
+            semantic = executor.submit(_semantic_search, job_name, query, n_candidates)
+            rankings = {"lexical": lexical.result(), "semantic": semantic.result()}
+
+        fused = _reciprocal_rank_fusion(rankings)[:n_results]
+
+        results = []
+        with get_db_cursor() as cursor:
+            for (result_job, artifact_type_id, row_index), score, ranks in fused:
+                cursor.execute("""
+                    SELECT ad.data_json, at.file_name
+                    FROM artifact_data ad
+                    JOIN artifact_types at ON ad.artifact_type_id = at.id
+                    WHERE ad.job_name = ? AND ad.artifact_type_id = ? AND ad.row_index = ?
+                """, (result_job, artifact_type_id, row_index))
+                row = cursor.fetchone()
+                if not row:
+                    continue
+                results.append({
+                    "row_index": row_index,
+                    "data_json": decode_artifact_row(artifact_type_id, row[0]),
+                    "file_name": row[1],
+                    "artifact_type_id": artifact_type_id,
+                    "score": round(score, 6),
+                    "lexical_rank": ranks.get("lexical"),
+                    "semantic_rank": ranks.get("semantic")
+                })
+
+        return {
+            "success": True,
+            "results": results,
+            "count": len(results),
+            "lexical_candidates": len(rankings["lexical"]),
+            "semantic_candidates": len(rankings["semantic"])
+        }
+
+    except Exception as e:
+        logger.error(f"Hybrid search failed: {str(e)}")
+        return build_error_response("hybrid_search_error", str(e))
@@ -0,0 +1,142 @@
+import os
+import copy
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 256    # Cached tool results kept before the least recently used is evicted
+DEFAULT_CACHE_TTL = 600     # Seconds a cached result stays valid
+
+ALL_REPORTS = "*"           # Version scope of tool calls not tied to one report
+
+
+class ToolResultCache:
+    """LRU/TTL cache of successful tool results
+
+    Entries are keyed by tool name, validated input and the data version of the report
+    the call reads (job_name), or of all reports for unscoped calls. Invalidating a report
+    bumps its version and the all-reports version, so stale entries are never hit and age
+    out of the LRU. Calls touching a report that is still being ingested are not cached.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries if max_entries is not None else self._get_configured("TOOL_CACHE_SIZE", DEFAULT_CACHE_SIZE)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else self._get_configured("TOOL_CACHE_TTL", DEFAULT_CACHE_TTL)
+        self._entries: "OrderedDict[Tuple[str, str, str, Tuple[int, int]], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._generation = 0  # Bumped when everything is invalidated
+        self._ingesting: Set[str] = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _get_configured(self, name: str, default: int) -> int:
+        """Non-negative integer setting from the environment (0 disables caching)"""
+        try:
+            return max(0, int(os.getenv(name, default)))
+        except ValueError:
+            logger.warning(f"Invalid {name} value, using default")
+            return default
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def _key(self, name: str, input_data: Dict[str, Any]) -> Optional[Tuple[str, str, str, Tuple[int, int]]]:
+        """Cache key for a call, or None if its report data may still change"""
+        scope = input_data.get("job_name") or ALL_REPORTS
+        if self._ingesting and (scope == ALL_REPORTS or scope in self._ingesting):
+            return None
+        normalized = json.dumps(input_data, sort_keys=True, separators=(',', ':'), default=str)
+        return name, normalized, scope, self._version(scope)
+
+    def _version(self, scope: str) -> Tuple[int, int]:
+        return self._generation, self._versions.get(scope, 0)
+
+    def get(self, name: str, input_data: Dict[str, Any]) -> Tuple[Optional[Tuple], Optional[Dict[str, Any]]]:
+        """Look up a call; returns (key to store the result under, cached result or None)"""
+        if not self.enabled:
+            return None, None
+        with self._lock:
+            key = self._key(name, input_data)
+            if key is None:
+                self.bypassed += 1
+                return None, None
+
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[0] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return key, copy.deepcopy(entry[1])
+
+            if entry:
+                del self._entries[key]
+            self.misses += 1
+            return key, None
+
+    def put(self, key: Optional[Tuple], result: Dict[str, Any]):
+        """Store a successful result under a key returned by get"""
+        if key is None or not result.get("success"):
+            return
+        with self._lock:
+            # The report changed while the tool ran, so the result may already be stale
+            if key[3] != self._version(key[2]) or key[2] in self._ingesting:
+                return
+            self._entries[key] = (time.monotonic(), copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, job_name: Optional[str] = None):
+        """Invalidate cached results for a report (and unscoped calls), or for everything"""
+        with self._lock:
+            self.invalidations += 1
+            if job_name is None:
+                self._entries.clear()
+                self._generation += 1
+                return
+            self._versions[job_name] = self._versions.get(job_name, 0) + 1
+            self._versions[ALL_REPORTS] = self._versions.get(ALL_REPORTS, 0) + 1
+
+    def start_ingest(self, job_name: str):
+        """Stop caching a report's results while its data is being written"""
+        with self._lock:
+            self._ingesting.add(job_name)
+        self.invalidate(job_name)
+
+    def finish_ingest(self, job_name: str):
+        """Resume caching a report's results once its ingest has ended"""
+        with self._lock:
+            self._ingesting.discard(job_name)
+        self.invalidate(job_name)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "bypassed": self.bypassed,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "ingesting": sorted(self._ingesting)
+            }
+
+
+# Global instance
+tool_result_cache = ToolResultCache()
@@ -1,5 +1,11 @@
+import base64
+import hashlib
+import json
 import logging
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+from database.database import get_db_cursor, get_artifact_codec, get_filter_columns, record_filter_use
+from database.typed_storage import get_typed_columns, typed_table_name, convert_value, TYPE_TEXT
 
 logger = logging.getLogger(__name__)
 
@@ -18,4 +24,196 @@ def build_error_response(error_type: str, message: str, **extra_fields) -> Dict[
         **extra_fields
     }
     logger.error(response['error'])
-    return response
\ No newline at end of file
+    return response
+
+# Compressed rows are decoded in SQL; compact JSON rows are read as stored
+ROW_TEXT_SQL = "CASE WHEN typeof(ad.data_json) = 'blob' THEN row_text(ad.data_json, ad.artifact_type_id) ELSE ad.data_json END"
+
+COMPARISON_OPERATORS = ("=", "!=", ">", ">=", "<", "<=")
+INDEXABLE_OPERATORS = ("=", "in", ">", ">=", "<", "<=")
+CACHED_FILTER_FLUSH_HITS = 20  # Cache hits counted in memory before their filters are recorded
+
+# Pending filter counts of cache hits per (artifact type id, where), recorded in batches
+_cached_filter_hits: Dict[Tuple[int, str], int] = {}
+_cached_filter_hits_lock = threading.Lock()
+
+
+def encode_cursor(artifact_type_id: int, row_index: int, *sort_value: Any) -> str:
+    """Encode the position after a page's last row as an opaque cursor token"""
+    position = [artifact_type_id, row_index, *sort_value]
+    return base64.urlsafe_b64encode(json.dumps(position, separators=(',', ':')).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decode a cursor token into [artifact_type_id, row_index] plus the sort value, if any"""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+    if (not isinstance(position, list) or len(position) not in (2, 3)
+            or not all(isinstance(item, int) and not isinstance(item, bool) for item in position[:2])):
+        raise ValueError("Invalid cursor")
+    return position
+
+
+def record_cached_filters(input_data: Dict[str, Any]):
+    """Count the where filters of a call answered from the result cache toward filter indexes
+
+    Hits are counted in memory and recorded in batches, so cache hits stay off the database.
+    """
+    where = input_data.get("where")
+    artifact_type_id = input_data.get("artifact_type_id")
+    if not where or isinstance(artifact_type_id, list):
+        return
+    key = (artifact_type_id, json.dumps(where, sort_keys=True))
+    with _cached_filter_hits_lock:
+        _cached_filter_hits[key] = _cached_filter_hits.get(key, 0) + 1
+        if sum(_cached_filter_hits.values()) < CACHED_FILTER_FLUSH_HITS:
+            return
+        pending = dict(_cached_filter_hits)
+        _cached_filter_hits.clear()
+    _flush_cached_filters(pending)
+
+
+def _flush_cached_filters(pending: Dict[Tuple[int, str], int]):
+    """Record batched cache-hit filter counts, one ArtifactColumns lookup per artifact and filter"""
+    with get_db_cursor() as cursor:
+        for (artifact_type_id, where_key), hits in pending.items():
+            try:
+                columns = ArtifactColumns(cursor, artifact_type_id)
+                for _ in range(hits):
+                    columns.record_filters(json.loads(where_key))
+            except Exception as e:
+                # The artifact may have been deleted since its result was cached
+                logger.warning(f"Could not record cached filters for artifact {artifact_type_id}: {e}")
+
+
+class ArtifactColumns:
+    """SQL expressions for one artifact type's columns
+
+    Artifacts stored with TYPED_STORAGE resolve to typed columns of typed_artifact_<id>
+    (aliased ta), so filters and sorts run on native values and indexes. Other artifacts
+    fall back to json_extract over the stored row, with frequently filtered columns
+    looked up in artifact_column_values.
+    """
+
+    def __init__(self, cursor, artifact_type_id: int):
+        self.artifact_type_id = artifact_type_id
+        self.typed_columns = {column["name"]: column for column in get_typed_columns(cursor, artifact_type_id)}
+        self.columns = get_artifact_codec(artifact_type_id, cursor).columns
+        self.filter_columns = set() if self.typed else set(get_filter_columns(cursor, artifact_type_id))
+
+    @property
+    def typed(self) -> bool:
+        return bool(self.typed_columns)
+
+    def join_sql(self) -> str:
+        """JOIN clause bringing the typed table in as ta (empty for untyped artifacts)"""
+        if not self.typed:
+            return ""
+        return f"JOIN {typed_table_name(self.artifact_type_id)} ta ON ta.row_index = ad.row_index"
+
+    def available(self) -> Optional[List[str]]:
+        """Known column names, or None for legacy rows stored as JSON objects"""
+        return list(self.typed_columns) if self.typed else self.columns
+
+    def column_type(self, column: str) -> str:
+        """Inferred type of a column (text unless the artifact has a typed table)"""
+        return self.typed_columns[column]["type"] if column in self.typed_columns else TYPE_TEXT
+
+    def expression(self, column: str) -> Optional[str]:
+        """SQL expression for a column's value, or None if the artifact has no such column"""
+        if self.typed:
+            typed_column = self.typed_columns.get(column)
+            return f"ta.{typed_column['sql_name']}" if typed_column else None
+        if self.columns is not None:
+            if column not in self.columns:
+                return None
+            return f"json_extract({ROW_TEXT_SQL}, '$[{self.columns.index(column)}]')"
+        # Legacy rows keep their keys, so any name is looked up directly
+        if '"' in column:
+            return None
+        escaped = column.replace("'", "''")
+        return f"json_extract({ROW_TEXT_SQL}, '$.\"{escaped}\"')"
+
+    def sort_expression(self, column: str) -> Optional[str]:
+        """SQL expression ordering a column's values, comparing numeric-looking text as numbers"""
+        expression = self.expression(column)
+        if self.typed or expression is None:
+            return expression
+        # Untyped values are text; SQLite orders numbers before text, so "257" follows "7" only once cast
+        return f"sort_number({expression})"
+
+    def values_sql(self, names: List[str]) -> str:
+        """SQL returning the stored values of the named columns as one JSON array (array-encoded rows only)"""
+        if not names:
+            return "'[]'"
+        paths = ", ".join(f"'{self._json_path(name)}'" for name in names)
+        # json_extract returns a JSON array when given several paths, so the row is parsed once
+        if len(names) == 1:
+            return f"json_array(json_extract({ROW_TEXT_SQL}, {paths}))"
+        return f"json_extract({ROW_TEXT_SQL}, {paths})"
+
+    def _filter_key(self, column: str) -> str:
+        """Key of an untyped column in artifact_column_values: its position, or a digest of a legacy key"""
+        if self.columns is not None:
+            return str(self.columns.index(column))
+        return hashlib.sha1(column.encode()).hexdigest()[:8]
+
+    def _json_path(self, column: str) -> str:
+        """json_extract path of an untyped column within the stored row"""
+        return f"$[{self.columns.index(column)}]" if self.columns is not None else f'$."{column}"'
+
+    def _indexable(self, operator: str, value: Any) -> bool:
+        """Whether a predicate can be answered from an index on the column's values"""
+        # Numeric comparisons on untyped values go through CAST, which an index cannot serve
+        numeric = isinstance(value, (int, float)) and not isinstance(value, bool)
+        return operator in INDEXABLE_OPERATORS and (self.typed or not numeric or operator == "in")
+
+    def record_filters(self, where: List[Dict[str, Any]]):
+        """Count index-friendly filters so frequently filtered columns get an index"""
+        for predicate in where:
+            column, operator, value = predicate["column"], predicate["op"], predicate["value"]
+            if not self._indexable(operator, value):
+                continue
+            if self.typed:
+                record_filter_use(self.artifact_type_id, self.typed_columns[column]["sql_name"])
+            else:
+                record_filter_use(self.artifact_type_id, self._filter_key(column), self._json_path(column))
+
+    def _coerce(self, column: str, value: Any) -> Any:
+        """Convert a filter value to the column's stored representation"""
+        if isinstance(value, str) and self.typed:
+            return convert_value(value, self.column_type(column))
+        return value
+
+    def predicate(self, column: str, operator: str, value: Any) -> Tuple[str, List[Any]]:
+        """Build a WHERE fragment and its parameters for one column predicate"""
+        if self.typed or not self._indexable(operator, value) or self._filter_key(column) not in self.filter_columns:
+            return self._comparison(self.expression(column), column, operator, value)
+
+        # Stored values are the row's json_extract values, so the same comparison selects the same rows
+        condition, params = self._comparison("cv.value", column, operator, value)
+        return (
+            "ad.row_index IN (SELECT cv.row_index FROM artifact_column_values cv "
+            f"WHERE cv.artifact_type_id = ? AND cv.column_key = ? AND {condition})",
+            [self.artifact_type_id, self._filter_key(column)] + params
+        )
+
+    def _comparison(self, expression: str, column: str, operator: str, value: Any) -> Tuple[str, List[Any]]:
+        """WHERE fragment comparing a column's value expression with a filter value"""
+        if operator == "contains":
+            return f"{expression} LIKE ?", [f"%{value}%"]
+
+        if operator == "in":
+            values = value if isinstance(value, list) else [value]
+            placeholders = ','.join(['?'] * len(values))
+            return f"{expression} IN ({placeholders})", [self._coerce(column, item) for item in values]
+
+        if operator not in COMPARISON_OPERATORS:
+            raise ValueError(f"Unsupported operator '{operator}'")
+        value = self._coerce(column, value)
+        # Untyped values are text, so numeric comparisons cast them first
+        if not self.typed and isinstance(value, (int, float)) and not isinstance(value, bool):
+            expression = f"CAST({expression} AS REAL)"
+        return f"{expression} {operator} ?", [value]
@@ -0,0 +1,154 @@
+import logging
+import math
+from typing import Dict, Any, List, Optional, Tuple
+from database.database import get_db_cursor
+from utils.geo_utils import haversine_m, bounding_boxes, EARTH_RADIUS_M
+
+from .shared_utils import build_error_response
+
+logger = logging.getLogger(__name__)
+
+NEAREST_START_RADIUS_M = 100   # First search radius for nearest-neighbour queries
+NEAREST_GROWTH_FACTOR = 4      # Radius multiplier until enough locations are found
+MAX_RADIUS_M = math.pi * EARTH_RADIUS_M  # Half the circumference covers the whole globe
+
+# The R*Tree stores 32-bit bounds, so it is queried for overlap and the exact box is checked on spatial_data.
+# Its first dimension is the job's reports.id, so only the job's points are visited.
+BOX_QUERY = """
+    SELECT sd.id, sd.timestamp, sd.latitude, sd.longitude, sd.activity, sd.source_artifact
+    FROM reports r
+    JOIN spatial_index si ON si.min_job >= r.id AND si.max_job <= r.id
+    JOIN spatial_data sd ON sd.id = si.id
+    WHERE r.job_name = ?
+      AND si.max_lat >= ? AND si.min_lat <= ? AND si.max_lon >= ? AND si.min_lon <= ?
+      AND sd.latitude BETWEEN ? AND ? AND sd.longitude BETWEEN ? AND ?
+"""
+
+
+def _report_exists(cursor, job_name: str) -> bool:
+    cursor.execute("SELECT job_name FROM reports WHERE job_name = ? LIMIT 1", (job_name,))
+    return cursor.fetchone() is not None
+
+
+def _box_params(box: Tuple[float, float, float, float], job_name: str) -> List[Any]:
+    min_lat, max_lat, min_lon, max_lon = box
+    return [job_name, min_lat, max_lat, min_lon, max_lon, min_lat, max_lat, min_lon, max_lon]
+
+
+def _location(row: tuple, distance_m: Optional[float] = None) -> Dict[str, Any]:
+    location = {
+        "id": row[0],
+        "timestamp": row[1],
+        "latitude": row[2],
+        "longitude": row[3],
+        "activity": row[4],
+        "source_artifact": row[5]
+    }
+    if distance_m is not None:
+        location["distance_m"] = round(distance_m, 1)
+    return location
+
+
+def _within_radius(cursor, job_name: str, latitude: float, longitude: float, radius_m: float) -> List[Tuple[float, tuple]]:
+    """Get (distance, row) pairs within a radius, nearest first"""
+    candidates = []
+    for box in bounding_boxes(latitude, longitude, radius_m):
+        cursor.execute(BOX_QUERY, _box_params(box, job_name))
+        candidates.extend((haversine_m(latitude, longitude, row[2], row[3]), row) for row in cursor.fetchall())
+    return sorted((candidate for candidate in candidates if candidate[0] <= radius_m), key=lambda candidate: candidate[0])
+
+
+def spatial_bounding_box(input_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Get locations inside a latitude/longitude box."""
+    job_name = input_data["job_name"]
+    box = (input_data["min_lat"], input_data["max_lat"], input_data["min_lon"], input_data["max_lon"])
+    limit = input_data["limit"]
+    offset = input_data["offset"]
+
+    if box[0] > box[1] or box[2] > box[3]:
+        return build_error_response("validation_error", "min_lat/min_lon must not exceed max_lat/max_lon")
+
+    try:
+        with get_db_cursor() as cursor:
+            if not _report_exists(cursor, job_name):
+                return build_error_response("report_not_found", f"Report '{job_name}' not found")
+
+            cursor.execute(f"{BOX_QUERY} ORDER BY sd.timestamp, sd.id LIMIT ? OFFSET ?",
+                           _box_params(box, job_name) + [limit, offset])
+            locations = [_location(row) for row in cursor.fetchall()]
+
+            return {
+                "success": True,
+                "locations": locations,
+                "count": len(locations),
+                "limit": limit,
+                "offset": offset,
+                "has_more": len(locations) == limit,
+                "next_offset": offset + limit if len(locations) == limit else None
+            }
+
+    except Exception as e:
+        logger.error(f"Spatial bounding box search failed: {str(e)}")
+        return build_error_response("database_error", f"Database error: {str(e)}")
+
+
+def spatial_radius(input_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Get locations within a radius of a point, nearest first."""
+    job_name = input_data["job_name"]
+    latitude = input_data["latitude"]
+    longitude = input_data["longitude"]
+    radius_m = input_data["radius_m"]
+    limit = input_data["limit"]
+
+    try:
+        with get_db_cursor() as cursor:
+            if not _report_exists(cursor, job_name):
+                return build_error_response("report_not_found", f"Report '{job_name}' not found")
+
+            matches = _within_radius(cursor, job_name, latitude, longitude, radius_m)
+            locations = [_location(row, distance) for distance, row in matches[:limit]]
+
+            return {
+                "success": True,
+                "locations": locations,
+                "count": len(locations),
+                "total_within_radius": len(matches),
+                "radius_m": radius_m
+            }
+
+    except Exception as e:
+        logger.error(f"Spatial radius search failed: {str(e)}")
+        return build_error_response("database_error", f"Database error: {str(e)}")
+
+
+def spatial_nearest(input_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Get the locations nearest to a point."""
+    job_name = input_data["job_name"]
+    latitude = input_data["latitude"]
+    longitude = input_data["longitude"]
+    limit = input_data["limit"]
+
+    try:
+        with get_db_cursor() as cursor:
+            if not _report_exists(cursor, job_name):
+                return build_error_response("report_not_found", f"Report '{job_name}' not found")
+
+            # Grow the search circle until it holds enough locations; anything outside it is farther away
+            radius_m = NEAREST_START_RADIUS_M
+            while True:
+                matches = _within_radius(cursor, job_name, latitude, longitude, radius_m)
+                if len(matches) >= limit or radius_m >= MAX_RADIUS_M:
+                    break
+                radius_m = min(radius_m * NEAREST_GROWTH_FACTOR, MAX_RADIUS_M)
+
+            locations = [_location(row, distance) for distance, row in matches[:limit]]
+
+            return {
+                "success": True,
+                "locations": locations,
+                "count": len(locations)
+            }
+
+    except Exception as e:
+        logger.error(f"Spatial nearest search failed: {str(e)}")
+        return build_error_response("database_error", f"Database error: {str(e)}")
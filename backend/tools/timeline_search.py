@@ -0,0 +1,88 @@
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+from database.database import get_db_cursor
+from utils.time_utils import to_epoch
+
+from .shared_utils import build_error_response
+
+logger = logging.getLogger(__name__)
+
+
+def _format_epoch(event_time: Optional[int]) -> Optional[str]:
+    if event_time is None:
+        return None
+    return datetime.fromtimestamp(event_time, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def timeline_search(input_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Get timeline events in a time window."""
+    job_name = input_data["job_name"]
+    start_time = input_data.get("start_time")
+    end_time = input_data.get("end_time")
+    activity = input_data.get("activity")
+    limit = input_data["limit"]
+    offset = input_data["offset"]
+    descending = input_data.get("descending", False)
+
+    # Bounds are parsed like the stored keys, so both compare as UTC epoch seconds
+    start_epoch = to_epoch(start_time) if start_time else None
+    end_epoch = to_epoch(end_time) if end_time else None
+    if (start_time and start_epoch is None) or (end_time and end_epoch is None):
+        return build_error_response("validation_error", "start_time and end_time must look like 'YYYY-MM-DD HH:MM:SS'")
+
+    try:
+        with get_db_cursor() as cursor:
+            # Check if report exists
+            cursor.execute("SELECT job_name FROM reports WHERE job_name = ? LIMIT 1", (job_name,))
+            if not cursor.fetchone():
+                return build_error_response("report_not_found", f"Report '{job_name}' not found")
+
+            conditions = ["job_name = ?", "event_time IS NOT NULL"]
+            params: List[Any] = [job_name]
+            if start_epoch is not None:
+                conditions.append("event_time >= ?")
+                params.append(start_epoch)
+            if end_epoch is not None:
+                conditions.append("event_time <= ?")
+                params.append(end_epoch)
+            if activity:
+                activities = activity if isinstance(activity, list) else [activity]
+                placeholders = ','.join(['?'] * len(activities))
+                conditions.append(f"activity IN ({placeholders})")
+                params.extend(activities)
+
+            direction = "DESC" if descending else "ASC"
+            cursor.execute(f"""
+                SELECT id, key, event_time, activity, datalist, source_artifact
+                FROM timeline_events
+                WHERE {" AND ".join(conditions)}
+                ORDER BY event_time {direction}, id {direction}
+                LIMIT ? OFFSET ?
+            """, params + [limit, offset])
+
+            events = [
+                {
+                    "id": row[0],
+                    "key": row[1],
+                    "event_time": _format_epoch(row[2]),
+                    "activity": row[3],
+                    "datalist": row[4],
+                    "source_artifact": row[5]
+                }
+                for row in cursor.fetchall()
+            ]
+
+            return {
+                "success": True,
+                "events": events,
+                "count": len(events),
+                "limit": limit,
+                "offset": offset,
+                "has_more": len(events) == limit,
+                "next_offset": offset + limit if len(events) == limit else None
+            }
+
+    except Exception as e:
+        logger.error(f"Timeline search failed: {str(e)}")
+        return build_error_response("database_error", f"Database error: {str(e)}")
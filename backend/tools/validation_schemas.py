@@ -1,6 +1,6 @@
 import logging
 from pydantic import BaseModel, Field
-from typing import Optional, List, Union, Dict, Any
+from typing import Optional, List, Union, Dict, Any, Literal
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +13,15 @@ class ReportListSchema(BaseModel):
 class ArtifactListSchema(BaseModel):
     """Schema for viewArtifactList"""
     job_name: str = Field(..., min_length=1)
+    include_columns: bool = Field(default=True)
+    model_config = {"extra": "forbid"}
+
+
+class WherePredicateSchema(BaseModel):
+    """Schema for one column predicate in viewArtifactData's where list"""
+    column: str = Field(..., min_length=1)
+    op: Literal["=", "!=", ">", ">=", "<", "<=", "contains", "in"] = Field(default="=")
+    value: Any = Field(...)
     model_config = {"extra": "forbid"}
 
 
@@ -21,16 +30,39 @@ class ArtifactDataSchema(BaseModel):
     job_name: str = Field(..., min_length=1)
     artifact_type_id: Union[int, List[int]] = Field(...)
     limit: int = Field(default=100, gt=0)
-    offset: int = Field(default=0, ge=0)
+    cursor: Optional[str] = Field(default=None, min_length=1)
+    order_by: Optional[str] = Field(default=None, min_length=1)
+    descending: bool = Field(default=False)
+    where: Optional[List[WherePredicateSchema]] = Field(default=None)
+    columns: Optional[List[str]] = Field(default=None, min_length=1, max_length=50)
+    model_config = {"extra": "forbid"}
+
+
+class AggregateArtifactDataSchema(BaseModel):
+    """Schema for aggregateArtifactData"""
+    job_name: str = Field(..., min_length=1)
+    artifact_type_id: int = Field(...)
+    group_by: Optional[List[str]] = Field(default=None, max_length=5)
+    aggregate: Literal["count", "count_distinct", "sum", "avg", "min", "max"] = Field(default="count")
+    column: Optional[str] = Field(default=None, min_length=1)
+    time_column: Optional[str] = Field(default=None, min_length=1)
+    time_bucket: Optional[Literal["minute", "hour", "day", "week", "month", "year"]] = Field(default=None)
+    where: Optional[List[WherePredicateSchema]] = Field(default=None)
+    order_by: Literal["value", "group"] = Field(default="value")
+    descending: bool = Field(default=True)
+    limit: int = Field(default=50, gt=0, le=1000)
     model_config = {"extra": "forbid"}
 
 
 class GrepSearchSchema(BaseModel):
     """Schema for grepSearch"""
-    pattern: str = Field(..., min_length=1)
+    pattern: Optional[str] = Field(default=None, min_length=1)
+    patterns: Optional[List[str]] = Field(default=None, min_length=1, max_length=100)
+    regex: bool = Field(default=False)
     job_name: str = Field(..., min_length=1)
     artifact_type_id: Optional[Union[int, List[int]]] = Field(default=None)
     limit: int = Field(default=50, gt=0)
+    cursor: Optional[str] = Field(default=None, min_length=1)
     case_sensitive: bool = Field(default=False)
     model_config = {"extra": "forbid"}
 
@@ -43,11 +75,68 @@ class SemanticSearchSchema(BaseModel):
     model_config = {"extra": "forbid"}
 
 
+class HybridSearchSchema(BaseModel):
+    """Schema for hybridSearch"""
+    query: str = Field(..., min_length=1)
+    job_name: str = Field(..., min_length=1)
+    n_results: int = Field(default=10, gt=0, le=100)
+    model_config = {"extra": "forbid"}
+
+
+class SpatialBoundingBoxSchema(BaseModel):
+    """Schema for spatialBoundingBox"""
+    job_name: str = Field(..., min_length=1)
+    min_lat: float = Field(..., ge=-90, le=90)
+    max_lat: float = Field(..., ge=-90, le=90)
+    min_lon: float = Field(..., ge=-180, le=180)
+    max_lon: float = Field(..., ge=-180, le=180)
+    limit: int = Field(default=100, gt=0)
+    offset: int = Field(default=0, ge=0)
+    model_config = {"extra": "forbid"}
+
+
+class SpatialRadiusSchema(BaseModel):
+    """Schema for spatialRadius"""
+    job_name: str = Field(..., min_length=1)
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    radius_m: float = Field(..., gt=0)
+    limit: int = Field(default=100, gt=0)
+    model_config = {"extra": "forbid"}
+
+
+class SpatialNearestSchema(BaseModel):
+    """Schema for spatialNearest"""
+    job_name: str = Field(..., min_length=1)
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    limit: int = Field(default=10, gt=0)
+    model_config = {"extra": "forbid"}
+
+
+class TimelineSearchSchema(BaseModel):
+    """Schema for timelineSearch"""
+    job_name: str = Field(..., min_length=1)
+    start_time: Optional[str] = Field(default=None)
+    end_time: Optional[str] = Field(default=None)
+    activity: Optional[Union[str, List[str]]] = Field(default=None)
+    limit: int = Field(default=100, gt=0)
+    offset: int = Field(default=0, ge=0)
+    descending: bool = Field(default=False)
+    model_config = {"extra": "forbid"}
+
+
 # Simple tool schema mapping
 TOOL_SCHEMAS = {
     "viewReportList": ReportListSchema,
     "viewArtifactList": ArtifactListSchema,
     "viewArtifactData": ArtifactDataSchema,
+    "aggregateArtifactData": AggregateArtifactDataSchema,
     "grepSearch": GrepSearchSchema,
     "semanticSearch": SemanticSearchSchema,
+    "spatialBoundingBox": SpatialBoundingBoxSchema,
+    "spatialRadius": SpatialRadiusSchema,
+    "spatialNearest": SpatialNearestSchema,
+    "timelineSearch": TimelineSearchSchema,
+    "hybridSearch": HybridSearchSchema,
 }
\ No newline at end of file
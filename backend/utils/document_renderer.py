@@ -0,0 +1,139 @@
+import math
+from typing import Any, Callable, Dict, List
+from database.row_codec import EXTRA_VALUES_KEY
+
+MAX_CHUNK_TOKENS = 256      # all-MiniLM-L6-v2 sequence limit, including [CLS] and [SEP]
+SPECIAL_TOKENS = 2          # [CLS] and [SEP] counted once per document
+MERGE_BELOW_TOKENS = 16     # Rows shorter than this are merged with neighbouring short rows
+MERGE_TARGET_TOKENS = 128   # Merged chunks stop growing at this size
+ROW_SEPARATOR = "\n\n"      # Whitespace separators cost no tokens
+
+# Placeholder values that carry no meaning for search
+NOISE_VALUES = {"", "none", "null", "nan", "n/a", "na", "-", "--", "undefined", "[]", "{}"}
+
+TokenCounter = Callable[[List[str]], List[int]]
+
+
+def _clean(value: Any) -> str:
+    """Value as single-spaced text, or "" if it is a placeholder"""
+    if isinstance(value, (list, tuple)):
+        value = " ".join(_clean(item) for item in value)
+    text = " ".join(str(value).split()) if value is not None else ""
+    return "" if text.lower() in NOISE_VALUES else text
+
+
+def render_row(row: Dict[Any, Any]) -> str:
+    """Render a row as compact "column: value" lines, dropping empty and placeholder fields"""
+    lines = []
+    for name, value in row.items():
+        value = _clean(value)
+        if not value:
+            continue
+        # Values beyond the header (csv restkey) have no column name of their own
+        name = "extra" if name is None or name == EXTRA_VALUES_KEY else " ".join(str(name).split())
+        lines.append(f"{name}: {value}")
+    return "\n".join(lines)
+
+
+def _split_line(line: str, tokens: int, count_tokens: TokenCounter) -> List[tuple]:
+    """Split one over-long line into runs that each fit the model limit
+
+    Lines split between words; a run left without spaces (hashes, base64, long paths)
+    is split between characters.
+    """
+    words = line.split(" ")
+    units, joiner = (words, " ") if len(words) > 1 else (line, "")
+    pieces = max(2, math.ceil((tokens - SPECIAL_TOKENS) / (MAX_CHUNK_TOKENS - SPECIAL_TOKENS)))
+    size = math.ceil(len(units) / pieces)
+    texts = [joiner.join(units[i:i + size]) for i in range(0, len(units), size)]
+
+    runs = []
+    for text, text_tokens in zip(texts, count_tokens(texts)):
+        if text_tokens > MAX_CHUNK_TOKENS and len(text) > 1:
+            runs.extend(_split_line(text, text_tokens, count_tokens))
+        else:
+            runs.append((text, text_tokens))
+    return runs
+
+
+def _split_document(text: str, count_tokens: TokenCounter) -> List[str]:
+    """Pack a long document's lines into parts within the model limit"""
+    lines = []
+    for line, tokens in zip(text.split("\n"), count_tokens(text.split("\n"))):
+        if tokens > MAX_CHUNK_TOKENS:
+            lines.extend(_split_line(line, tokens, count_tokens))
+        else:
+            lines.append((line, tokens))
+
+    parts = []
+    current: List[str] = []
+    current_tokens = SPECIAL_TOKENS
+    for line, tokens in lines:
+        line_tokens = tokens - SPECIAL_TOKENS
+        if current and current_tokens + line_tokens > MAX_CHUNK_TOKENS:
+            parts.append("\n".join(current))
+            current, current_tokens = [], SPECIAL_TOKENS
+        current.append(line)
+        current_tokens += line_tokens
+    if current:
+        parts.append("\n".join(current))
+    return parts
+
+
+def build_chunks(rows: List[Dict[str, Any]], count_tokens: TokenCounter) -> List[Dict[str, Any]]:
+    """Render rows into documents sized for the embedding model
+
+    Each input carries job_name, artifact_type_id, row_index, file_name and the row dict.
+    Rows over the model's token limit are split into parts on line boundaries instead of
+    being silently truncated. Consecutive very short rows of the same artifact are merged
+    into one document covering row_index..row_end. Rows with nothing to embed are skipped.
+    """
+    documents = [render_row(chunk['row']) for chunk in rows]
+    token_counts = count_tokens(documents) if documents else []
+
+    chunks = []
+    group: List[Dict[str, Any]] = []
+    group_documents: List[str] = []
+    group_tokens = SPECIAL_TOKENS
+
+    def chunk_for(first: Dict[str, Any], last: Dict[str, Any], document: str, part: int = 0) -> Dict[str, Any]:
+        return {
+            'job_name': first['job_name'],
+            'artifact_type_id': first['artifact_type_id'],
+            'row_index': first['row_index'],
+            'row_end': last['row_index'],
+            'part': part,
+            'file_name': first.get('file_name', 'unknown'),
+            'document': document
+        }
+
+    def flush_group():
+        nonlocal group, group_documents, group_tokens
+        if group:
+            chunks.append(chunk_for(group[0], group[-1], ROW_SEPARATOR.join(group_documents)))
+        group, group_documents, group_tokens = [], [], SPECIAL_TOKENS
+
+    for row, document, tokens in zip(rows, documents, token_counts):
+        if not document:
+            continue
+
+        if tokens < MERGE_BELOW_TOKENS:
+            body_tokens = tokens - SPECIAL_TOKENS
+            if group and (group[-1]['artifact_type_id'] != row['artifact_type_id']
+                          or group[-1]['row_index'] + 1 != row['row_index']
+                          or group_tokens + body_tokens > MERGE_TARGET_TOKENS):
+                flush_group()
+            group.append(row)
+            group_documents.append(document)
+            group_tokens += body_tokens
+            continue
+
+        flush_group()
+        if tokens <= MAX_CHUNK_TOKENS:
+            chunks.append(chunk_for(row, row, document))
+        else:
+            for part, part_document in enumerate(_split_document(document, count_tokens)):
+                chunks.append(chunk_for(row, row, part_document, part))
+
+    flush_group()
+    return chunks
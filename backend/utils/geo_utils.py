@@ -0,0 +1,61 @@
+import math
+from typing import Any, List, Optional, Tuple
+
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+
+
+def parse_coordinate(value: Any, limit: float) -> Optional[float]:
+    """Parse a latitude/longitude value, returning None if it is missing, malformed or out of range"""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        coordinate = float(value.strip() if isinstance(value, str) else value)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(coordinate) or not -limit <= coordinate <= limit:
+        return None
+    return coordinate
+
+
+def parse_latitude(value: Any) -> Optional[float]:
+    return parse_coordinate(value, 90.0)
+
+
+def parse_longitude(value: Any) -> Optional[float]:
+    return parse_coordinate(value, 180.0)
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in meters between two points"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_boxes(latitude: float, longitude: float, radius_m: float) -> List[Tuple[float, float, float, float]]:
+    """Get (min_lat, max_lat, min_lon, max_lon) boxes enclosing a circle
+
+    Latitude is clamped at the poles. A circle crossing the antimeridian gets one box
+    on each side of it, so points just across ±180° are still found.
+    """
+    lat_delta = radius_m / METERS_PER_DEGREE
+    min_lat = max(latitude - lat_delta, -90.0)
+    max_lat = min(latitude + lat_delta, 90.0)
+
+    # Longitude degrees shrink toward the poles; near them the whole band is searched
+    widest_lat = max(abs(min_lat), abs(max_lat))
+    if widest_lat >= 89.9:
+        return [(min_lat, max_lat, -180.0, 180.0)]
+    lon_delta = lat_delta / math.cos(math.radians(widest_lat))
+    if lon_delta >= 180.0:
+        return [(min_lat, max_lat, -180.0, 180.0)]
+
+    min_lon, max_lon = longitude - lon_delta, longitude + lon_delta
+    if min_lon < -180.0:
+        return [(min_lat, max_lat, min_lon + 360.0, 180.0), (min_lat, max_lat, -180.0, max_lon)]
+    if max_lon > 180.0:
+        return [(min_lat, max_lat, min_lon, 180.0), (min_lat, max_lat, -180.0, max_lon - 360.0)]
+    return [(min_lat, max_lat, min_lon, max_lon)]
@@ -0,0 +1,40 @@
+import hashlib
+import unicodedata
+from typing import Tuple
+
+HASH_CHUNK_SIZE = 1024 * 1024  # 1MB reads keep hashing memory flat
+
+
+def hash_file(file_path: str) -> str:
+    """Compute the SHA-256 content hash of a file"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as source_file:
+        for chunk in iter(lambda: source_file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_and_count_lines(file_path: str) -> Tuple[str, int]:
+    """Compute the SHA-256 content hash of a file and count its lines in the same pass"""
+    digest = hashlib.sha256()
+    line_count = 0
+    last_chunk = b''
+    with open(file_path, 'rb') as source_file:
+        for chunk in iter(lambda: source_file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+            line_count += chunk.count(b'\n')
+            last_chunk = chunk
+    # Count a final line without a trailing newline
+    if last_chunk and not last_chunk.endswith(b'\n'):
+        line_count += 1
+    return digest.hexdigest(), line_count
+
+
+def hash_document_text(text: str) -> bytes:
+    """SHA-256 digest of document text normalized for embedding
+
+    The embedding model is uncased and splits on whitespace, so case and whitespace
+    runs do not change a document's vector and are folded before hashing.
+    """
+    normalized = " ".join(unicodedata.normalize("NFC", text).lower().split())
+    return hashlib.sha256(normalized.encode("utf-8")).digest()
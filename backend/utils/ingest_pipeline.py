@@ -0,0 +1,449 @@
+import os
+import queue
+import sqlite3
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+from parsers.tsv_parser import parse_tsv_directory, parse_tsv_directory_parallel, list_tsv_files
+from parsers.leapp_db_parser import parse_spatial_db, parse_timeline_db
+from database.database import (
+    bulk_load, batched, get_or_create_artifact_type, insert_artifact_batch, index_artifact_batch, delete_artifact_rows,
+    get_artifact_rows, get_artifact_codec, save_artifact_codec, save_artifact_profile, delete_job_rows, store_spatial_data, store_timeline_data,
+    start_typed_storage, get_typed_columns, insert_typed_batch, leapp_db_attach_enabled, attached_database,
+    copy_spatial_db, copy_timeline_db, get_ingest_checkpoints, save_ingest_checkpoint, update_checkpoint_progress, update_checkpoint_embedded,
+    INSERT_BATCH_SIZE
+)
+from database.row_codec import RowCodec
+from database.artifact_profile import ArtifactProfiler
+from services.chroma_service import chroma_service
+from utils.hash_utils import hash_file, hash_and_count_lines
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 8  # Batches buffered between stages before the producer blocks
+QUEUE_POLL_SECONDS = 0.5
+
+# Markers passed through the queues alongside row batches
+FILE_START = "file_start"
+ROW_BATCH = "row_batch"
+FILE_END = "file_end"
+END_OF_STREAM = None
+
+# Checkpoint stages
+STAGE_STORING = "storing"
+STAGE_STORED = "stored"
+
+
+class PipelineAborted(Exception):
+    """Raised inside a stage when another stage has failed or the job was cancelled"""
+
+
+class IngestCancelled(Exception):
+    """Raised by IngestPipeline.run when the job was cancelled"""
+
+
+@dataclass
+class IngestProgress:
+    """Live progress of one ingest job, updated by the pipeline stages"""
+    job_name: str
+    stage: str = "queued"
+    embed: bool = True
+    rows_total: int = 0            # Estimated from TSV line counts
+    rows_stored: int = 0
+    rows_embedded: int = 0
+    rows_at_start: int = 0         # Rows already done by a previous run
+    started_at: Optional[float] = None
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def rows_processed(self) -> int:
+        """Rows that have been through every enabled stage"""
+        return self.rows_embedded if self.embed else self.rows_stored
+
+    @property
+    def rows_per_sec(self) -> float:
+        """Throughput of the current run"""
+        if not self.started_at:
+            return 0.0
+        elapsed = time.time() - self.started_at
+        return (self.rows_processed - self.rows_at_start) / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Estimated seconds remaining at the current throughput"""
+        rate = self.rows_per_sec
+        if rate <= 0 or self.rows_total <= 0:
+            return None
+        return max(self.rows_total - self.rows_processed, 0) / rate
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_name": self.job_name,
+            "stage": self.stage,
+            "rows_total": self.rows_total,
+            "rows_stored": self.rows_stored,
+            "rows_embedded": self.rows_embedded,
+            "rows_processed": self.rows_processed,
+            "rows_per_sec": round(self.rows_per_sec, 1),
+            "eta_seconds": round(self.eta_seconds, 1) if self.eta_seconds is not None else None,
+            "started_at": self.started_at,
+            "updated_at": self.updated_at
+        }
+
+
+class IngestPipeline:
+    """Staged producer/consumer ingest for one LEAPP report
+
+    Rows flow parser -> SQLite writer -> embedder through bounded queues, so every
+    stage runs concurrently and a slow stage applies backpressure upstream. Wall-clock
+    time approaches that of the slowest stage instead of the sum of all stages.
+
+    Every committed batch advances a per-file checkpoint keyed by the file's content
+    hash, so re-running a job skips files that are already stored and embedded and
+    resumes partially stored files from their last committed batch.
+    """
+
+    def __init__(self, job_name: str, directory_path: str, embed: bool = True,
+                 parse_workers: int = 1, queue_size: int = QUEUE_SIZE,
+                 progress: Optional[IngestProgress] = None, cancel_event: Optional[threading.Event] = None):
+        self.job_name = job_name
+        self.directory_path = directory_path
+        self.embed = embed
+        self.parse_workers = parse_workers
+        self.parse_stats: List[dict] = []
+        self.progress = progress or IngestProgress(job_name=job_name)
+        self.progress.embed = embed
+        self._cancel_event = cancel_event or threading.Event()
+
+        self._write_queue = queue.Queue(maxsize=queue_size)
+        self._embed_queue = queue.Queue(maxsize=queue_size)
+        self._failed = threading.Event()
+        self._errors: List[Exception] = []
+        self._checkpoints: Dict[str, dict] = {}
+
+    def run(self):
+        """Run all stages to completion, re-raising the first stage failure"""
+        self._checkpoints = get_ingest_checkpoints(self.job_name)
+        if self._checkpoints:
+            logger.info(f"Resuming job {self.job_name} from {len(self._checkpoints)} checkpoints")
+        self._set_stage("hashing")
+
+        stages = [
+            self._start_stage("parse", self._parse_stage),
+            self._start_stage("write", self._write_stage),
+        ]
+        if self.embed:
+            stages.append(self._start_stage("embed", self._embed_stage))
+
+        for stage in stages:
+            stage.join()
+
+        if self._errors:
+            raise self._errors[0]
+        if self._cancel_event.is_set():
+            raise IngestCancelled(f"Ingest cancelled for job {self.job_name}")
+
+    def _set_stage(self, stage: str):
+        """Record the stage the job is in for progress reporting"""
+        self.progress.stage = stage
+        self.progress.updated_at = time.time()
+
+    def _aborted(self) -> bool:
+        """Whether stages should stop because of a failure or cancellation"""
+        return self._failed.is_set() or self._cancel_event.is_set()
+
+    def _start_stage(self, name: str, target: Callable[[], None]) -> threading.Thread:
+        """Start a stage thread that records its failure and stops the other stages"""
+        def run_stage():
+            try:
+                target()
+            except PipelineAborted:
+                logger.info(f"Ingest stage '{name}' stopped for job {self.job_name}")
+            except Exception as e:
+                logger.error(f"Ingest stage '{name}' failed for job {self.job_name}: {e}")
+                self._errors.append(e)
+                self._failed.set()
+
+        thread = threading.Thread(target=run_stage, name=f"ingest-{name}-{self.job_name}", daemon=True)
+        thread.start()
+        return thread
+
+    def _put(self, target_queue: queue.Queue, item: Any):
+        """Block until the item is queued, giving up if another stage failed"""
+        while not self._aborted():
+            try:
+                target_queue.put(item, timeout=QUEUE_POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+        raise PipelineAborted()
+
+    def _get(self, source_queue: queue.Queue) -> Any:
+        """Block until an item is available, giving up if another stage failed"""
+        while not self._aborted():
+            try:
+                return source_queue.get(timeout=QUEUE_POLL_SECONDS)
+            except queue.Empty:
+                continue
+        raise PipelineAborted()
+
+    def _plan_tsv_files(self, tsv_path: str) -> Dict[str, dict]:
+        """Decide per TSV file whether to skip it, resume it mid-file or store it from scratch"""
+        plan = {}
+        for file_name in list_tsv_files(tsv_path):
+            if self._aborted():
+                raise PipelineAborted()
+            content_hash, line_count = hash_and_count_lines(os.path.join(tsv_path, file_name))
+            checkpoint = self._checkpoints.get(file_name)
+            # The header line is not a row; multi-line values make this an estimate
+            self.progress.rows_total += max(line_count - 1, 0)
+
+            if checkpoint and checkpoint['content_hash'] == content_hash:
+                plan[file_name] = {
+                    'content_hash': content_hash,
+                    'resume_from': checkpoint['rows_stored'],
+                    'rows_embedded': checkpoint['rows_embedded'],
+                    'complete': checkpoint['stage'] == STAGE_STORED
+                }
+            else:
+                plan[file_name] = {'content_hash': content_hash, 'resume_from': 0, 'rows_embedded': 0, 'complete': False}
+
+        # Rows finished by a previous run count as done but not toward this run's throughput
+        self.progress.rows_stored = sum(entry['resume_from'] for entry in plan.values())
+        self.progress.rows_embedded = sum(min(entry['rows_embedded'], entry['resume_from']) for entry in plan.values())
+        self.progress.rows_at_start = self.progress.rows_processed
+        self.progress.started_at = time.time()
+        self._set_stage("storing")
+        return plan
+
+    def _parse_stage(self):
+        """Parse TSV files and push fixed-size row batches to the writer"""
+        tsv_path = os.path.join(self.directory_path, '_TSV Exports')
+        if not os.path.exists(tsv_path):
+            raise FileNotFoundError(f"LEAPP Directory not found {tsv_path}")
+        plan = self._plan_tsv_files(tsv_path)
+
+        # Fully stored files are not parsed again; the writer only catches up their embeddings
+        for file_name, entry in plan.items():
+            if entry['complete']:
+                logger.info(f"Skipping already stored file {file_name} for job {self.job_name}")
+                self._put(self._write_queue, (FILE_START, file_name, entry))
+                self._put(self._write_queue, (FILE_END, file_name, None))
+
+        file_names = [file_name for file_name, entry in plan.items() if not entry['complete']]
+        skip_rows = {file_name: plan[file_name]['resume_from'] for file_name in file_names}
+        if self.parse_workers > 1:
+            tsv_data = parse_tsv_directory_parallel(tsv_path, self.parse_workers, self.parse_stats, file_names, skip_rows)
+        else:
+            tsv_data = parse_tsv_directory(tsv_path, file_names, skip_rows)
+
+        for file_name, rows in tsv_data:
+            self._put(self._write_queue, (FILE_START, file_name, plan[file_name]))
+            for batch in batched(rows, INSERT_BATCH_SIZE):
+                self._put(self._write_queue, (ROW_BATCH, file_name, batch))
+            self._put(self._write_queue, (FILE_END, file_name, None))
+
+        self._put(self._write_queue, END_OF_STREAM)
+
+    def _write_stage(self):
+        """Own the SQLite connection: store row batches, then spatial and timeline data"""
+        try:
+            with bulk_load() as cursor:
+                self._store_tsv_batches(cursor)
+
+                # Process spatial data and store data in SQLite
+                self._set_stage("spatial")
+                logger.info(f"Processing spatial data for job: {self.job_name}")
+                spatial_path = os.path.join(self.directory_path, '_KML Exports', '_latlong.db')
+                self._store_leapp_db(cursor, '_latlong.db', spatial_path, 'spatial_data',
+                                     lambda source: copy_spatial_db(cursor, self.job_name, source),
+                                     lambda: store_spatial_data(self.job_name, parse_spatial_db(spatial_path), cursor))
+
+                # Process timeline data and store data in SQLite
+                self._set_stage("timeline")
+                logger.info(f"Processing timeline data for job: {self.job_name}")
+                timeline_path = os.path.join(self.directory_path, '_Timeline', 'tl.db')
+                self._store_leapp_db(cursor, 'tl.db', timeline_path, 'timeline_events',
+                                     lambda source: copy_timeline_db(cursor, self.job_name, source),
+                                     lambda: store_timeline_data(self.job_name, parse_timeline_db(timeline_path), cursor))
+            if self.embed:
+                self._set_stage("embedding")
+        finally:
+            if self.embed:
+                # Always release the embedder, even when the write failed
+                try:
+                    self._put(self._embed_queue, END_OF_STREAM)
+                except PipelineAborted:
+                    pass
+
+    def _store_leapp_db(self, cursor, source_artifact: str, db_path: str, table: str,
+                        copy: Callable[[str], int], store: Callable[[], int]):
+        """Store one LEAPP database stage unless an identical copy was already stored
+
+        The source is attached and copied in a single INSERT ... SELECT when possible;
+        parsing it into Python rows is the fallback (or the mode with LEAPP_DB_COPY=parse).
+        """
+        content_hash = hash_file(db_path) if os.path.exists(db_path) else None
+        checkpoint = self._checkpoints.get(source_artifact)
+        if checkpoint and checkpoint['stage'] == STAGE_STORED and checkpoint['content_hash'] == content_hash:
+            logger.info(f"Skipping already stored {source_artifact} for job {self.job_name}")
+            return
+
+        # Replace any partial copy left by an interrupted run
+        if content_hash and leapp_db_attach_enabled():
+            try:
+                with attached_database(cursor, db_path) as source:
+                    delete_job_rows(cursor, table, self.job_name)
+                    row_count = copy(source)
+                    save_ingest_checkpoint(cursor, self.job_name, source_artifact, content_hash, STAGE_STORED, row_count)
+                return
+            except sqlite3.Error as e:
+                logger.warning(f"Could not copy attached {source_artifact}, parsing it instead: {e}")
+
+        delete_job_rows(cursor, table, self.job_name)
+        row_count = store()
+        save_ingest_checkpoint(cursor, self.job_name, source_artifact, content_hash, STAGE_STORED, row_count)
+        cursor.connection.commit()
+
+    def _start_file(self, cursor, file_name: str, entry: dict) -> int:
+        """Prepare an artifact type for storing and return its id"""
+        artifact_type_id = get_or_create_artifact_type(cursor, self.job_name, file_name)
+        if entry['resume_from'] == 0 and not entry['complete']:
+            # New or changed file: drop rows and vectors a previous run stored from other content
+            delete_artifact_rows(cursor, self.job_name, artifact_type_id)
+            chroma_service.delete_artifact(self.job_name, artifact_type_id)
+            save_ingest_checkpoint(cursor, self.job_name, file_name, entry['content_hash'], STAGE_STORING, 0)
+        cursor.connection.commit()
+
+        # Rows stored by a previous run but never embedded are re-read from SQLite
+        if self.embed and entry['rows_embedded'] < entry['resume_from']:
+            logger.info(f"Embedding {entry['resume_from'] - entry['rows_embedded']} previously stored rows of {file_name}")
+            for start_index in range(entry['rows_embedded'], entry['resume_from'], INSERT_BATCH_SIZE):
+                end_index = min(start_index + INSERT_BATCH_SIZE, entry['resume_from'])
+                codec = get_artifact_codec(artifact_type_id, cursor)
+                stored_rows = [
+                    (row_index, codec.decode(data))
+                    for row_index, data in get_artifact_rows(cursor, self.job_name, artifact_type_id, start_index, end_index)
+                ]
+                self._forward_to_embedder(file_name, artifact_type_id, stored_rows, end_index)
+
+        return artifact_type_id
+
+    def _resume_profile(self, cursor, artifact_type_id: int, entry: dict) -> Optional[ArtifactProfiler]:
+        """Start profiling a file, re-reading rows a previous run stored (None if already profiled)"""
+        if entry['complete']:
+            return None
+        profiler = ArtifactProfiler()
+        if entry['resume_from']:
+            codec = get_artifact_codec(artifact_type_id, cursor)
+            for start_index in range(0, entry['resume_from'], INSERT_BATCH_SIZE):
+                end_index = min(start_index + INSERT_BATCH_SIZE, entry['resume_from'])
+                profiler.add([
+                    codec.decode(data)
+                    for _, data in get_artifact_rows(cursor, self.job_name, artifact_type_id, start_index, end_index)
+                ])
+        return profiler
+
+    def _forward_to_embedder(self, file_name: str, artifact_type_id: int, rows: List[tuple], end_index: int):
+        """Queue stored (row_index, row dict) pairs for embedding"""
+        chunks = [
+            {
+                'job_name': self.job_name,
+                'artifact_type_id': artifact_type_id,
+                'row_index': row_index,
+                'row': row_data,
+                'file_name': file_name
+            }
+            for row_index, row_data in rows
+        ]
+        self._put(self._embed_queue, (file_name, chunks, end_index))
+
+    def _store_tsv_batches(self, cursor):
+        """Drain the write queue into artifact tables and forward stored rows to the embedder"""
+        logger.info(f"Processing TSV files for job: {self.job_name}")
+        artifact_type_id = None
+        codec = None
+        typed_columns = []
+        profiler = None
+        next_row_index = 0
+        file_count = 0
+        total_rows = 0
+
+        while True:
+            item = self._get(self._write_queue)
+            if item is END_OF_STREAM:
+                break
+
+            kind, file_name, payload = item
+            if kind == FILE_START:
+                artifact_type_id = self._start_file(cursor, file_name, payload)
+                next_row_index = payload['resume_from']
+                # A resumed file keeps the encoding its stored rows were written with
+                codec = get_artifact_codec(artifact_type_id, cursor) if next_row_index else None
+                typed_columns = get_typed_columns(cursor, artifact_type_id) if next_row_index else []
+                profiler = self._resume_profile(cursor, artifact_type_id, payload)
+                file_count += 1
+                continue
+
+            if kind == FILE_END:
+                # The profile is saved with the checkpoint that marks the file stored
+                if profiler:
+                    save_artifact_profile(cursor, artifact_type_id, profiler)
+                update_checkpoint_progress(cursor, self.job_name, file_name, next_row_index, STAGE_STORED)
+                cursor.connection.commit()
+                continue
+
+            if codec is None:
+                # The first batch fixes the column order and types and trains any compression dictionary
+                codec = RowCodec.train(payload)
+                save_artifact_codec(cursor, artifact_type_id, codec)
+                typed_columns = start_typed_storage(cursor, artifact_type_id, codec, payload)
+
+            # Rows and their checkpoint commit together, so a crash never loses or repeats a batch
+            rows = list(enumerate(payload, next_row_index))
+            first_id = insert_artifact_batch(cursor, self.job_name, artifact_type_id,
+                                             [(row_index, codec.encode(row_data)) for row_index, row_data in rows])
+            index_artifact_batch(cursor, first_id, payload)
+            insert_typed_batch(cursor, artifact_type_id, typed_columns, rows)
+            profiler.add(payload)
+            next_row_index += len(rows)
+            total_rows += len(rows)
+            update_checkpoint_progress(cursor, self.job_name, file_name, next_row_index)
+            cursor.connection.commit()
+            self.progress.rows_stored += len(rows)
+            self.progress.updated_at = time.time()
+
+            if self.embed:
+                self._forward_to_embedder(file_name, artifact_type_id, rows, next_row_index)
+
+        logger.info(f"Stored TSV data for job {self.job_name}: {file_count} files, {total_rows} new rows")
+
+    def _embed_stage(self):
+        """Embed stored rows as they arrive from the writer"""
+        embedded_rows = 0
+        embedding_ok = True
+
+        while True:
+            item = self._get(self._embed_queue)
+            if item is END_OF_STREAM:
+                break
+            # Keep draining after a failure so the writer is never blocked
+            if not embedding_ok:
+                continue
+
+            file_name, chunks, end_index = item
+            embedding_ok = chroma_service.embed_and_store_chunks(self.job_name, chunks)
+            if embedding_ok:
+                embedded_rows += len(chunks)
+                update_checkpoint_embedded(self.job_name, file_name, end_index)
+                self.progress.rows_embedded += len(chunks)
+                self.progress.updated_at = time.time()
+            else:
+                logger.error(f"Failed to embed data for job: {self.job_name}, skipping remaining rows")
+
+        if not embedding_ok:
+            # Rows are stored and their checkpoints say what is left, so the failed job can be resumed
+            raise RuntimeError(f"Embedding failed after {embedded_rows} rows; resume the job to embed the rest")
+        logger.info(f"Successfully embedded {embedded_rows} rows for job: {self.job_name}")
@@ -1,17 +1,33 @@
 import os
 import logging
+import threading
 import time
-from parsers.tsv_parser import parse_tsv_directory
-from parsers.leapp_db_parser import parse_spatial_db, parse_timeline_db
-from database.database import update_report_status, store_tsv_data, store_spatial_data, store_timeline_data
-from utils.embedding_utils import embed_job_data
+from database.database import update_report_status
+from utils.ingest_pipeline import IngestPipeline, IngestProgress, IngestCancelled
 from services.settings_service import settings_service
+from tools.result_cache import tool_result_cache
 
 logger = logging.getLogger(__name__)
 
 # Required subdirectories in LEAPP reports
 REQUIRED_DIRS = ['_TSV Exports', '_KML Exports', '_Timeline']
 
+# Jobs currently being ingested, so a re-submission cannot run the same job twice
+_active_jobs = set()
+_active_jobs_lock = threading.Lock()
+
+# Number of slowest TSV files to report after a parallel parse
+SLOWEST_FILES_TO_LOG = 10
+
+
+def get_parse_workers() -> int:
+    """Number of TSV parse processes, from TSV_PARSE_WORKERS (defaults to CPU count, 1 disables)"""
+    try:
+        return max(1, int(os.getenv("TSV_PARSE_WORKERS", os.cpu_count() or 1)))
+    except ValueError:
+        logger.warning("Invalid TSV_PARSE_WORKERS value, falling back to serial parsing")
+        return 1
+
 
 def validate_leapp_directory(directory_path: str) -> bool:
     """Validate LEAPP directory structure by checking required subdirectories"""
@@ -23,44 +39,64 @@ def validate_leapp_directory(directory_path: str) -> bool:
         for dir_name in REQUIRED_DIRS
     )
 
-def process_leapp_report(job_name: str, directory_path: str):
-    """Main processing pipeline for LEAPP forensic reports"""
+def log_parse_stats(job_name: str, parse_stats: list):
+    """Log the TSV files that dominated parse time for a job"""
+    total_rows = sum(stat["rows"] for stat in parse_stats)
+    total_seconds = sum(stat["parse_seconds"] for stat in parse_stats)
+    logger.info(f"Parsed {len(parse_stats)} TSV files for job {job_name}: {total_rows} rows, {total_seconds:.2f} CPU seconds")
+
+    slowest = sorted(parse_stats, key=lambda stat: stat["parse_seconds"], reverse=True)[:SLOWEST_FILES_TO_LOG]
+    for stat in slowest:
+        logger.info(f"  {stat['file_name']}: {stat['rows']} rows in {stat['parse_seconds']:.2f} seconds")
+
+def process_leapp_report(job_name: str, directory_path: str, progress: IngestProgress = None,
+                         cancel_event: threading.Event = None):
+    """Main processing pipeline for LEAPP forensic reports, resuming from any checkpoints"""
+    with _active_jobs_lock:
+        if job_name in _active_jobs:
+            logger.info(f"Job {job_name} is already being processed")
+            return
+        _active_jobs.add(job_name)
+
     start_time = time.time()
+    progress = progress or IngestProgress(job_name=job_name)
     logger.info(f"Starting processing for job: {job_name}")
 
+    # Cached tool results for the report are dropped and not refilled until the ingest ends
+    tool_result_cache.start_ingest(job_name)
+
     try:
         update_report_status(job_name, "processing")
 
-        # Process TSV exports and store data in SQLite
-        logger.info(f"Processing TSV files for job: {job_name}")
-        tsv_path = os.path.join(directory_path, '_TSV Exports')
-        tsv_data = parse_tsv_directory(tsv_path)
-        store_tsv_data(job_name, tsv_data)
-
-        # Process spatial data and store data and store data in SQLite
-        logger.info(f"Processing spatial data for job: {job_name}")
-        spatial_path = os.path.join(directory_path, '_KML Exports', '_latlong.db')
-        spatial_data = parse_spatial_db(spatial_path)
-        store_spatial_data(job_name, spatial_data)
-
-        # Process timeline data and store data and store data in SQLite
-        logger.info(f"Processing timeline data for job: {job_name}")
-        timeline_path = os.path.join(directory_path, '_Timeline', 'tl.db')
-        timeline_data = parse_timeline_db(timeline_path)
-        store_timeline_data(job_name, timeline_data)
-
-        # Mark as completed and start embedding
-        update_report_status(job_name, "completed")
-        
-        if not settings_service.get_disable_embedding():
-            logger.info(f"Starting embedding for job: {job_name}")
-            embed_job_data(job_name)
-        else:
+        # Parse, store and embed run concurrently as one staged pipeline
+        embed = not settings_service.get_disable_embedding()
+        if not embed:
             logger.info(f"Skipping embedding for job: {job_name} (disabled in settings)")
 
+        pipeline = IngestPipeline(job_name, directory_path, embed=embed, parse_workers=get_parse_workers(),
+                                  progress=progress, cancel_event=cancel_event)
+        pipeline.run()
+        if pipeline.parse_stats:
+            log_parse_stats(job_name, pipeline.parse_stats)
+
+        update_report_status(job_name, "completed")
+        progress.stage = "completed"
+
         processing_time = time.time() - start_time
         logger.info(f"Completed processing for job: {job_name} in {processing_time:.2f} seconds")
 
+    except IngestCancelled:
+        # Checkpoints are kept, so re-submitting the report resumes where it stopped
+        logger.info(f"Cancelled processing for job: {job_name}")
+        update_report_status(job_name, "cancelled")
+        progress.stage = "cancelled"
+
     except Exception as e:
         logger.error(f"Failed to process job {job_name}: {str(e)}")
-        update_report_status(job_name, "failed", str(e))
\ No newline at end of file
+        update_report_status(job_name, "failed", str(e))
+        progress.stage = "failed"
+
+    finally:
+        tool_result_cache.finish_ingest(job_name)
+        with _active_jobs_lock:
+            _active_jobs.discard(job_name)
\ No newline at end of file
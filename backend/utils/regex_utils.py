@@ -0,0 +1,90 @@
+import re
+from typing import List, Optional
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+    from re._constants import (
+        LITERAL, SUBPATTERN, BRANCH, MAX_REPEAT, MIN_REPEAT, POSSESSIVE_REPEAT, AT, ATOMIC_GROUP
+    )
+except ImportError:  # Python < 3.11
+    import sre_parse
+    from sre_constants import LITERAL, SUBPATTERN, BRANCH, MAX_REPEAT, MIN_REPEAT, AT
+    POSSESSIVE_REPEAT = ATOMIC_GROUP = None
+
+MIN_LITERAL_LENGTH = 3   # Shortest literal the trigram index can look up
+MAX_ALTERNATIVES = 32    # Give up on prefiltering rather than expand more alternatives than this
+
+# Required literals in disjunctive normal form: a match contains every literal of at least one inner list
+LiteralAlternatives = List[List[str]]
+
+
+def _combine(left: LiteralAlternatives, right: LiteralAlternatives) -> Optional[LiteralAlternatives]:
+    """AND two alternative sets together, or None if that expands too far"""
+    if len(left) * len(right) > MAX_ALTERNATIVES:
+        return None
+    return [a + b for a in left for b in right]
+
+
+def _sequence_literals(items) -> Optional[LiteralAlternatives]:
+    """Required literals of a parsed regex sequence (None means at least one branch needs none)"""
+    alternatives: LiteralAlternatives = [[]]
+    run = []
+
+    def flush():
+        nonlocal alternatives
+        if len(run) >= MIN_LITERAL_LENGTH:
+            literal = "".join(run)
+            alternatives = [conjunction + [literal] for conjunction in alternatives]
+        run.clear()
+
+    for op, value in items:
+        if op == LITERAL:
+            run.append(chr(value))
+            continue
+        if op == AT:
+            # Anchors are zero-width and do not split a literal run
+            continue
+
+        flush()
+        inner = None
+        if op in (SUBPATTERN, ATOMIC_GROUP):
+            inner = _sequence_literals(value[-1] if op == SUBPATTERN else value)
+        elif op in (MAX_REPEAT, MIN_REPEAT, POSSESSIVE_REPEAT) and value[0] >= 1:
+            inner = _sequence_literals(value[2])
+        elif op == BRANCH:
+            inner = []
+            for branch in value[1]:
+                branch_literals = _sequence_literals(branch)
+                if branch_literals is None or len(inner) + len(branch_literals) > MAX_ALTERNATIVES:
+                    inner = None
+                    break
+                inner.extend(branch_literals)
+
+        if inner:
+            combined = _combine(alternatives, inner)
+            if combined is not None:
+                alternatives = combined
+    flush()
+
+    # An alternative without literals can match any row, so the set cannot narrow candidates
+    if any(not conjunction for conjunction in alternatives):
+        return None
+    return alternatives
+
+
+def required_literals(pattern: str, regex: bool) -> Optional[LiteralAlternatives]:
+    """Get literal substrings any match of the pattern must contain, for index prefiltering
+
+    Returns None when some possible match contains no literal of MIN_LITERAL_LENGTH
+    characters, in which case every row is a candidate.
+    """
+    if not regex:
+        return [[pattern]] if len(pattern) >= MIN_LITERAL_LENGTH else None
+    return _sequence_literals(sre_parse.parse(pattern))
+
+
+def combine_patterns(patterns: List[str], regex: bool, case_sensitive: bool) -> str:
+    """Combine literal or regex patterns into one regex source matching any of them"""
+    sources = patterns if regex else [re.escape(pattern) for pattern in patterns]
+    combined = "|".join(f"(?:{source})" for source in sources)
+    return combined if case_sensitive else f"(?i:{combined})"
@@ -0,0 +1,50 @@
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+# Matches the ISO-style timestamps LEAPP tools emit, e.g. "2023-05-01 02:15:00",
+# "2023-05-01T02:15:00.123Z" or "2023-05-01 02:15:00+02:00"
+TIMESTAMP_PATTERN = re.compile(
+    r'^\s*(\d{4})-(\d{2})-(\d{2})(?:[ T](\d{2}):(\d{2})(?::(\d{2})(?:\.(\d{1,6})\d*)?)?)?'
+    r'\s*(Z|UTC|[+-]\d{2}:?\d{2})?\s*$',
+    re.IGNORECASE
+)
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse a LEAPP timestamp string into a UTC datetime (naive values are taken as UTC)"""
+    if not isinstance(value, str):
+        return None
+
+    match = TIMESTAMP_PATTERN.match(value)
+    if not match:
+        return None
+
+    year, month, day, hour, minute, second, fraction, offset = match.groups()
+    try:
+        parsed = datetime(
+            int(year), int(month), int(day),
+            int(hour or 0), int(minute or 0), int(second or 0),
+            int((fraction or '0').ljust(6, '0')),
+            tzinfo=timezone.utc
+        )
+    except ValueError:
+        return None
+
+    if offset and offset.upper() not in ('Z', 'UTC'):
+        sign = 1 if offset[0] == '+' else -1
+        digits = offset[1:].replace(':', '')
+        parsed -= sign * timedelta(hours=int(digits[:2]), minutes=int(digits[2:]))
+    return parsed
+
+
+def normalize_timestamp(value: Any) -> Optional[str]:
+    """Normalize a timestamp to sortable 'YYYY-MM-DD HH:MM:SS' UTC text"""
+    parsed = parse_timestamp(value)
+    return parsed.strftime('%Y-%m-%d %H:%M:%S') if parsed else None
+
+
+def to_epoch(value: Any) -> Optional[int]:
+    """Convert a timestamp to integer Unix epoch seconds"""
+    parsed = parse_timestamp(value)
+    return int(parsed.timestamp()) if parsed else None